@@ -0,0 +1,5 @@
+"""
+두 에이전트(ticker-score-agent, fastapi-mcp-sdk-agent)가 함께 쓰는 코드.
+- 각 앱은 자기 디렉터리에서 실행되므로 agent/ 를 sys.path 에 붙여 import 한다
+  (ticker: app/__init__.py, fastapi: shared_path.py)
+"""
@@ -0,0 +1,143 @@
+# a2a_common/cache.py
+"""
+TTL + LRU + stale-while-revalidate 캐시 (ticker: 툴/점수/재무 캐시, fastapi: 툴 캐시).
+정책(툴별 TTL 등)은 각 앱에 둔다.
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+LOGGER = logging.getLogger("a2a-common")
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    ttl: fresh 기간(초), stale: 만료 후에도 stale 값을 주면서 백그라운드 갱신하는 추가 기간(초)
+    ttl_for: 값을 보고 ttl 을 정하는 함수 (예: 재무제표는 다음 실적 발표 예상 시각까지). None 을 주면 ttl
+    """
+    ttl: float
+    stale: float = 0.0
+    ttl_for: Optional[Callable[[Any], Optional[float]]] = None
+
+    def ttl_of(self, value: Any) -> float:
+        if self.ttl_for is None:
+            return self.ttl
+        ttl = self.ttl_for(value)
+        return self.ttl if ttl is None else max(0.0, ttl)
+
+
+class TTLCache:
+    """
+    TTL + LRU 캐시 (단일 이벤트 루프 전용, 락 없음).
+    - 항목 수 상한(maxsize)을 넘으면 가장 오래 안 쓴 항목부터 제거
+    - stale-while-revalidate: ttl 이 지났지만 stale 기간 안이면 기존 값을 즉시 주고 백그라운드 갱신
+    - hit/stale/miss 카운터는 label(예: 툴 이름)별로도 집계
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        # key -> (value, fresh_until, stale_until)
+        self._data: "OrderedDict[Any, Tuple[Any, float, float]]" = OrderedDict()
+        self._refreshing: Dict[Any, asyncio.Task] = {}
+        self.counters: Dict[str, int] = {
+            "hits": 0, "stale_hits": 0, "misses": 0,
+            "refreshes": 0, "refresh_errors": 0, "evictions": 0,
+        }
+        self.by_label: Dict[str, Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _count(self, counter: str, label: Optional[str]) -> None:
+        self.counters[counter] += 1
+        if label is not None:
+            per = self.by_label.setdefault(label, {"hits": 0, "stale_hits": 0, "misses": 0})
+            if counter in per:
+                per[counter] += 1
+
+    def lookup(self, key: Any) -> Tuple[str, Any]:
+        """('fresh'|'stale'|'miss', value)"""
+        entry = self._data.get(key)
+        if entry is None:
+            return "miss", None
+        value, fresh_until, stale_until = entry
+        now = time.monotonic()
+        if now < fresh_until:
+            self._data.move_to_end(key)
+            return "fresh", value
+        if now < stale_until:
+            self._data.move_to_end(key)
+            return "stale", value
+        del self._data[key]
+        return "miss", None
+
+    def set(self, key: Any, value: Any, policy: CachePolicy) -> None:
+        now = time.monotonic()
+        ttl = policy.ttl_of(value)
+        self._data[key] = (value, now + ttl, now + ttl + policy.stale)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def invalidate(self, key: Any) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    async def get_or_load(self, key: Any,
+                          load: Callable[[], Awaitable[Any]],
+                          policy: CachePolicy,
+                          refresh: Callable[[], Awaitable[Any]] | None = None,
+                          label: str | None = None) -> Any:
+        """
+        load: 미스일 때 호출자 컨텍스트에서 실행할 로더
+        refresh: stale 갱신용 로더 (호출자가 끝난 뒤에도 돌 수 있어야 함, 없으면 load 사용)
+        """
+        state, value = self.lookup(key)
+        if state == "fresh":
+            self._count("hits", label)
+            return value
+        if state == "stale":
+            self._count("stale_hits", label)
+            self._schedule_refresh(key, refresh or load, policy)
+            return value
+
+        self._count("misses", label)
+        value = await load()
+        self.set(key, value, policy)
+        return value
+
+    def _schedule_refresh(self, key: Any, load: Callable[[], Awaitable[Any]], policy: CachePolicy) -> None:
+        if key in self._refreshing:
+            return
+
+        async def _refresh() -> None:
+            try:
+                self.set(key, await load(), policy)
+                self.counters["refreshes"] += 1
+            except Exception as e:
+                self.counters["refresh_errors"] += 1
+                LOGGER.warning("[cache:%s] refresh failed key=%s: %s", self.name, key, e)
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(_refresh(), name=f"cache-refresh-{self.name}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.counters["hits"] + self.counters["stale_hits"] + self.counters["misses"]
+        hit_ratio = (self.counters["hits"] + self.counters["stale_hits"]) / lookups if lookups else 0.0
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            **self.counters,
+            "hit_ratio": round(hit_ratio, 4),
+            "by_label": self.by_label,
+        }
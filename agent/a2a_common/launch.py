@@ -0,0 +1,46 @@
+# a2a_common/launch.py
+"""
+MCP 서버 실행 방식 (uv / direct) 과 uv 환경의 인터프리터 해석 (ticker: mcp_launch, fastapi: mcp_pool 에서 사용).
+"""
+from __future__ import annotations
+import asyncio
+import logging
+from pathlib import Path
+from typing import Dict, Tuple
+
+LOGGER = logging.getLogger("a2a-common")
+
+LAUNCH_MODES = ("uv", "direct")
+
+_PROBE = "import sys; print(sys.executable); print(sys.prefix)"
+
+# (uv 명령, 디렉토리) -> (인터프리터, 가상환경 prefix). 프로세스 수명 동안 1회만 해석
+_RESOLVED: Dict[Tuple[str, str], Tuple[str, str]] = {}
+
+
+async def resolve_interpreter(uv_cmd: str, directory: str | Path, timeout: float = 120.0) -> Tuple[str, str]:
+    """
+    uv 로 한 번만 실행해(이때 환경 sync 포함) 서버 환경의 python 경로 / prefix 를 알아낸다.
+    이후 spawn 은 이 인터프리터를 바로 exec → 매 spawn 마다의 uv 해석/동기화 비용 제거.
+    """
+    key = (uv_cmd, str(Path(directory).expanduser().resolve()))
+    if key in _RESOLVED:
+        return _RESOLVED[key]
+
+    proc = await asyncio.create_subprocess_exec(
+        uv_cmd, "--directory", key[1], "run", "python", "-c", _PROBE,
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        out, err = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise RuntimeError(f"uv interpreter probe timeout ({timeout}s): {key[1]}")
+    if proc.returncode != 0:
+        raise RuntimeError(f"uv interpreter probe failed ({proc.returncode}): {err.decode(errors='replace')[-500:]}")
+
+    python, prefix = out.decode().strip().splitlines()[-2:]
+    _RESOLVED[key] = (python, prefix)
+    LOGGER.info("[mcp-launch] resolved %s → %s", key[1], python)
+    return python, prefix
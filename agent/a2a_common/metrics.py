@@ -0,0 +1,189 @@
+# a2a_common/metrics.py
+"""
+Prometheus 텍스트 포맷 메트릭 (외부 의존성 없음).
+- 기록은 단일 이벤트 루프 안에서 dict/list 증가만 하므로 락이 없다 (hot path 비용 최소화)
+- 캐시/풀 같은 기존 통계는 스크레이프 시점에 collector 로 읽어 온다
+- 메트릭 정의(이름/라벨)는 각 앱의 metrics.py 에 두고, 여기는 레지스트리와 HTTP 미들웨어만
+"""
+from __future__ import annotations
+import math
+import time
+from bisect import bisect_left
+from typing import Any, Awaitable, Callable, Container, Dict, Iterable, List, MutableMapping, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Sample = Tuple[str, Dict[str, str], float]  # (이름, 라벨, 값)
+
+
+def _fmt_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(
+        f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for k, v in labels.items()
+    )
+    return "{" + inner + "}"
+
+
+def _fmt_value(v: float) -> str:
+    if v == math.inf:
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+
+    def samples(self) -> Iterable[Sample]:
+        return ()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self) -> Iterable[Sample]:
+        for key, v in self._values.items():
+            yield self.name, dict(zip(self.labelnames, key)), v
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [버킷별 카운트..., +Inf 카운트, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        s = self._series.get(labels)
+        if s is None:
+            s = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        s[bisect_left(self.buckets, value)] += 1  # 비누적으로 저장, 출력 시 누적
+        s[-1] += value
+
+    def samples(self) -> Iterable[Sample]:
+        for key, s in self._series.items():
+            base = dict(zip(self.labelnames, key))
+            acc = 0
+            for le, c in zip(self.buckets + (math.inf,), s[:-1]):
+                acc += c
+                yield f"{self.name}_bucket", {**base, "le": _fmt_value(le)}, acc
+            yield f"{self.name}_count", base, acc
+            yield f"{self.name}_sum", base, s[-1]
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+        # 스크레이프 시점 수집기: [(이름, 종류, 설명, samples)] 반환
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Iterable[Sample]]]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))  # type: ignore[return-value]
+
+    def gauge(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))  # type: ignore[return-value]
+
+    def histogram(self, name: str, help: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))  # type: ignore[return-value]
+
+    def add_collector(self, fn: Callable[[], Iterable[Tuple[str, str, str, Iterable[Sample]]]]) -> None:
+        self._collectors.append(fn)
+
+    def render(self) -> str:
+        lines: List[str] = []
+
+        def _emit(name: str, kind: str, help: str, samples: Iterable[Sample]) -> None:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sname, labels, v in samples:
+                lines.append(f"{sname}{_fmt_labels(labels)} {_fmt_value(v)}")
+
+        for m in self._metrics:
+            _emit(m.name, m.kind, m.help, m.samples())
+        for collect in self._collectors:
+            for name, kind, help, samples in collect():
+                _emit(name, kind, help, samples)
+        return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+
+class HTTPMetricsMiddleware:
+    """
+    순수 ASGI 미들웨어: in-flight 게이지와 요청 지연 히스토그램.
+    - 마지막 본문 청크(http.response.body, more_body=False)를 보낸 시점에 종료 → 스트리밍(SSE) 응답도
+      끝날 때까지 in-flight 로 잡히고, 지연은 헤더까지가 아니라 본문 끝까지
+      (@app.middleware("http") 는 call_next 가 헤더만 받고 돌아와 이 둘이 틀어진다)
+    - 예외·클라이언트 끊김으로 마지막 청크가 없으면 앱 호출이 끝날 때 정리
+    - 등록된 라우트 경로만 라벨로 (알 수 없는 경로는 other, 쿼리는 제외 → 라벨 폭발 방지)
+    """
+
+    def __init__(self, app: Callable[[Scope, Receive, Send], Awaitable[None]], in_flight: Gauge,
+                 seconds: Histogram, paths: Container[str]) -> None:
+        self.app = app
+        self.in_flight = in_flight
+        self.seconds = seconds
+        self.paths = paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        path = scope["path"] if scope["path"] in self.paths else "other"
+        self.in_flight.inc(path)
+        t0 = time.perf_counter()
+        done = False
+
+        def finish() -> None:
+            nonlocal done
+            if not done:
+                done = True
+                self.in_flight.dec(path)
+                self.seconds.observe(time.perf_counter() - t0, path)
+
+        async def send_wrapper(message: Message) -> None:
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish()  # 백그라운드 태스크는 응답 뒤에 돌므로 포함하지 않음
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            finish()
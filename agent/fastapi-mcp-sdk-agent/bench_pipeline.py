@@ -0,0 +1,64 @@
+"""
+MCP stdio 세션 1개에서 in-flight 깊이별 처리량 (calls/s) 벤치.
+MCPProcessClient 하나(= 자식 프로세스 1개)를 띄우고, 깊이 d 마다 MCP_MAX_IN_FLIGHT=d 로 동시에 호출한다.
+d=1 은 기존처럼 세션당 한 번에 한 호출만 보내는 경우와 같다. 툴 캐시는 끈다.
+
+실행 (fastapi-mcp-sdk-agent/ 에서, MCP_YF_CMD / MCP_YF_DIR 은 앱과 동일):
+    python bench_pipeline.py --tool get_stock_info --ticker AAPL --depths 1,2,4,8,16,32 --calls 200
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+os.environ["MCP_TOOL_CACHE_ENABLED"] = "false"
+
+from mcp_yfinance import MCPProcessClient  # noqa: E402
+
+
+async def run_depth(client: MCPProcessClient, tool: str, ticker: str, depth: int, calls: int) -> tuple[float, float]:
+    client.set_max_in_flight(depth)
+    lat: list[float] = []
+
+    async def one() -> None:
+        t0 = time.perf_counter()
+        await client.call_tool(tool, {"ticker": ticker})
+        lat.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    # 호출은 한꺼번에 던지고 세션 슬롯(backpressure)이 깊이를 제한
+    await asyncio.gather(*(one() for _ in range(calls)))
+    wall = time.perf_counter() - t0
+    lat.sort()
+    return calls / wall, lat[len(lat) // 2] * 1000
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tool", default="get_stock_info")
+    ap.add_argument("--ticker", default="AAPL")
+    ap.add_argument("--depths", default="1,2,4,8,16,32")
+    ap.add_argument("--calls", type=int, default=200)
+    args = ap.parse_args()
+
+    logging.getLogger("mcp").setLevel(logging.WARNING)
+    client = MCPProcessClient()
+    client.queue_timeout = 3600  # 벤치에서는 대기열 타임아웃 없음
+    await client.start()
+    try:
+        await run_depth(client, args.tool, args.ticker, 4, 20)  # 워밍업
+        print(f"{'depth':>6} {'calls/s':>9} {'p50 ms':>9}  (p50 은 슬롯 대기 포함)")
+        base = None
+        for d in [int(x) for x in args.depths.split(",") if x.strip()]:
+            rps, p50 = await run_depth(client, args.tool, args.ticker, d, args.calls)
+            base = base or rps
+            print(f"{d:>6} {rps:9.1f} {p50:9.1f}   x{rps / base:.1f}")
+    finally:
+        await client.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+"""
+MCP 세션 spawn → initialize 완료(ready)까지 시간, 실행 방식별 비교.
+- uv:     'uv --directory MCP_YF_DIR run server.py' (매번 uv 해석/동기화)
+- direct: 1회 해석한 인터프리터로 직접 exec (해석 비용은 따로 출력)
+- spare:  MCP_WARM_SPARES 예비 세션이 있을 때 풀의 세션 교체 시간
+
+실행 (fastapi-mcp-sdk-agent/ 에서, MCP_YF_CMD / MCP_YF_DIR 은 앱과 동일):
+    python bench_spawn.py --spawns 5
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+from mcp_pool import MCPClientPool
+from mcp_yfinance import MCPProcessClient
+from a2a_common.launch import resolve_interpreter  # mcp_pool import 시 agent/ 가 sys.path 에 추가됨
+
+
+def _report(label: str, ms: list[float]) -> None:
+    print(f"{label:<7} n={len(ms):<3} mean={statistics.mean(ms):8.1f}ms "
+          f"p50={statistics.median(ms):8.1f}ms max={max(ms):8.1f}ms")
+
+
+async def _spawns(launch: tuple[str, str] | None, n: int) -> list[float]:
+    out = []
+    for _ in range(n):
+        c = MCPProcessClient(launch=launch)
+        await c.start()
+        out.append(float(c.spawn_ms))
+        await c.stop()
+    return out
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--spawns", type=int, default=5)
+    args = ap.parse_args()
+    logging.getLogger("mcp").setLevel(logging.ERROR)
+
+    _report("uv", await _spawns(None, args.spawns))
+
+    probe = MCPProcessClient()
+    t0 = time.perf_counter()
+    launch = await resolve_interpreter(probe.uv_cmd, probe.yf_dir)
+    print(f"direct: interpreter resolved once in {(time.perf_counter() - t0) * 1000:.1f}ms → {launch[0]}")
+    _report("direct", await _spawns(launch, args.spawns))
+
+    pool = MCPClientPool(size=1)
+    pool.health_interval = 0
+    pool.warm_spares = 1
+    await pool.start()
+    swaps = []
+    try:
+        for _ in range(args.spawns):
+            while not pool.spares:  # 예비분 재충전 대기
+                await asyncio.sleep(0.05)
+            t0 = time.perf_counter()
+            await pool._respawn(pool.clients[0])
+            swaps.append((time.perf_counter() - t0) * 1000)
+    finally:
+        await pool.close()
+    _report("spare", swaps)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,13 +1,18 @@
 import asyncio
 import json
-from typing import AsyncGenerator, Dict, Any
+import os
+import time
+from typing import AsyncGenerator, Awaitable, Callable, Dict, Any, List, NamedTuple, Optional
 
 from fastapi import FastAPI, Request
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
 from contextlib import asynccontextmanager
 
-from mcp_yfinance import ensure_mcp
+from metrics import CONTENT_TYPE, ERRORS, HTTP_IN_FLIGHT, HTTP_SECONDS, STAGE_SECONDS, HTTPMetricsMiddleware, registry
+from mcp_pool import mcp_pool
+from news_archive import news_archive
+from tool_cache import tool_cache
 
 
 # ---------- Models ----------
@@ -40,120 +45,221 @@ async def sse_stream(gen: AsyncGenerator[Dict[str, Any], None]) -> StreamingResp
     return StreamingResponse(_inner(), media_type="text/event-stream")
 
 
-def pick_tool(tools: Dict[str, Any], candidates: list[str]) -> str | None:
-    for name in candidates:
-        if name in tools:
-            return name
-    return None
+async def timed_call_tool(stage: str, name: str, arguments: Dict[str, Any], timeout: float | None = None) -> Any:
+    """풀 세션으로 툴 호출 + stage 단위 지연/에러 기록 (툴 지연은 캐시 미스 때 클라이언트에서 기록)"""
+    t0 = time.perf_counter()
+    try:
+        return await mcp_pool.call_tool(name, arguments, timeout=timeout)
+    except Exception:
+        ERRORS.inc(stage)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - t0, stage)
+
+
+# ---------- Stages ----------
+class Stage(NamedTuple):
+    tool_attr: str                                   # ToolCatalog 에서 고른 툴 (quote_tool / news_tool)
+    label: str                                       # progress 메시지
+    arguments: Callable[[ScoreRequest], Dict[str, Any]]
+    events: Callable[[Any], List[Dict[str, Any]]]    # 툴 결과 → SSE 이벤트 목록
+    required: bool = False                           # sources 와 무관하게 항상 실행 (툴이 없으면 에러 이벤트)
+    # 툴 호출 대신 쓸 조회 함수 (stage, tool, req, timeout) → 툴 결과 형태
+    fetch: Optional[Callable[[str, str, "ScoreRequest", float], Awaitable[Any]]] = None
+
+
+def _news_events(data: Any) -> List[Dict[str, Any]]:
+    items = data if isinstance(data, list) else [data]
+    return [{"type": "news_item", "data": item} for item in items]
+
+
+async def fetch_news(stage: str, tool: str, req: ScoreRequest, timeout: float) -> Any:
+    """
+    lookbackDays 창을 로컬 아카이브에서 응답, 아카이브에 없는 최근 구간만 뉴스 툴로 조회.
+    툴이 lookback_days 를 받지 않으면 (get_yahoo_finance_news(ticker)) ticker 만 보내고 아카이브는 피드 모드
+    """
+    ranged = (await mcp_pool.catalog()).accepts(tool, "lookback_days")
+
+    def call(days: int) -> Awaitable[Any]:
+        args = {"ticker": req.ticker, "lookback_days": days} if ranged else {"ticker": req.ticker}
+        return timed_call_tool(stage, tool, args, timeout=timeout)
+
+    if not news_archive.enabled:
+        return await call(req.lookbackDays)
+    return await news_archive.lookback(req.ticker, req.lookbackDays, call, ranged=ranged)
+
+
+# 새 단계는 여기에 추가 → ScoreRequest.sources 에 이름이 있으면 실행
+STAGES: Dict[str, Stage] = {
+    "quote": Stage("quote_tool", "시세 조회", lambda req: {"ticker": req.ticker},
+                   lambda data: [{"type": "quote", "data": data}], required=True),
+    "news": Stage("news_tool", "뉴스 수집", lambda req: {"ticker": req.ticker, "lookback_days": req.lookbackDays},
+                  _news_events, fetch=fetch_news),
+}
+
+STAGE_TIMEOUT = float(os.getenv("SCORE_STAGE_TIMEOUT", "20"))
+
+
+def stage_timeout(stage: str) -> float:
+    """단계별 제한 시간 (SCORE_STAGE_TIMEOUT_<STAGE> 가 있으면 우선)"""
+    return float(os.getenv(f"SCORE_STAGE_TIMEOUT_{stage.upper()}", STAGE_TIMEOUT))
+
+
+async def run_stage(stage: str, tool: str, req: ScoreRequest) -> List[Dict[str, Any]]:
+    """단계 1개 실행 → 이벤트 목록 (에러/타임아웃도 이벤트로 반환해 다른 단계에 영향 없음)"""
+    spec = STAGES[stage]
+    timeout = stage_timeout(stage)
+    try:
+        # 대기열(슬롯) 대기까지 포함한 단계 전체에 timeout, RPC 자체에도 같은 값 전달 (초과 시 서버에 취소 통지)
+        call = (spec.fetch(stage, tool, req, timeout) if spec.fetch
+                else timed_call_tool(stage, tool, spec.arguments(req), timeout=timeout))
+        data = await asyncio.wait_for(call, timeout)
+        return spec.events(data)
+    except asyncio.TimeoutError:
+        ERRORS.inc(stage)
+        return [{"type": "error", "stage": stage, "message": f"timeout after {timeout:g}s"}]
+    except Exception as e:
+        return [{"type": "error", "stage": stage, "message": str(e)}]
 
 
 # ---------- Lifespan ----------
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # MCP는 각 요청마다 독립적으로 처리
-    yield
+    # MCP 세션 풀: 기동 시 장수 세션을 미리 띄우고, 종료 시 drain 후 자식 프로세스까지 정리
+    await mcp_pool.start()
+    try:
+        yield
+    finally:
+        await mcp_pool.close()
+        news_archive.close()
 
 
 # ---------- App ----------
 app = FastAPI(title="A2A Agent (FastAPI + MCP stdio, uv --directory)", lifespan=lifespan)
 
 
+def _collect_tool_cache():
+    st = tool_cache.stats()
+    yield ("a2a_tool_cache_lookups_total", "counter", "Tool cache lookups by result", [
+        ("a2a_tool_cache_lookups_total", {"result": r}, st[k])
+        for r, k in (("hit", "hits"), ("stale", "stale_hits"), ("miss", "misses"))
+    ])
+    yield ("a2a_tool_cache_entries", "gauge", "Tool cache entries", [
+        ("a2a_tool_cache_entries", {}, st["size"]),
+    ])
+
+
+def _collect_news_archive():
+    st = news_archive.stats()
+    yield ("a2a_news_archive_lookups_total", "counter", "News lookback lookups by upstream fetch", [
+        ("a2a_news_archive_lookups_total", {"fetch": k}, st[k]) for k in ("archive", "partial", "full", "feed")
+    ])
+
+
+def _collect_mcp_pool():
+    st = mcp_pool.stats()
+    yield ("a2a_mcp_session_in_flight", "gauge", "In-flight MCP requests per pooled session", [
+        ("a2a_mcp_session_in_flight", {"session": name}, s["in_flight"]) for name, s in st["sessions"].items()
+    ])
+    yield ("a2a_mcp_sessions_alive", "gauge", "Alive pooled MCP sessions", [
+        ("a2a_mcp_sessions_alive", {}, st["alive"]),
+    ])
+    yield ("a2a_mcp_respawns_total", "counter", "Pooled MCP session respawns", [
+        ("a2a_mcp_respawns_total", {}, st["respawns"]),
+    ])
+
+
+registry.add_collector(_collect_tool_cache)
+registry.add_collector(_collect_mcp_pool)
+registry.add_collector(_collect_news_archive)
+
+
 # ---------- Endpoints ----------
 @app.get("/health")
 async def health():
     return {"ok": True}
 
 
+@app.get("/stats")
+async def stats():
+    return {"tool_cache": tool_cache.stats(), "mcp_pool": mcp_pool.stats(), "news_archive": news_archive.stats()}
+
+
+@app.get("/mcp/pool")
+async def mcp_pool_stats():
+    return mcp_pool.stats()
+
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+
 @app.get("/mcp/tools")
-async def mcp_tools():
-    async with ensure_mcp() as session:
-        tools_resp = await session.list_tools()
-        return {t.name: {"description": getattr(t, "description", "")} for t in tools_resp.tools}
+async def mcp_tools(request: Request):
+    # 메모리 카탈로그에서 응답, If-None-Match 가 현재 ETag 와 같으면 304
+    cat = await mcp_pool.catalog()
+    headers = {"ETag": cat.etag, "Cache-Control": "no-cache"}
+    inm = request.headers.get("if-none-match", "")
+    if inm.strip() == "*" or cat.etag in [t.strip().removeprefix("W/") for t in inm.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(cat.tools, headers=headers)
 
 
 @app.post("/score")
 async def score(req: ScoreRequest, request: Request):
     async def _gen():
-        yield {"type": "progress", "value": 5, "message": "MCP 연결 준비"}
-
-        async with ensure_mcp() as session:
-            # 툴 목록 조회
-            tools_resp = await session.list_tools()
-            tools = {t.name: {"description": getattr(t, "description", "")} for t in tools_resp.tools}
-
-            # 1) 시세 툴 선택 (우선순위)
-            quote_tool = pick_tool(
-                tools,
-                ["get_stock_info", "quote", "get_quote"]
-            )
-            if quote_tool:
-                try:
-                    yield {"type": "progress", "value": 15, "message": f"시세 조회({quote_tool})"}
-                    quote_result = await session.call_tool(quote_tool, {"ticker": req.ticker})
-
-                    # MCP 응답을 안전하게 파싱
-                    if hasattr(quote_result, 'content') and quote_result.content:
-                        quote_data = []
-                        for content in quote_result.content:
-                            if hasattr(content, 'text'):
-                                quote_data.append(content.text)
-                            elif hasattr(content, 'data'):
-                                quote_data.append(content.data)
-                            else:
-                                quote_data.append(str(content))
-                        quote_data = quote_data[0] if len(quote_data) == 1 else quote_data
-                    else:
-                        quote_data = str(quote_result)
-
-                    yield {"type": "quote", "data": quote_data}
-                except Exception as e:
-                    yield {"type": "error", "stage": "quote", "message": str(e)}
-            else:
-                yield {"type": "error", "stage": "quote", "message": "시세 툴을 찾지 못했습니다."}
-
-            # 2) 뉴스 툴 선택 (있을 때만)
-            news_tool = pick_tool(
-                tools,
-                ["get_news", "news", "search_news", "get_company_news"]
-            )
-            if news_tool and ("news" in req.sources):
-                try:
-                    yield {"type": "progress", "value": 45, "message": f"뉴스 수집({news_tool})"}
-                    news_result = await session.call_tool(
-                        news_tool,
-                        {"ticker": req.ticker, "lookback_days": req.lookbackDays}
-                    )
-
-                    # MCP 응답을 안전하게 파싱
-                    if hasattr(news_result, 'content') and news_result.content:
-                        news_data = []
-                        for content in news_result.content:
-                            if hasattr(content, 'text'):
-                                news_data.append(content.text)
-                            elif hasattr(content, 'data'):
-                                news_data.append(content.data)
-                            else:
-                                news_data.append(str(content))
-                        news_data = news_data[0] if len(news_data) == 1 else news_data
-                    else:
-                        news_data = str(news_result)
-
-                    if isinstance(news_data, list):
-                        for item in news_data:
-                            yield {"type": "news_item", "data": item}
-                    else:
-                        yield {"type": "news_item", "data": news_data}
-                except Exception as e:
-                    yield {"type": "error", "stage": "news", "message": str(e)}
-
-            # 3) (임시) 점수
-            yield {
-                "type": "score",
-                "signal": "HOLD",
-                "score": 0.5,
-                "rationale": "MVP: LLM 연동 전 기본값"
-            }
+        yield {"type": "progress", "value": 5, "message": "MCP 세션 준비"}
+
+        # 캐시된 툴 카탈로그 (시세/뉴스 툴은 카탈로그 조회 시 우선순위대로 미리 선택됨)
+        catalog = await mcp_pool.catalog()
+
+        # 실행할 단계: 필수 단계 + sources 에 있는 단계 (툴이 없는 선택 단계는 건너뜀)
+        selected: Dict[str, str] = {}
+        for stage, spec in STAGES.items():
+            if not (spec.required or stage in req.sources):
+                continue
+            tool = getattr(catalog, spec.tool_attr)
+            if tool:
+                selected[stage] = tool
+            elif spec.required:
+                yield {"type": "error", "stage": stage, "message": f"{spec.label} 툴을 찾지 못했습니다."}
+
+        # 단계는 동시에 실행하고 이벤트는 끝난 순서대로 전송 → 전체 지연 ≈ 가장 느린 단계
+        tasks = [
+            asyncio.create_task(run_stage(stage, tool, req), name=f"score-{stage}")
+            for stage, tool in selected.items()
+        ]
+        try:
+            for stage, tool in selected.items():
+                yield {"type": "progress", "value": 10, "message": f"{STAGES[stage].label}({tool})"}
+            done = 0
+            for fut in asyncio.as_completed(tasks):
+                events = await fut
+                done += 1
+                for ev in events:
+                    yield ev
+                # 진행률은 끝난 단계 비율로 (10 → 90)
+                yield {"type": "progress", "value": 10 + 80 * done // len(tasks),
+                       "message": f"{done}/{len(tasks)} 단계 완료"}
+        finally:
+            # 클라이언트가 끊기면 남은 단계 취소 (서버 쪽 툴 호출도 취소 통지)
+            for t in tasks:
+                t.cancel()
+
+        # (임시) 점수
+        yield {
+            "type": "score",
+            "signal": "HOLD",
+            "score": 0.5,
+            "rationale": "MVP: LLM 연동 전 기본값"
+        }
 
         yield {"type": "done"}
 
-    return await sse_stream(_gen())
\ No newline at end of file
+    return await sse_stream(_gen())
+
+
+# HTTP 메트릭: 라벨용 경로는 모든 라우트 등록 후 계산
+_ROUTE_PATHS = frozenset(getattr(r, "path", "") for r in app.routes)
+app.add_middleware(HTTPMetricsMiddleware, in_flight=HTTP_IN_FLIGHT, seconds=HTTP_SECONDS, paths=_ROUTE_PATHS)
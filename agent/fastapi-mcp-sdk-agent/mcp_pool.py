@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import anyio
+
+import shared_path
+from mcp_yfinance import MCPProcessClient
+
+shared_path.add_agent_dir()
+from a2a_common.launch import LAUNCH_MODES, resolve_interpreter  # noqa: E402
+
+logger = logging.getLogger("mcp")
+
+DISPATCH_MODES = ("least_busy", "round_robin")
+
+# 툴 선택 우선순위 (앞쪽이 우선)
+QUOTE_TOOL_CANDIDATES = ["get_stock_info", "quote", "get_quote"]
+NEWS_TOOL_CANDIDATES = ["get_yahoo_finance_news", "get_news", "news", "search_news", "get_company_news"]
+
+# 자식 프로세스가 죽어 stdio 파이프가 닫혔을 때 나는 에러 → 다른 세션으로 1회 재시도
+_CONNECTION_ERRORS = (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream)
+
+
+def pick_tool(tools: Dict[str, Any], candidates: list[str]) -> str | None:
+    for name in candidates:
+        if name in tools:
+            return name
+    return None
+
+
+class ToolCatalog:
+    """한 번 조회한 툴 목록 + 미리 고른 시세/뉴스 툴 + ETag (목록 내용 해시)"""
+
+    __slots__ = ("tools", "quote_tool", "news_tool", "etag", "fetched_at")
+
+    def __init__(self, tools: Dict[str, Any]) -> None:
+        self.tools = tools
+        self.quote_tool = pick_tool(tools, QUOTE_TOOL_CANDIDATES)
+        self.news_tool = pick_tool(tools, NEWS_TOOL_CANDIDATES)
+        body = json.dumps(tools, sort_keys=True, ensure_ascii=False, default=str)
+        self.etag = '"' + hashlib.sha1(body.encode()).hexdigest()[:16] + '"'
+        self.fetched_at = time.time()
+
+    def accepts(self, tool: str, arg: str) -> bool:
+        """툴 입력 스키마에 인자가 있는지 (스키마를 모르면 True)"""
+        params = (self.tools.get(tool) or {}).get("params")
+        return params is None or arg in params
+
+
+class MCPClientPool:
+    """
+    앱 단위(lifespan) 장수 MCPProcessClient 풀.
+    - 기동 시 N개 세션(자식 프로세스)을 미리 띄우고 요청은 세션을 빌리지 않고 바로 분배
+      (least_busy: in_flight 가 가장 적은 세션, 동률이면 순환 / round_robin: 단순 순환)
+    - 호출 에러 시 ping 으로 확인 후 죽은 세션만 백그라운드 재기동 + 주기적 헬스체크
+    - 종료 시 진행 중 요청을 drain 한 뒤 세션을 같은 owner task 에서 닫아 자식 프로세스를 남기지 않음
+    - MCP_LAUNCH_MODE=direct: 기동 시 uv 로 서버 인터프리터를 1회 해석하고 이후 spawn 은 직접 exec
+    - MCP_WARM_SPARES: 분배 대상 밖에 미리 initialize 해 둔 예비 세션 수 (재기동 시 즉시 교체, 백그라운드 재충전)
+    - 툴 카탈로그: 첫 사용 시 1회 list_tools 후 메모리에 보관, 세션 재연결/교체나
+      notifications/tools/list_changed 때만 무효화 → 다음 사용 시 재조회
+
+    환경변수: MCP_POOL_SIZE, MCP_POOL_DISPATCH, MCP_HEALTH_INTERVAL, MCP_PING_TIMEOUT, MCP_DRAIN_TIMEOUT,
+             MCP_LAUNCH_MODE, MCP_WARM_SPARES
+    """
+
+    def __init__(self, size: int | None = None, dispatch: str | None = None) -> None:
+        self.size = max(1, size or int(os.getenv("MCP_POOL_SIZE", "2")))
+        self.dispatch = (dispatch or os.getenv("MCP_POOL_DISPATCH", "least_busy")).lower()
+        if self.dispatch not in DISPATCH_MODES:
+            raise ValueError(f"Unknown MCP_POOL_DISPATCH: {self.dispatch} (expected one of {DISPATCH_MODES})")
+        self.health_interval = float(os.getenv("MCP_HEALTH_INTERVAL", "15"))
+        self.ping_timeout = float(os.getenv("MCP_PING_TIMEOUT", "5"))
+        self.drain_timeout = float(os.getenv("MCP_DRAIN_TIMEOUT", "10"))
+        self.launch_mode = os.getenv("MCP_LAUNCH_MODE", "uv").lower()
+        if self.launch_mode not in LAUNCH_MODES:
+            raise ValueError(f"Unknown MCP_LAUNCH_MODE: {self.launch_mode} (expected one of {LAUNCH_MODES})")
+        self.warm_spares = max(0, int(os.getenv("MCP_WARM_SPARES", "0")))
+
+        self.clients: List[MCPProcessClient] = []
+        self.respawns = 0
+        self.spare_swaps = 0
+        self.spares: List[MCPProcessClient] = []
+        self._launch: tuple[str, str] | None = None
+        self._spares_pending = 0
+        self._bg: set[asyncio.Task] = set()
+        self._rr = 0
+        self._health_task: Optional[asyncio.Task] = None
+        self._rechecking: Dict[int, asyncio.Task] = {}
+        self._catalog: Optional[ToolCatalog] = None
+        self._catalog_lock = asyncio.Lock()
+        self.catalog_fetches = 0
+        self.catalog_invalidations = 0
+
+    @property
+    def started(self) -> bool:
+        return bool(self.clients)
+
+    async def start(self) -> None:
+        if self.started:
+            return
+        if self.launch_mode == "direct":
+            probe = MCPProcessClient()
+            try:
+                self._launch = await resolve_interpreter(probe.uv_cmd, probe.yf_dir)
+            except Exception as e:
+                logger.warning("[mcp-pool] direct launch unavailable, falling back to uv: %s", e)
+
+        self.clients = [self._new_client(i) for i in range(self.size)]
+        self._refill_spares()  # 예비 세션은 동시에 띄우되 기동을 막지 않음
+        t0 = time.perf_counter()
+        results = await asyncio.gather(*(c.start() for c in self.clients), return_exceptions=True)
+        for c, r in zip(self.clients, results):
+            if isinstance(r, Exception):
+                # 기동 실패 세션도 풀에 남겨 두고, 첫 호출/헬스체크 때 재기동
+                logger.warning("[mcp-pool] %s initial spawn failed: %s", c.name, r)
+        logger.info("[mcp-pool] started size=%d alive=%d dispatch=%s (%dms)",
+                    self.size, sum(c.alive for c in self.clients), self.dispatch,
+                    int((time.perf_counter() - t0) * 1000))
+
+        if self.health_interval > 0:
+            self._health_task = asyncio.create_task(self._health_loop(), name="mcp-pool-health")
+
+    async def close(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        pending = list(self._rechecking.values()) + list(self._bg)
+        for t in pending:
+            t.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        spares, self.spares = self.spares, []
+        await asyncio.gather(*(c.stop(self.drain_timeout) for c in self.clients + spares), return_exceptions=True)
+        self.clients = []
+        self._catalog = None
+        logger.info("[mcp-pool] closed")
+
+    # ---------- 분배 ----------
+    def pick(self) -> MCPProcessClient:
+        if not self.clients:
+            raise RuntimeError("MCP pool not started")
+        # 살아 있는 세션 우선 (전부 죽었으면 아무거나 → 호출 시 재기동)
+        candidates = [c for c in self.clients if c.alive] or self.clients
+        start = self._rr % len(candidates)
+        self._rr += 1
+        ordered = candidates[start:] + candidates[:start]
+        if self.dispatch == "round_robin":
+            return ordered[0]
+        # 슬롯 대기열까지 포함한 부하 기준, min 은 동률이면 앞쪽(순환 순서) 선택
+        return min(ordered, key=lambda c: c.in_flight + c.waiting)
+
+    async def _dispatch(self, op: str, *args: Any, **kwargs: Any) -> Any:
+        client = self.pick()
+        try:
+            return await getattr(client, op)(*args, **kwargs)
+        except _CONNECTION_ERRORS:
+            # 죽은 세션: 재기동을 걸고 살아 있는 다른 세션으로 1회 재시도 (툴은 읽기 전용)
+            self._schedule_recheck(client)
+            others = [c for c in self.clients if c.alive and c is not client]
+            if not others:
+                raise
+            return await getattr(min(others, key=lambda c: c.in_flight + c.waiting), op)(*args, **kwargs)
+        except Exception:
+            self._schedule_recheck(client)
+            raise
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any], timeout: float | None = None) -> Any:
+        return await self._dispatch("call_tool", name, arguments, timeout=timeout)
+
+    async def list_tools(self) -> Dict[str, Any]:
+        return await self._dispatch("list_tools")
+
+    # ---------- 툴 카탈로그 ----------
+    async def catalog(self) -> ToolCatalog:
+        """캐시된 툴 카탈로그 (없을 때만 list_tools, 동시 요청은 한 번의 조회를 공유)"""
+        cat = self._catalog
+        if cat is not None:
+            return cat
+        async with self._catalog_lock:
+            if self._catalog is None:
+                tools = await self.list_tools()
+                self.catalog_fetches += 1
+                self._catalog = ToolCatalog(tools)
+                logger.info("[mcp-pool] tool catalog loaded: %d tools, quote=%s news=%s etag=%s",
+                            len(tools), self._catalog.quote_tool, self._catalog.news_tool, self._catalog.etag)
+            return self._catalog
+
+    def invalidate_catalog(self, reason: str) -> None:
+        if self._catalog is not None:
+            self.catalog_invalidations += 1
+            logger.info("[mcp-pool] tool catalog invalidated (%s)", reason)
+        self._catalog = None
+
+    # ---------- 예비(warm spare) 세션 ----------
+    def _new_client(self, slot: int) -> MCPProcessClient:
+        client = MCPProcessClient(slot=slot, launch=self._launch)
+        client.on_tools_changed = self.invalidate_catalog
+        return client
+
+    def _background(self, coro: Any, name: str) -> None:
+        t = asyncio.create_task(coro, name=name)
+        self._bg.add(t)
+        t.add_done_callback(self._bg.discard)
+
+    async def _spawn_spare(self) -> None:
+        spare = self._new_client(-1)
+        try:
+            await spare.start()
+            self.spares.append(spare)
+        except asyncio.CancelledError:
+            await spare.stop()  # 풀 종료 중 취소: 띄우던 자식 프로세스까지 정리
+            raise
+        except Exception as e:
+            logger.warning("[mcp-pool] spare spawn failed: %s", e)
+        finally:
+            self._spares_pending -= 1
+
+    def _refill_spares(self) -> None:
+        while len(self.spares) + self._spares_pending < self.warm_spares:
+            self._spares_pending += 1
+            self._background(self._spawn_spare(), "mcp-spare")
+
+    def _take_spare(self) -> Optional[MCPProcessClient]:
+        while self.spares:
+            spare = self.spares.pop(0)
+            if spare.alive:
+                return spare
+            self._background(spare.stop(), f"mcp-stop-{spare.name}")
+        return None
+
+    # ---------- 장애 감지 / 재기동 ----------
+    async def _respawn(self, client: MCPProcessClient) -> None:
+        """죽은 세션 교체: 예비 세션이 있으면 분배 목록에서 즉시 맞바꾸고(구 세션은 백그라운드 정리), 없으면 재기동"""
+        if client not in self.clients:  # 이미 다른 경로(recheck/헬스체크)에서 교체됨
+            return
+        self.respawns += 1
+        logger.warning("[mcp-pool] respawn %s (last_error=%s)", client.name, client.last_error)
+        spare = self._take_spare()
+        if spare is None:
+            await client.respawn()
+            self._refill_spares()
+            return
+
+        spare.slot = client.slot
+        self.clients[self.clients.index(client)] = spare
+        self.invalidate_catalog("spare swap")
+        self.spare_swaps += 1
+        self._background(client.stop(), f"mcp-stop-{client.name}")
+        self._refill_spares()
+        logger.info("[mcp-pool] %s replaced by warm spare", spare.name)
+
+    def _schedule_recheck(self, client: MCPProcessClient) -> None:
+        """호출 에러가 난 세션: ping 으로 확인 후 죽었으면 재기동 (호출자 예외 전파를 막지 않도록 백그라운드)"""
+        if client.slot in self._rechecking:
+            return
+
+        async def _recheck() -> None:
+            try:
+                if not await client.ping(self.ping_timeout):
+                    await self._respawn(client)
+            except Exception as e:
+                logger.warning("[mcp-pool] recheck %s failed: %s", client.name, e)
+            finally:
+                self._rechecking.pop(client.slot, None)
+
+        self._rechecking[client.slot] = asyncio.create_task(_recheck(), name=f"mcp-recheck-{client.name}")
+
+    async def health_check(self) -> None:
+        """진행 중 요청이 없는 세션만 ping → 죽은 세션 재기동"""
+        idle = [c for c in self.clients if c.in_flight == 0 and c.slot not in self._rechecking]
+        oks = await asyncio.gather(*(c.ping(self.ping_timeout) for c in idle))
+        for c, ok in zip(idle, oks):
+            if not ok:
+                try:
+                    await self._respawn(c)
+                except Exception as e:
+                    logger.warning("[mcp-pool] health respawn %s failed: %s", c.name, e)
+
+        # 예비 세션도 점검: 죽은 예비분은 버리고 다시 채움
+        spares = list(self.spares)
+        oks = await asyncio.gather(*(c.ping(self.ping_timeout) for c in spares))
+        for c, ok in zip(spares, oks):
+            if not ok:
+                self.spares.remove(c)
+                self._background(c.stop(), f"mcp-stop-{c.name}")
+        self._refill_spares()
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            try:
+                await self.health_check()
+            except Exception as e:
+                logger.warning("[mcp-pool] health check failed: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self.clients),
+            "dispatch": self.dispatch,
+            "alive": sum(1 for c in self.clients if c.alive),
+            "in_flight": sum(c.in_flight for c in self.clients),
+            "waiting": sum(c.waiting for c in self.clients),
+            "respawns": self.respawns,
+            "launch_mode": "direct" if self._launch else "uv",
+            "warm_spares": len(self.spares),
+            "spare_swaps": self.spare_swaps,
+            "tool_catalog": {
+                "cached": self._catalog is not None,
+                "etag": self._catalog.etag if self._catalog else None,
+                "fetches": self.catalog_fetches,
+                "invalidations": self.catalog_invalidations,
+            },
+            "sessions": {c.name: c.stats() for c in self.clients},
+        }
+
+
+# 전역 인스턴스 (main.py lifespan 에서 start/close)
+mcp_pool = MCPClientPool()
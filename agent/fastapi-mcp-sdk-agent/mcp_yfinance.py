@@ -3,11 +3,14 @@ from __future__ import annotations
 import os
 import asyncio
 import logging
+import time
 from pathlib import Path
 from shutil import which
 import anyio
+from anyio.abc import ObjectSendStream
 from contextlib import asynccontextmanager
-from typing import Any, Dict, Optional
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
 
 from dotenv import load_dotenv
 
@@ -16,7 +19,39 @@ load_dotenv()
 # SDK (stdio_client 방식)
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
+from mcp import types as mcp_types
 from mcp.types import CallToolRequest
+from mcp.shared.message import SessionMessage
+
+from metrics import ERRORS, MCP_SPAWN_SECONDS, TOOL_SECONDS
+from tool_cache import tool_cache, tool_cache_key, tool_cache_policy
+
+class MCPBusyError(RuntimeError):
+    """세션의 in-flight 상한이 찬 상태로 MCP_QUEUE_TIMEOUT 이 지남 (backpressure)"""
+
+
+# 현재 task 가 마지막으로 보낸 JSON-RPC 요청 id (취소 통지 대상)
+_LAST_REQUEST_ID: ContextVar[Optional[Any]] = ContextVar("mcp_last_request_id", default=None)
+
+
+class _RequestIdTap(ObjectSendStream[SessionMessage]):
+    """
+    ClientSession 의 write 스트림 래퍼: 요청을 실제로 보낸 task 의 컨텍스트에 그 요청 id 를 남긴다.
+    - SDK(1.x)는 send_request 를 취소해도 notifications/cancelled 를 보내지 않고, 보낸 id 를 돌려주는 공개 API 도 없음
+      → 세션 내부 카운터(session._request_id)를 미리 읽는 대신 전송 시점에 기록 (동시 호출·후속 요청과 섞이지 않음)
+    """
+
+    def __init__(self, stream: ObjectSendStream[SessionMessage]) -> None:
+        self._stream = stream
+
+    async def send(self, item: SessionMessage) -> None:
+        if isinstance(item.message.root, mcp_types.JSONRPCRequest):
+            _LAST_REQUEST_ID.set(item.message.root.id)
+        await self._stream.send(item)
+
+    async def aclose(self) -> None:
+        await self._stream.aclose()
+
 
 # ───────── Logger ─────────
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
@@ -59,15 +94,47 @@ def _resolve_yf_dir() -> Path:
 
 class MCPProcessClient:
     """
-    동작하는 패턴 기반 - context manager 방식만 사용
+    장수(long-lived) MCP stdio 세션 1개 = 자식 프로세스 1개.
+    - stdio_client/ClientSession 은 anyio task group 을 쓰므로 '연 task 에서 닫아야' 한다.
+      → 전용 owner task 안에서 열고, stop 신호를 받으면 같은 task 에서 닫는다 (자식 프로세스까지 종료).
+    - in_flight: 이 세션에서 진행 중인 요청 수 (풀의 least-busy 분배 / drain 에 사용)
+    - 파이프라이닝: JSON-RPC 요청 id 로 응답이 매칭되므로 한 stdio 파이프에 최대 max_in_flight 개를 동시에 보냄.
+      상한이 차면 슬롯이 빌 때까지 대기(backpressure), queue_timeout 을 넘기면 MCPBusyError.
+      호출별 timeout 초과/취소 시 서버에 notifications/cancelled 를 보내 서버 쪽 작업도 정리
+    - 툴 목록 변경 가능 시점(재연결, notifications/tools/list_changed)에 on_tools_changed 콜백 호출
+      → 풀이 캐시한 툴 카탈로그를 무효화
     """
 
-    def __init__(self) -> None:
-        self._active_context = None  # 활성 컨텍스트 매니저
-        self._session = None
-        self._lock = asyncio.Lock()
+    def __init__(self, slot: int = 0, launch: tuple[str, str] | None = None) -> None:
+        self.slot = slot
+        # (인터프리터, prefix) 가 있으면 uv 없이 직접 실행 (MCP_LAUNCH_MODE=direct, resolve_interpreter 결과)
+        self.launch = launch
+        self._session: Optional[ClientSession] = None
+        self._lock = asyncio.Lock()  # start/stop 직렬화
+        self._task: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
 
         self.timeout = float(os.getenv("MCP_CALL_TIMEOUT", "30"))
+        self.max_in_flight = max(1, int(os.getenv("MCP_MAX_IN_FLIGHT", "8")))
+        self.queue_timeout = float(os.getenv("MCP_QUEUE_TIMEOUT", "10"))
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._bg: set[asyncio.Task] = set()
+        self.spawn_timeout = float(os.getenv("MCP_SPAWN_TIMEOUT", "60"))
+        self.cache_enabled = os.getenv("MCP_TOOL_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+        self.generation = 0      # spawn 횟수 (재기동 감지용)
+        self.spawn_ms: Optional[int] = None  # 마지막 spawn → initialize 완료까지
+        self.in_flight = 0
+        self.waiting = 0         # 슬롯 대기 중인 호출 수
+        self.calls = 0
+        self.errors = 0
+        self.rejected = 0        # queue_timeout 초과
+        self.cancelled = 0       # timeout/취소로 서버에 cancel 통지한 호출
+        self.last_error: Optional[str] = None
+        self.on_tools_changed: Optional[Callable[[str], None]] = None
 
         self.uv_cmd = _resolve_uv_cmd()
         self.yf_dir = _resolve_yf_dir()
@@ -85,6 +152,18 @@ class MCPProcessClient:
         if "/opt/homebrew/bin" not in self._env.get("PATH", ""):
             self._env["PATH"] = "/opt/homebrew/bin:" + self._env.get("PATH", "")
 
+    @property
+    def name(self) -> str:
+        return f"yfinance#{self.slot}" if self.slot >= 0 else "yfinance#spare"
+
+    @property
+    def launch_mode(self) -> str:
+        return "direct" if self.launch else "uv"
+
+    @property
+    def alive(self) -> bool:
+        return self._session is not None and self._task is not None and not self._task.done()
+
     def _preflight(self):
         if not self.yf_dir.is_dir():
             raise RuntimeError(f"[MCP] MCP_YF_DIR not found: {self.yf_dir}")
@@ -96,100 +175,216 @@ class MCPProcessClient:
         logger.info("  • uv=%s", self.uv_cmd)
         logger.info("  • yf_dir=%s", self.yf_dir)
 
-    async def _create_session_context(self):
-        """동작하는 패턴을 따라 컨텍스트 매니저 생성"""
-        server = StdioServerParameters(
+    def _server_params(self) -> StdioServerParameters:
+        if self.launch:
+            # uv run 과 같은 환경(VIRTUAL_ENV, PATH 앞에 venv bin, 작업 디렉토리)으로 인터프리터 직접 실행
+            python, prefix = self.launch
+            env = dict(self._env)
+            env["VIRTUAL_ENV"] = prefix
+            env["PATH"] = str(Path(prefix) / "bin") + os.pathsep + env.get("PATH", "")
+            return StdioServerParameters(command=python, args=["server.py"], env=env, cwd=str(self.yf_dir))
+        return StdioServerParameters(
             command=self.uv_cmd,
             args=["--directory", str(self.yf_dir), "run", "server.py"],
             env=self._env,
         )
 
-        # 동작하는 패턴: stdio_client를 컨텍스트 매니저로 사용
-        return stdio_client(server)
+    async def _owner(self) -> None:
+        """세션 컨텍스트를 열고 stop 신호까지 유지 (같은 task 에서 닫힘 → 자식 프로세스 정리)"""
+        try:
+            async with stdio_client(self._server_params()) as (read, write):
+                async with ClientSession(read, _RequestIdTap(write), message_handler=self._on_message) as session:
+                    await session.initialize()
+                    self._session = session
+                    self._ready.set()
+                    await self._stop.wait()
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            logger.warning("[%s] session closed with error: %s", self.name, self.last_error)
+        finally:
+            self._session = None
+            self._ready.set()
+
+    async def _on_message(self, message: Any) -> None:
+        """서버 → 클라이언트 메시지 중 툴 목록 변경 통지만 처리"""
+        if isinstance(message, mcp_types.ServerNotification) and \
+                isinstance(message.root, mcp_types.ToolListChangedNotification):
+            logger.info("[%s] tools/list_changed received", self.name)
+            self._tools_changed("list_changed")
+
+    def _tools_changed(self, reason: str) -> None:
+        if self.on_tools_changed is not None:
+            self.on_tools_changed(reason)
 
     async def start(self) -> None:
         async with self._lock:
-            if self._session is not None:
+            if self.alive:
                 logger.debug("Session already active")
                 return
+            await self._close_task()
 
             self._preflight()
-            logger.info("Starting MCP connection...")
-
+            logger.info("[%s] starting MCP connection...", self.name)
+            t0 = time.perf_counter()
+            self._ready = asyncio.Event()
+            self._stop = asyncio.Event()
+            self._task = asyncio.create_task(self._owner(), name=f"mcp-{self.name}")
             try:
-                # 동작하는 패턴을 정확히 따라함
-                self._active_context = await self._create_session_context()
-                read, write = await self._active_context.__aenter__()
-
-                # ClientSession을 context manager로 사용
-                self._session = ClientSession(read, write)
-
-                logger.info("Initializing session...")
-                await self._session.initialize()
-
-                logger.info("Session initialized successfully!")
+                await asyncio.wait_for(self._ready.wait(), self.spawn_timeout)
+            except asyncio.TimeoutError:
+                await self._close_task()
+                raise RuntimeError(f"MCP session spawn timeout: {self.name} ({self.spawn_timeout}s)")
+            if self._session is None:
+                await self._close_task()
+                raise RuntimeError(f"MCP session spawn failed: {self.name}: {self.last_error}")
+            dt = time.perf_counter() - t0
+            MCP_SPAWN_SECONDS.observe(dt, self.launch_mode)
+            self.spawn_ms = int(dt * 1000)
+            self.generation += 1
+            if self.generation > 1:  # 재연결: 서버가 바뀌었을 수 있으므로 툴 목록 재조회 필요
+                self._tools_changed("reconnect")
+            logger.info("[%s] session ready (gen=%d, %s launch %dms)",
+                        self.name, self.generation, self.launch_mode, self.spawn_ms)
+
+    async def _close_task(self, timeout: float = 5.0) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        self._stop.set()
+        try:
+            await asyncio.wait_for(task, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            pass
+        except Exception as e:
+            logger.warning("[%s] context cleanup warning: %s", self.name, e)
+        self._session = None
 
-                # 툴 확인
+    async def stop(self, drain_timeout: float = 0.0) -> None:
+        """drain_timeout 동안 진행 중 요청이 끝나길 기다린 뒤 세션/자식 프로세스 종료"""
+        async with self._lock:
+            if drain_timeout > 0 and self.in_flight:
                 try:
-                    tools_resp = await self._session.list_tools()
-                    tools = getattr(tools_resp, "tools", tools_resp)
-                    tool_names = [t.name for t in tools] if tools else []
-                    logger.info("Available tools: %s", tool_names)
-                except Exception as e:
-                    logger.warning("Tools check failed: %s", e)
-
-            except Exception as e:
-                logger.error("Failed to start MCP client: %s", e)
-                await self._cleanup()
-                raise
-
-    async def _cleanup(self):
-        """완전한 정리"""
-        if hasattr(self, '_session_cm') and self._session_cm:
-            try:
-                await self._session_cm.__aexit__(None, None, None)
-            except Exception as e:
-                logger.warning("Session context exit warning: %s", e)
-            self._session_cm = None
-
-        self._session = None
+                    await asyncio.wait_for(self._idle.wait(), drain_timeout)
+                except asyncio.TimeoutError:
+                    logger.warning("[%s] drain timeout, %d call(s) still in flight", self.name, self.in_flight)
+            logger.info("[%s] stopping MCP client...", self.name)
+            await self._close_task()
+            logger.info("[%s] MCP client stopped", self.name)
+
+    async def respawn(self) -> None:
+        await self.stop()
+        await self.start()
+
+    async def ping(self, timeout: float = 5.0) -> bool:
+        if not self.alive:
+            return False
+        try:
+            with anyio.fail_after(timeout):
+                await self._session.send_ping()
+            return True
+        except Exception as e:
+            self.last_error = f"ping: {type(e).__name__}: {e}"
+            return False
 
-        if self._active_context:
+    @asynccontextmanager
+    async def _tracked(self):
+        """in-flight 슬롯 확보(backpressure) + 호출/에러 카운트"""
+        if not self.alive:
+            await self.start()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise MCPBusyError(
+                f"{self.name}: {self.max_in_flight} calls in flight, no slot within {self.queue_timeout}s"
+            ) from None
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        self.calls += 1
+        self._idle.clear()
+        try:
+            yield self._session
+        except Exception as e:
+            self.errors += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+            if self.in_flight == 0:
+                self._idle.set()
+
+    def set_max_in_flight(self, n: int) -> None:
+        """in-flight 상한 변경 (진행 중 호출이 없을 때만)"""
+        if self.in_flight or self.waiting:
+            raise RuntimeError(f"{self.name}: cannot resize while calls are in flight")
+        self.max_in_flight = max(1, n)
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+
+    def _notify_cancelled(self, session: ClientSession, request_id: Any, reason: str) -> None:
+        """응답을 더 기다리지 않는 요청을 서버에 알림 (취소 중인 task 에서 await 하지 않도록 백그라운드)"""
+        self.cancelled += 1
+        note = mcp_types.ClientNotification(mcp_types.CancelledNotification(
+            params=mcp_types.CancelledNotificationParams(requestId=request_id, reason=reason),
+        ))
+
+        async def _send() -> None:
             try:
-                await self._active_context.__aexit__(None, None, None)
+                await session.send_notification(note)
             except Exception as e:
-                logger.warning("Context cleanup warning: %s", e)
-            self._active_context = None
+                logger.debug("[%s] cancel notify failed: %s", self.name, e)
 
-    async def stop(self) -> None:
-        async with self._lock:
-            logger.info("Stopping MCP client...")
-            await self._cleanup()
-            logger.info("MCP client stopped")
+        t = asyncio.create_task(_send())
+        self._bg.add(t)
+        t.add_done_callback(self._bg.discard)
 
     async def list_tools(self) -> Dict[str, Any]:
-        if not self._session:
-            await self.start()
-
-        if not self._session:
-            raise RuntimeError("Session not available")
-
-        with anyio.fail_after(self.timeout):
-            tools_resp = await self._session.list_tools()
+        async with self._tracked() as session:
+            with anyio.fail_after(self.timeout):
+                tools_resp = await session.list_tools()
         tools = getattr(tools_resp, "tools", tools_resp)
-        return {t.name: {"description": getattr(t, "description", "")} for t in tools}
-
-    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> Any:
-        if not self._session:
-            await self.start()
-
-        if not self._session:
-            raise RuntimeError("Session not available")
+        # params: 입력 스키마의 인자 이름 (카탈로그에서 툴이 받는 인자만 보내는 데 사용)
+        return {t.name: {"description": getattr(t, "description", ""),
+                         "params": sorted((getattr(t, "inputSchema", None) or {}).get("properties") or {})}
+                for t in tools}
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any], timeout: float | None = None) -> Any:
+        """
+        툴 호출 (TOOL_CACHE_POLICIES 에 있는 툴은 TTL + LRU 캐시, stale 이면 백그라운드 갱신)
+        timeout: 이 호출만의 제한 시간 (없으면 MCP_CALL_TIMEOUT)
+        """
+        policy = tool_cache_policy(name, arguments) if self.cache_enabled else None
+        if policy is None:
+            return await self._call_tool_uncached(name, arguments, timeout)
+
+        return await tool_cache.get_or_load(
+            tool_cache_key(name, arguments),
+            lambda: self._call_tool_uncached(name, arguments, timeout),
+            policy,
+            label=name,
+        )
 
+    async def _call_tool_uncached(self, name: str, arguments: Dict[str, Any],
+                                  timeout: float | None = None) -> Any:
         try:
-            # MCP SDK의 call_tool 메서드는 name, arguments를 직접 받음
-            with anyio.fail_after(self.timeout):
-                resp = await self._session.call_tool(name, arguments)
+            async with self._tracked() as session:
+                _LAST_REQUEST_ID.set(None)
+                t0 = time.perf_counter()
+                try:
+                    # MCP SDK의 call_tool 메서드는 name, arguments를 직접 받음
+                    with anyio.fail_after(timeout or self.timeout):
+                        resp = await session.call_tool(name, arguments)
+                except (TimeoutError, asyncio.CancelledError) as e:
+                    # 응답을 기다리던 요청 = 이 task 가 마지막으로 보낸 요청
+                    # (call_tool 뒤 출력 스키마 확인용 list_tools 중이었다면 그 요청)
+                    request_id = _LAST_REQUEST_ID.get()
+                    if request_id is not None:
+                        self._notify_cancelled(session, request_id, type(e).__name__)
+                    raise
+                finally:
+                    TOOL_SECONDS.observe(time.perf_counter() - t0, name)
 
             # 동작하는 코드와 동일한 응답 처리
             if hasattr(resp, 'content') and resp.content:
@@ -208,9 +403,26 @@ class MCPProcessClient:
             return getattr(resp, 'structuredContent', None) or getattr(resp, 'content', None)
 
         except Exception as e:
-            logger.error("call_tool(%s) failed: %s", name, e)
+            ERRORS.inc("mcp_tool")
+            logger.error("call_tool(%s) failed: %s: %s", name, type(e).__name__, e)
             raise
 
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "alive": self.alive,
+            "generation": self.generation,
+            "launch_mode": self.launch_mode,
+            "spawn_ms": self.spawn_ms,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "waiting": self.waiting,
+            "calls": self.calls,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "cancelled": self.cancelled,
+            "last_error": self.last_error,
+        }
+
 
 # 전역 인스턴스
 mcp_client = MCPProcessClient()
@@ -218,14 +430,8 @@ mcp_client = MCPProcessClient()
 
 @asynccontextmanager
 async def ensure_mcp():
-    """동작하는 패턴을 직접 사용하는 컨텍스트"""
-    server = StdioServerParameters(
-        command=mcp_client.uv_cmd,
-        args=["--directory", str(mcp_client.yf_dir), "run", "server.py"],
-        env=mcp_client._env,
-    )
-
-    async with stdio_client(server) as (read, write):
+    """요청마다 새 프로세스를 띄우는 1회용 세션 (스크립트/디버깅용, 앱은 mcp_pool 사용)"""
+    async with stdio_client(mcp_client._server_params()) as (read, write):
         async with ClientSession(read, write) as session:
             await session.initialize()
             yield session  # 세션 직접 반환
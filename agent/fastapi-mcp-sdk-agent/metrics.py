@@ -0,0 +1,28 @@
+"""
+앱 메트릭 정의. 레지스트리/포맷/HTTP 미들웨어는 a2a_common.metrics (ticker-score-agent 와 공용).
+"""
+from __future__ import annotations
+import shared_path
+
+shared_path.add_agent_dir()
+from a2a_common.metrics import CONTENT_TYPE, HTTPMetricsMiddleware, Registry  # noqa: E402
+
+__all__ = [
+    "CONTENT_TYPE", "HTTPMetricsMiddleware", "registry", "STAGE_SECONDS", "TOOL_SECONDS",
+    "MCP_SPAWN_SECONDS", "ERRORS", "HTTP_IN_FLIGHT", "HTTP_SECONDS",
+]
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram(
+    "a2a_score_stage_duration_seconds", "POST /score stage latency", ("stage",))
+TOOL_SECONDS = registry.histogram(
+    "a2a_mcp_tool_duration_seconds", "MCP tool call latency (cache misses only)", ("tool",))
+MCP_SPAWN_SECONDS = registry.histogram(
+    "a2a_mcp_spawn_duration_seconds", "MCP session spawn-to-ready latency", ("launch",))
+ERRORS = registry.counter(
+    "a2a_errors_total", "Errors by stage", ("stage",))
+HTTP_IN_FLIGHT = registry.gauge(
+    "a2a_http_requests_in_flight", "In-flight HTTP requests", ("path",))
+HTTP_SECONDS = registry.histogram(
+    "a2a_http_request_duration_seconds", "HTTP request latency (until last response body chunk)", ("path",))
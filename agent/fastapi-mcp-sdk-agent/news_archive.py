@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("mcp")
+
+DAY = 86400
+_URL_LINE = re.compile(r"^URL:\s*(\S+)", re.MULTILINE)
+_DATE_LINE = re.compile(r"^(?:Published|PubDate|Date):\s*(.+)$", re.MULTILINE | re.IGNORECASE)
+
+
+# ───────── 뉴스 항목 식별 / 게시 시각 ─────────
+def _parse_time(value: Any) -> Optional[float]:
+    """epoch 초/밀리초, ISO-8601, RFC 2822 → epoch 초"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) / 1000.0 if value > 1e11 else float(value)
+    text = str(value).strip()
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(text).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def split_items(data: Any) -> List[Any]:
+    """툴 결과 → 기사 단위 목록 (list 그대로 / 'Title: …' 블록 문자열은 빈 줄 기준 분리)"""
+    if data is None:
+        return []
+    if isinstance(data, list):
+        return [x for x in data if x not in (None, "")]
+    if isinstance(data, dict) and isinstance(data.get("items"), list):
+        return data["items"]
+    if isinstance(data, str) and _URL_LINE.search(data):
+        return [b.strip() for b in re.split(r"\n{2,}", data.strip()) if b.strip()]
+    return [data]
+
+
+def item_identity(item: Any) -> Tuple[str, Optional[float]]:
+    """기사 → (URL 해시, 게시 시각 또는 None). URL 이 없으면 내용 해시"""
+    url, published = None, None
+    if isinstance(item, dict):
+        c = item.get("content") if isinstance(item.get("content"), dict) else item
+        url = c.get("link") or c.get("url") or (c.get("canonicalUrl") or {}).get("url")
+        published = _parse_time(c.get("pubDate") or c.get("providerPublishTime") or c.get("published"))
+    elif isinstance(item, str):
+        m = _URL_LINE.search(item)
+        url = m.group(1) if m else None
+        d = _DATE_LINE.search(item)
+        published = _parse_time(d.group(1)) if d else None
+    key = url.strip() if url else json.dumps(item, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16], published
+
+
+def _merge(intervals: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    out: List[Tuple[float, float]] = []
+    for s, e in sorted(intervals):
+        if out and s <= out[-1][1]:
+            out[-1] = (out[-1][0], max(out[-1][1], e))
+        else:
+            out.append((s, e))
+    return out
+
+
+class NewsArchive:
+    """
+    티커별 로컬 뉴스 아카이브 (SQLite).
+    - news: (ticker, URL 해시) 기본키, (ticker, published) 인덱스. published 는 기사의 게시 시각,
+      게시 시각이 없는 기사는 처음 본 시각(first_seen) → 창은 '게시 시각, 없으면 first_seen' 기준
+    - coverage: 티커별로 이미 조회한 시간 구간 [start, end] (겹치면 병합)
+    - lookback 조회 (ranged: 상류 툴이 lookback_days 로 기간을 거름):
+      창 [now - days, now] 가 coverage 에 덮여 있으면 아카이브에서만 응답,
+      최근 쪽만 비었으면 그 구간(일 단위 올림)만, 아니면 전체 창을 상류 툴로 조회해 병합 저장
+    - 상류가 기간을 못 거르면 (예: yahoo-finance-mcp 의 get_yahoo_finance_news(ticker) - 최신 피드만, 게시 시각 없음)
+      coverage 를 기록하지 않는다 (받은 피드가 그 구간을 덮는다는 보장이 없음).
+      refresh 초마다 피드 전체를 다시 받아 새 기사만 병합하고, 그 사이에는 아카이브에서만 응답
+    동기 sqlite 호출은 to_thread 로 감싸고, 같은 티커의 동시 조회는 티커별 락으로 한 번만 상류 호출.
+
+    환경변수: NEWS_ARCHIVE_ENABLED, NEWS_ARCHIVE_PATH, NEWS_ARCHIVE_REFRESH(초, 이보다 짧은 최근 공백은 조회 안 함),
+             NEWS_ARCHIVE_RETENTION_DAYS, NEWS_ARCHIVE_MAX_ITEMS
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        self.enabled = os.getenv("NEWS_ARCHIVE_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.path = path or os.getenv("NEWS_ARCHIVE_PATH") or str(Path(__file__).resolve().parent / "news_archive.sqlite")
+        self.refresh = float(os.getenv("NEWS_ARCHIVE_REFRESH", "120"))
+        self.retention_days = float(os.getenv("NEWS_ARCHIVE_RETENTION_DAYS", "30"))
+        self.max_items = int(os.getenv("NEWS_ARCHIVE_MAX_ITEMS", "200"))
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()  # 연결 1개를 to_thread 작업들이 공유
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._feed_fetched: Dict[str, float] = {}  # 기간 없는 피드: 티커별 마지막 상류 조회 시각
+        self.counters: Dict[str, int] = {"archive": 0, "partial": 0, "full": 0, "feed": 0,
+                                         "upstream_items": 0, "inserted": 0, "undated": 0}
+
+    # ---------- 저장소 ----------
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.path).expanduser().parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(Path(self.path).expanduser()), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS news ("
+                " ticker TEXT NOT NULL, url_hash TEXT NOT NULL, published REAL NOT NULL,"
+                " first_seen REAL NOT NULL, item TEXT NOT NULL, PRIMARY KEY (ticker, url_hash));"
+                "CREATE INDEX IF NOT EXISTS news_ticker_published ON news (ticker, published);"
+                "CREATE TABLE IF NOT EXISTS coverage ("
+                " ticker TEXT NOT NULL, start REAL NOT NULL, end REAL NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS coverage_ticker ON coverage (ticker);"
+            )
+            cutoff = time.time() - self.retention_days * DAY
+            conn.execute("DELETE FROM news WHERE published < ?", (cutoff,))
+            conn.execute("DELETE FROM coverage WHERE end < ?", (cutoff,))
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _coverage(self, ticker: str) -> List[Tuple[float, float]]:
+        with self._db_lock:
+            rows = self._db().execute("SELECT start, end FROM coverage WHERE ticker = ?", (ticker,)).fetchall()
+        return _merge([(s, e) for s, e in rows])
+
+    def _store(self, ticker: str, items: List[Any], now: float,
+               covered: Optional[Tuple[float, float]] = None) -> int:
+        """
+        기사 병합 저장 (이미 있는 URL 은 first_seen 포함 유지) + covered 구간이 있으면 coverage 병합.
+        게시 시각이 없는 기사는 published = first_seen = now. 새로 들어간 기사 수 반환
+        """
+        rows = []
+        for item in items:
+            key, published = item_identity(item)
+            if published is None:
+                self.counters["undated"] += 1
+            rows.append((ticker, key, published or now, now, json.dumps(item, ensure_ascii=False, default=str)))
+        merged = _merge(self._coverage(ticker) + [covered]) if covered else None
+        with self._db_lock:
+            db = self._db()
+            before = db.total_changes
+            db.executemany("INSERT OR IGNORE INTO news (ticker, url_hash, published, first_seen, item) "
+                           "VALUES (?, ?, ?, ?, ?)", rows)
+            inserted = db.total_changes - before
+            if merged is not None:
+                db.execute("DELETE FROM coverage WHERE ticker = ?", (ticker,))
+                db.executemany("INSERT INTO coverage (ticker, start, end) VALUES (?, ?, ?)",
+                               [(ticker, s, e) for s, e in merged])
+            db.commit()
+        return inserted
+
+    def _query(self, ticker: str, since: float) -> List[Any]:
+        with self._db_lock:
+            rows = self._db().execute(
+                "SELECT item FROM news WHERE ticker = ? AND published >= ? ORDER BY published DESC LIMIT ?",
+                (ticker, since, self.max_items),
+            ).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    # ---------- 조회 ----------
+    def plan(self, coverage: List[Tuple[float, float]], days: int, now: float) -> Optional[int]:
+        """상류에 요청할 lookback 일수 (None 이면 아카이브만으로 충분)"""
+        window_start = now - days * DAY
+        latest = max(coverage, key=lambda iv: iv[1]) if coverage else None
+        if latest is None or latest[0] > window_start:
+            return days  # 창의 오래된 쪽이 비어 있음 → 툴은 '최근 N일'만 받으므로 전체 창 조회
+        gap = now - latest[1]
+        if gap <= self.refresh:
+            return None
+        return min(days, max(1, math.ceil(gap / DAY)))
+
+    async def lookback(self, ticker: str, days: int,
+                       fetch: Callable[[int], Awaitable[Any]], ranged: bool = True) -> List[Any]:
+        """
+        [now - days, now] 창의 기사 목록 (최신순, 게시 시각 없으면 first_seen 기준).
+        fetch(lookback_days): 상류 뉴스 툴 호출 → 빈 구간만 요청하고 결과는 아카이브에 병합
+        ranged=False: 상류가 기간을 무시 → coverage 없이 refresh 간격으로 피드 전체 재조회
+        """
+        ticker = ticker.strip().upper()
+        async with self._locks.setdefault(ticker, asyncio.Lock()):
+            now = time.time()
+            if ranged:
+                need = self.plan(await asyncio.to_thread(self._coverage, ticker), days, now)
+            else:
+                last = self._feed_fetched.get(ticker)
+                need = None if last is not None and now - last <= self.refresh else days
+            if need is None:
+                self.counters["archive"] += 1
+            else:
+                self.counters[("full" if need >= days else "partial") if ranged else "feed"] += 1
+                items = split_items(await fetch(need))
+                self.counters["upstream_items"] += len(items)
+                self.counters["inserted"] += await asyncio.to_thread(
+                    self._store, ticker, items, now, (now - need * DAY, now) if ranged else None)
+                if not ranged:
+                    self._feed_fetched[ticker] = now
+            return await asyncio.to_thread(self._query, ticker, now - days * DAY)
+
+    def close(self) -> None:
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "path": self.path, "refresh": self.refresh, **self.counters}
+
+
+# 전역 인스턴스 (main.py news 단계에서 사용, lifespan 종료 시 close)
+news_archive = NewsArchive()
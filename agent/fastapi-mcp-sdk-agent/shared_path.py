@@ -0,0 +1,15 @@
+"""
+공용 패키지(a2a_common) import 경로.
+- 이 앱은 자기 디렉터리에서 평면 모듈로 실행되므로 (uvicorn main:app), a2a_common 을 쓰는 모듈은
+  import 전에 add_agent_dir() 로 agent/ 를 sys.path 에 붙인다
+"""
+import sys
+from pathlib import Path
+
+AGENT_DIR = str(Path(__file__).resolve().parent.parent)
+
+
+def add_agent_dir() -> None:
+    # 앱 모듈이 우선하도록 맨 뒤에 추가
+    if AGENT_DIR not in sys.path:
+        sys.path.append(AGENT_DIR)
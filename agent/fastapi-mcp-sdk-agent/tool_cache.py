@@ -0,0 +1,52 @@
+"""
+MCP 툴 결과 캐시: 툴별 정책 + 전역 인스턴스. TTLCache/CachePolicy 는 a2a_common.cache (ticker-score-agent 와 공용).
+"""
+from __future__ import annotations
+import json
+import os
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import shared_path
+
+shared_path.add_agent_dir()
+from a2a_common.cache import CachePolicy, TTLCache  # noqa: E402
+
+__all__ = ["CachePolicy", "TTLCache", "tool_cache", "tool_cache_key", "tool_cache_policy"]
+
+
+# ───────── 툴별 캐시 정책 ─────────
+MINUTE, HOUR, DAY = 60, 3600, 86400
+
+_QUOTE = CachePolicy(ttl=5, stale=30)
+_NEWS = CachePolicy(ttl=2 * MINUTE, stale=10 * MINUTE)
+
+# 없는 툴은 캐시하지 않음. 인자에 따라 달라지면 callable
+TOOL_CACHE_POLICIES: Dict[str, CachePolicy | Callable[[dict], CachePolicy]] = {
+    "get_stock_info": _QUOTE, "quote": _QUOTE, "get_quote": _QUOTE,
+    "get_yahoo_finance_news": _NEWS, "get_news": _NEWS, "news": _NEWS,
+    "search_news": _NEWS, "get_company_news": _NEWS,
+    "get_historical_stock_prices": CachePolicy(ttl=5 * MINUTE, stale=HOUR),
+    "get_stock_actions": CachePolicy(ttl=DAY, stale=DAY),
+    # financial_type: income_stmt / balance_sheet / cashflow, 분기는 quarterly_ 접두
+    "get_financial_statement": lambda args: (
+        CachePolicy(ttl=DAY, stale=DAY) if str(args.get("financial_type", "")).startswith("quarterly_")
+        else CachePolicy(ttl=7 * DAY, stale=7 * DAY)
+    ),
+    "get_holder_info": CachePolicy(ttl=DAY, stale=DAY),
+    "get_option_expiration_dates": CachePolicy(ttl=HOUR, stale=HOUR),
+    "get_option_chain": CachePolicy(ttl=MINUTE, stale=5 * MINUTE),
+    "get_recommendations": CachePolicy(ttl=6 * HOUR, stale=DAY),
+}
+
+
+def tool_cache_policy(name: str, arguments: Dict[str, Any]) -> Optional[CachePolicy]:
+    policy = TOOL_CACHE_POLICIES.get(name)
+    return policy(arguments) if callable(policy) else policy
+
+
+def tool_cache_key(name: str, arguments: Dict[str, Any]) -> Tuple[str, str]:
+    return name, json.dumps(arguments, sort_keys=True, ensure_ascii=False, default=str)
+
+
+# 전역 인스턴스
+tool_cache = TTLCache("mcp-tools", maxsize=int(os.getenv("MCP_TOOL_CACHE_MAX_ENTRIES", "2048")))
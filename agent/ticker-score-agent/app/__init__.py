@@ -0,0 +1,7 @@
+# agent/ 를 sys.path 에 붙여 공용 패키지(a2a_common)를 import (앱 모듈이 우선하도록 맨 뒤에 추가)
+import sys
+from pathlib import Path
+
+_AGENT_DIR = str(Path(__file__).resolve().parents[2])
+if _AGENT_DIR not in sys.path:
+    sys.path.append(_AGENT_DIR)
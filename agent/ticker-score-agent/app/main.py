@@ -1,10 +1,34 @@
 from __future__ import annotations
 import json
-from fastapi import FastAPI, Query
-from fastapi.responses import JSONResponse, StreamingResponse
-from app.workflow.graph import run_once, run_stream
-
-app = FastAPI(title="Parallel MCP + CLOVA X Scoring")
+from contextlib import asynccontextmanager
+import time
+from typing import Iterable, List, Literal, Optional
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from app.metrics import CONTENT_TYPE, HTTP_IN_FLIGHT, HTTP_SECONDS, HTTPMetricsMiddleware, registry
+from app.settings import settings
+from app.workflow import graph as graph_mod
+from app.workflow.graph import (
+    graph_lifespan,
+    graph_stats,
+    normalize_ticker,
+    parse_sources,
+    run_batch,
+    run_once_coalesced,
+    run_stream_coalesced,
+    run_with_trace,
+    score_flight,
+    stream_flight,
+)
+from app.workflow.llm_batcher import score_batcher
+from app.workflow.bar_store import bar_store
+from app.workflow.fundamentals import fundamentals_cache
+from app.workflow.mcp_clients import tool_cache
+from app.workflow.mcp_pool import mcp_pool
+from app.workflow.nodes import technicals_batcher
+from app.workflow.score_cache import score_cache
+from app.workflow.trace import resolve_trace_level, set_trace_level, trace_level
 
 import logging
 logging.basicConfig(
@@ -13,27 +37,188 @@ logging.basicConfig(
 )
 LOGGER = logging.getLogger("ticker-graph")
 
-@app.get("/score")
-async def score(ticker: str = Query(..., min_length=1)):
-    result = await run_once(ticker)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # MCP 세션 풀: 앱 기동 시 미리 띄우고 종료 시 자식 프로세스까지 정리
+    if settings.mcp_pool_enabled:
+        await mcp_pool.start()
+    try:
+        async with graph_lifespan():
+            yield
+    finally:
+        await mcp_pool.close()
+
+
+app = FastAPI(title="Parallel MCP + CLOVA X Scoring", lifespan=lifespan)
+
+
+def _collect_stats() -> Iterable:
+    """기존 stats() 들을 스크레이프 시점에 메트릭으로 변환 (hot path 비용 없음)"""
+    caches = {"tool": tool_cache.stats(), "score": score_cache.stats(), "fundamentals": fundamentals_cache.stats()}
+    yield ("ticker_cache_lookups_total", "counter", "Cache lookups by result", [
+        ("ticker_cache_lookups_total", {"cache": c, "result": r}, st[k])
+        for c, st in caches.items()
+        for r, k in (("hit", "hits"), ("stale", "stale_hits"), ("miss", "misses"))
+    ])
+    yield ("ticker_cache_entries", "gauge", "Cache entries", [
+        ("ticker_cache_entries", {"cache": c}, st["size"]) for c, st in caches.items()
+    ])
+    flights = {"score": score_flight.stats(), "stream": stream_flight.stats()}
+    yield ("ticker_singleflight_requests_total", "counter", "Single-flight requests by outcome", [
+        ("ticker_singleflight_requests_total", {"flight": f, "outcome": o}, st[k])
+        for f, st in flights.items()
+        for o, k in (("executed", "executions"), ("joined", "joined"))
+    ])
+    pools = mcp_pool.stats()
+    yield ("ticker_mcp_pool_sessions", "gauge", "MCP pool sessions by state", [
+        ("ticker_mcp_pool_sessions", {"server": s, "state": k}, st[k])
+        for s, st in pools.items() for k in ("size", "idle", "alive")
+    ])
+    yield ("ticker_mcp_pool_respawns_total", "counter", "MCP pool session respawns", [
+        ("ticker_mcp_pool_respawns_total", {"server": s}, st["respawns"]) for s, st in pools.items()
+    ])
+    yield ("ticker_llm_batch_calls_total", "counter", "LLM calls made by the score batcher", [
+        ("ticker_llm_batch_calls_total", {}, score_batcher.stats()["llm_calls"])
+    ])
+    bars = bar_store.stats()
+    yield ("ticker_bar_store_lookups_total", "counter", "Bar store lookups by upstream fetch", [
+        ("ticker_bar_store_lookups_total", {"fetch": k}, bars[k]) for k in ("warm", "incremental", "full")
+    ])
+
+
+registry.add_collector(_collect_stats)
+
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/mcp/pool")
+async def mcp_pool_stats():
+    return JSONResponse(mcp_pool.stats())
+
+
+@app.get("/stats")
+async def stats():
     return JSONResponse({
+        "singleflight": {
+            "score": score_flight.stats(),
+            "stream": stream_flight.stats(),
+        },
+        "mcp_pool": mcp_pool.stats(),
+        "tool_cache": tool_cache.stats(),
+        "score_cache": score_cache.stats(),
+        "fundamentals_cache": fundamentals_cache.stats(),
+        "llm_batch": score_batcher.stats(),
+        "technicals_batch": technicals_batcher.stats(),
+        "bar_store": bar_store.stats(),
+        "graph": graph_stats(),
+        "checkpointer": (
+            graph_mod.memory.stats() if hasattr(graph_mod.memory, "stats")
+            else {"mode": settings.checkpointer_mode}
+        ),
+    })
+
+# sources: 쉼표 구분 데이터 소스 (price, news, history, options, fundamentals, filings). 없으면 전체
+SOURCES_QUERY = Query(None, description="comma-separated: price,news,history,options,fundamentals,filings")
+
+
+def _sources(raw: Iterable[str] | str | None):
+    try:
+        return parse_sources(raw)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+
+@app.get("/score")
+async def score(request: Request, ticker: str = Query(..., min_length=1),
+                sources: Optional[str] = SOURCES_QUERY):
+    level = resolve_trace_level(request.headers.get("x-trace-level"))
+    selected = _sources(sources)
+    with trace_level(level):
+        result = await run_once_coalesced(ticker, selected)
+    body = {
         "ticker":    result["ticker"],
         "score":     result["score"],
-        "rationale": result["rationale"]
-    })
+        "rationale": result["rationale"],
+        "cached":    result["cached"],
+    }
+    if level in ("preview", "full"):
+        body["trace"] = result["trace"]
+    return JSONResponse(body)
 
 @app.get("/score/stream")
-async def score_stream(ticker: str = Query(..., min_length=1)):
+async def score_stream(request: Request, ticker: str = Query(..., min_length=1),
+                       sources: Optional[str] = SOURCES_QUERY):
+    level = resolve_trace_level(request.headers.get("x-trace-level"))
+    selected = _sources(sources)
+
     async def sse():
-        async for ev in run_stream(ticker):
-            yield f"event: progress\ndata: {json.dumps(ev, ensure_ascii=False)}\n\n"
+        set_trace_level(level)  # 스트림을 도는 task 컨텍스트에 지정
+        async for ev in run_stream_coalesced(ticker, selected):
+            # 노드 완료는 progress, score 노드 토큰 스트림은 delta / score 이벤트로
+            event = ev["event"] if isinstance(ev.get("event"), str) else "progress"
+            yield f"event: {event}\ndata: {json.dumps(ev, ensure_ascii=False)}\n\n"
         yield f"event: done\ndata: {json.dumps({'ticker': ticker}, ensure_ascii=False)}\n\n"
 
     return StreamingResponse(sse(), media_type="text/event-stream")
 
+class BatchScoreRequest(BaseModel):
+    tickers: List[str] = Field(..., min_length=1)
+    concurrency: Optional[int] = Field(None, ge=1)
+    format: Literal["ndjson", "sse"] = "ndjson"
+    sources: Optional[List[str]] = None  # 없으면 전체
+
+
+@app.post("/score/batch")
+async def score_batch(req: BatchScoreRequest, request: Request):
+    level = resolve_trace_level(request.headers.get("x-trace-level"))
+    # 정규화 + 중복 제거 (순서 유지)
+    tickers = list(dict.fromkeys(normalize_ticker(t) for t in req.tickers if t.strip()))
+    if len(tickers) > settings.batch_max_tickers:
+        raise HTTPException(413, f"too many tickers: {len(tickers)} > {settings.batch_max_tickers}")
+    concurrency = min(req.concurrency or settings.batch_concurrency, settings.batch_concurrency)
+    selected = _sources(req.sources)
+
+    def _fmt(event: str, data: dict) -> str:
+        body = json.dumps(data, ensure_ascii=False)
+        return f"{body}\n" if req.format == "ndjson" else f"event: {event}\ndata: {body}\n\n"
+
+    async def gen():
+        set_trace_level(level)
+        t0 = time.perf_counter()
+        ok = failed = 0
+        async for r in run_batch(tickers, concurrency, selected):
+            if "error" in r:
+                failed += 1
+            else:
+                ok += 1
+            yield _fmt("result", {"type": "result", **r})
+        yield _fmt("done", {
+            "type": "done",
+            "count": len(tickers),
+            "ok": ok,
+            "failed": failed,
+            "elapsed_ms": int((time.perf_counter() - t0) * 1000),
+        })
+
+    media_type = "application/x-ndjson" if req.format == "ndjson" else "text/event-stream"
+    return StreamingResponse(gen(), media_type=media_type)
+
+
 @app.get("/score/trace")
-async def score_trace(ticker: str = Query(...)):
+async def score_trace(ticker: str = Query(...), sources: Optional[str] = SOURCES_QUERY):
+    selected = _sources(sources)
+
     async def sse():
-        async for ev in run_with_trace(ticker):
+        set_trace_level("full")
+        async for ev in run_with_trace(ticker, selected):
             yield f"event: {ev['event']}\ndata: {json.dumps(ev, ensure_ascii=False)}\n\n"
     return StreamingResponse(sse(), media_type="text/event-stream")
+
+
+# HTTP 메트릭: 라벨용 경로는 모든 라우트 등록 후 계산
+_ROUTE_PATHS = frozenset(getattr(r, "path", "") for r in app.routes)
+app.add_middleware(HTTPMetricsMiddleware, in_flight=HTTP_IN_FLIGHT, seconds=HTTP_SECONDS, paths=_ROUTE_PATHS)
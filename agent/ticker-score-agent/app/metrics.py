@@ -0,0 +1,31 @@
+# app/metrics.py
+"""
+앱 메트릭 정의. 레지스트리/포맷/HTTP 미들웨어는 a2a_common.metrics (fastapi-mcp-sdk-agent 와 공용).
+"""
+from __future__ import annotations
+from a2a_common.metrics import CONTENT_TYPE, HTTPMetricsMiddleware, Registry
+
+__all__ = [
+    "CONTENT_TYPE", "HTTPMetricsMiddleware", "registry", "NODE_SECONDS", "TOOL_SECONDS",
+    "LLM_SECONDS", "LLM_STREAM_SECONDS", "MCP_SPAWN_SECONDS", "ERRORS", "HTTP_IN_FLIGHT",
+    "HTTP_SECONDS",
+]
+
+registry = Registry()
+
+NODE_SECONDS = registry.histogram(
+    "ticker_node_duration_seconds", "Graph node latency", ("node",))
+TOOL_SECONDS = registry.histogram(
+    "ticker_mcp_tool_duration_seconds", "MCP tool call latency (cache misses only)", ("tool",))
+LLM_SECONDS = registry.histogram(
+    "ticker_llm_duration_seconds", "LLM call latency", ("mode",))
+LLM_STREAM_SECONDS = registry.histogram(
+    "ticker_llm_stream_latency_seconds", "Time from LLM call start to first token / score in stream", ("event",))
+MCP_SPAWN_SECONDS = registry.histogram(
+    "ticker_mcp_spawn_duration_seconds", "MCP session spawn-to-ready latency", ("launch",))
+ERRORS = registry.counter(
+    "ticker_errors_total", "Errors by stage", ("stage",))
+HTTP_IN_FLIGHT = registry.gauge(
+    "ticker_http_requests_in_flight", "In-flight HTTP requests", ("path",))
+HTTP_SECONDS = registry.histogram(
+    "ticker_http_request_duration_seconds", "HTTP request latency (until last response body chunk)", ("path",))
@@ -11,6 +11,101 @@ class Settings(BaseSettings):
 
     mcp_config_path: str = str(BASE_DIR / "ticker-score-agent/mcp_config.json")
 
+    # MCP 세션 풀 (lifespan 에서 미리 띄워 두는 stdio 세션)
+    mcp_pool_enabled: bool = True
+    mcp_pool_size: int = 2                   # 서버당 세션(자식 프로세스) 수
+    mcp_pool_checkout_timeout: float = 30.0  # 빈 세션 대기 최대 시간(초)
+    mcp_pool_spawn_timeout: float = 60.0     # 세션 기동(initialize 포함) 최대 시간(초)
+    mcp_pool_ping_timeout: float = 5.0
+    mcp_pool_health_interval: float = 30.0   # 유휴 세션 ping 주기(초), 0 이면 끔
+    mcp_pool_warm_spares: int = 0            # 서버당 로테이션 밖 예비 세션 수 (재기동 시 즉시 교체용)
+    # uv: 설정대로 'uv --directory … run' 실행 / direct: 기동 시 uv 로 인터프리터를 1회 해석 후 직접 exec
+    mcp_launch_mode: str = "uv"
+
+    # yahoo 노드 호출별 타임아웃(초) - 느린 뉴스가 시세를 막지 않도록 개별 적용
+    yahoo_info_timeout: float = 10.0
+    yahoo_news_timeout: float = 10.0
+
+    # history 노드: 가격 이력(OHLCV) → 기술적 지표 (app.workflow.technicals)
+    history_enabled: bool = True
+    history_period: str = "6mo"              # get_historical_stock_prices period (MA50 등 창보다 길게)
+    history_interval: str = "1d"
+    history_timeout: float = 10.0
+    history_periods_per_year: float = 252.0  # 변동성 연율화 (interval 이 1d 기준)
+    # run_batch 안의 history 노드: 시간창(ms)/최대 크기까지 모인 종목의 지표를 (N, T) 배열 1개로 계산
+    technicals_batch_enabled: bool = True
+    technicals_batch_window_ms: float = 5.0
+    technicals_batch_max_size: int = 64
+    # 로컬 OHLCV 저장소 (app.workflow.bar_store): 마지막 봉 이후만 조회해 컬럼 파일에 append, memmap 으로 읽기
+    bar_store_enabled: bool = True
+    bar_store_path: str = str(BASE_DIR / "ticker-score-agent/bars")
+    bar_store_refresh: float = 300.0         # 마지막 조회 후 이 시간(초) 안이면 상류 조회 없음
+    bar_store_max_open: int = 256            # 동시에 memmap 으로 열어 둘 (티커, 간격) 수
+
+    # options 노드: 가까운 만기부터 calls/puts 체인을 동시성 상한 안에서 조회 (체인 TTL 은 TOOL_CACHE_POLICIES)
+    options_enabled: bool = True
+    options_max_expirations: int = 8         # 조회할 최대 만기 수 (만기당 calls + puts 2회 호출)
+    options_concurrency: int = 8             # 종목당 동시 체인 호출 수
+    options_call_timeout: float = 5.0        # 체인 호출 1회 타임아웃(초)
+    options_timeout: float = 12.0            # 노드 전체 예산(초), 넘으면 받은 체인만으로 계산
+
+    # fundamentals 노드: 재무제표 6종 + 주요 주주 동시 조회 → 재무 비율 (다음 실적 발표 예상 시각까지 캐시)
+    fundamentals_enabled: bool = True
+    fundamentals_timeout: float = 10.0       # 호출 1회 타임아웃(초)
+    fundamentals_report_lag_days: float = 45.0   # 분기 말 → 분기 실적 공시까지 (10-Q 기한 40~45일)
+    fundamentals_annual_lag_days: float = 75.0   # 회계연도 말 → 연간 실적 공시까지 (10-K 기한 60~90일)
+    fundamentals_overdue_ttl: float = 21600.0    # 예상 공시일이 지났는데 새 분기가 없으면 이 간격(초)으로 재확인
+    fundamentals_max_ttl: float = 8640000.0      # TTL 상한(초, 100일)
+    fundamentals_retry_ttl: float = 300.0        # 조회 일부 실패/데이터 없음 결과의 TTL(초)
+    fundamentals_stale: float = 86400.0          # 만료 후 stale 값을 주면서 백그라운드 갱신하는 기간(초)
+    fundamentals_cache_max_entries: int = 4096
+
+    # 뉴스 중복 제거/랭킹 (app.workflow.news_rank)
+    news_top_k: int = 5                      # 프롬프트에 넣을 기사 수
+    news_max_candidates: int = 2000          # 랭킹 대상 최대 기사 수 (정규화 단계에서 자름)
+    news_dedup_max_distance: int = 12        # SimHash(64bit) 해밍 거리 이하면 같은 기사
+    news_half_life_hours: float = 24.0       # 최신성 반감기
+    news_weight_recency: float = 0.5
+    news_weight_source: float = 0.3
+    news_weight_relevance: float = 0.2
+    news_source_weights: dict[str, float] = {}  # 도메인/퍼블리셔 → 가중치 (기본표 덮어쓰기, JSON)
+
+    # MCP 툴 결과 캐시 (툴별 TTL 정책은 mcp_clients.TOOL_CACHE_POLICIES)
+    tool_cache_enabled: bool = True
+    tool_cache_max_entries: int = 2048
+
+    # LLM 점수 캐시 (입력 지문 기준)
+    score_cache_enabled: bool = True
+    score_cache_ttl: float = 300.0
+    score_cache_max_entries: int = 1024
+    score_cache_price_bucket_pct: float = 0.5  # 가격 버킷 폭(%)
+    score_cache_path: str = ""                  # SQLite 경로, 비우면 메모리만
+
+    # POST /score/batch
+    batch_concurrency: int = 8     # 동시 그래프 실행 상한 (요청 값은 이 값으로 잘림)
+    batch_max_tickers: int = 500
+
+    # node_score LLM 마이크로배치 (시간창 또는 최대 크기까지 모아 1회 호출)
+    llm_batch_enabled: bool = False
+    llm_batch_window_ms: float = 20.0
+    llm_batch_max_size: int = 8
+    llm_batch_mode: str = "prompt"   # "prompt"(다종목 프롬프트) | "abatch"(llm.abatch)
+
+    # node_score 토큰 스트리밍 (배치 미사용 시): /score/stream 으로 delta/score 이벤트 전달
+    llm_stream_enabled: bool = True
+
+    # LangGraph 체크포인터: none | memory(스레드 TTL/LRU) | sqlite(langgraph-checkpoint-sqlite 필요)
+    checkpointer_mode: str = "memory"
+    checkpointer_max_threads: int = 1000
+    checkpointer_ttl: float = 600.0
+    checkpointer_path: str = str(BASE_DIR / "ticker-score-agent/checkpoints.sqlite")
+
+    # traced() 트레이스 레벨: off | timings | preview | full
+    trace_level: str = "timings"
+    trace_sample_rate: float = 0.0        # 이 확률로 trace_sampled_level 적용
+    trace_sampled_level: str = "full"
+    trace_allow_header: bool = True       # X-Trace-Level 헤더로 요청별 지정 허용
+
     model_config = SettingsConfigDict(
         env_file=str(BASE_DIR / ".env"),  # 절대경로 지정
         extra="ignore"
@@ -0,0 +1,248 @@
+# app/workflow/bar_store.py
+"""
+로컬 OHLCV 시계열 저장소 (티커 × 봉 간격별 고정폭 컬럼 파일 + numpy.memmap).
+- 배치: <root>/<interval>/<TICKER>/{ts.i8, open.f8, high.f8, low.f8, close.f8, volume.f8} + meta.json
+  ts 는 int64 epoch 초, 나머지는 float64. 봉 수 = ts 파일 크기 / 8 (ts 를 마지막에 써서 기준으로 삼음)
+- 읽기: 컬럼별 memmap(읽기 전용)에서 기간 슬라이스 → 복사 없는 뷰를 그대로 지표 계산에 넘김
+- 갱신: 마지막 저장 봉 이후 봉만 파일 끝에 덧붙임. 마지막 봉(장중 미완성)이 다시 오면 그 자리에 덮어씀
+  (파일을 줄이지 않으므로 다른 곳이 들고 있는 memmap 뷰가 깨지지 않음)
+- 상류 get_historical_stock_prices 는 period 문자열만 받으므로, 마지막 봉 이후 공백을 덮는 가장 짧은 period 로 조회.
+  저장 구간보다 긴 기간을 요청하면 그 기간 전체를 받아 새 파일로 교체 (os.replace → 기존 뷰는 옛 파일 유지)
+"""
+from __future__ import annotations
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.settings import settings
+from app.workflow.technicals import asof_date, parse_history
+
+LOGGER = logging.getLogger("ticker-graph")
+
+COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("open", "<f8"), ("high", "<f8"), ("low", "<f8"), ("close", "<f8"), ("volume", "<f8"),
+)
+TS_DTYPE = "<i8"
+DAY = 86400
+
+# yfinance period → 초 (조회 공백을 덮는 가장 짧은 period 선택용, 오름차순)
+PERIOD_SECONDS: Tuple[Tuple[str, float], ...] = (
+    ("5d", 7 * DAY), ("1mo", 31 * DAY), ("3mo", 92 * DAY), ("6mo", 183 * DAY),
+    ("1y", 366 * DAY), ("2y", 731 * DAY), ("5y", 1827 * DAY), ("10y", 3653 * DAY),
+)
+_SAFE = re.compile(r"[^A-Za-z0-9._^=-]")
+
+
+def period_seconds(period: str, now: Optional[float] = None) -> float:
+    """period 문자열 → 초 (max 는 무한대, ytd 는 올해 1월 1일부터)"""
+    if period == "max":
+        return float("inf")
+    if period == "ytd":
+        now = time.time() if now is None else now
+        jan1 = datetime.fromtimestamp(now, timezone.utc).replace(month=1, day=1, hour=0, minute=0,
+                                                                 second=0, microsecond=0)
+        return now - jan1.timestamp()
+    if period == "1d":
+        return DAY
+    return dict(PERIOD_SECONDS).get(period, 31 * DAY)
+
+
+def covering_period(seconds: float) -> str:
+    """공백(초)을 덮는 가장 짧은 period (주말/휴장을 감안해 5d 부터)"""
+    return next((p for p, s in PERIOD_SECONDS if s >= seconds), "max")
+
+
+class BarStore:
+    """
+    티커·봉 간격별 OHLCV 컬럼 파일 저장소.
+    동기 파일 I/O 는 to_thread 로, 같은 (ticker, interval) 의 동시 갱신은 키별 락으로 한 번만 상류 조회.
+    """
+
+    def __init__(self, root: str, refresh: float = 300.0, max_open: int = 256) -> None:
+        self.root = Path(root).expanduser()
+        self.refresh = refresh        # 마지막 조회 후 이 시간(초) 안이면 상류 조회 없이 저장분만 사용
+        self.max_open = max(1, max_open)  # memmap 은 파일마다 fd 를 잡으므로 열어 두는 키 수 상한 (LRU)
+        self._views: "OrderedDict[Tuple[str, str], Dict[str, np.ndarray]]" = OrderedDict()
+        self._checked: set[Tuple[str, str]] = set()
+        self._meta: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self.counters: Dict[str, int] = {"warm": 0, "incremental": 0, "full": 0, "appended": 0, "rewritten": 0,
+                                         "unparsed": 0}
+
+    # ---------- 파일 ----------
+    def _dir(self, key: Tuple[str, str]) -> Path:
+        ticker, interval = key
+        return self.root / _SAFE.sub("_", interval) / _SAFE.sub("_", ticker)
+
+    def _load_meta(self, key: Tuple[str, str]) -> Dict[str, Any]:
+        meta = self._meta.get(key)
+        if meta is None:
+            try:
+                meta = json.loads((self._dir(key) / "meta.json").read_text("utf-8"))
+            except (OSError, ValueError):
+                meta = {}
+            self._meta[key] = meta
+        return meta
+
+    def _save_meta(self, key: Tuple[str, str], meta: Dict[str, Any]) -> None:
+        path = self._dir(key) / "meta.json"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(meta), "utf-8")
+        os.replace(tmp, path)
+        self._meta[key] = meta
+
+    def _open(self, key: Tuple[str, str]) -> Dict[str, np.ndarray]:
+        """컬럼별 읽기 전용 memmap (봉 수는 ts 기준). 파일이 바뀌기 전까지 캐시"""
+        views = self._views.get(key)
+        if views is not None:
+            self._views.move_to_end(key)
+            return views
+        if key not in self._checked:
+            self._trim(key)
+            self._checked.add(key)
+        d = self._dir(key)
+        n = (d / "ts.i8").stat().st_size // 8 if (d / "ts.i8").exists() else 0
+        views = {}
+        for name, dtype in (("ts", TS_DTYPE),) + COLUMNS:
+            path = d / f"{name}.{dtype[1:]}"
+            # 빈 파일은 mmap 할 수 없으므로 빈 배열
+            views[name] = (np.memmap(path, dtype=dtype, mode="r", shape=(n,)) if n
+                           else np.empty(0, dtype=dtype))
+        self._views[key] = views
+        while len(self._views) > self.max_open:
+            self._views.popitem(last=False)  # 밖에서 쥔 뷰는 참조가 끝날 때 닫힘
+        return views
+
+    def _write(self, key: Tuple[str, str], bars: Dict[str, np.ndarray], replace: bool) -> int:
+        """
+        봉 저장 → 새로 늘어난 봉 수.
+        replace: 새 파일에 전부 쓰고 교체 / 아니면 마지막 저장 봉 이후만 append (같은 시각 봉은 제자리 덮어쓰기)
+        """
+        d = self._dir(key)
+        d.mkdir(parents=True, exist_ok=True)
+        ts = bars["ts"]
+        ok = np.isfinite(ts)
+        ts = ts[ok].astype(np.int64)
+        order = np.argsort(ts, kind="stable")
+        cols = {name: np.asarray(bars[name], dtype=dtype)[ok][order] for name, dtype in COLUMNS}
+        ts = ts[order]
+        if replace:
+            for name, dtype in COLUMNS + (("ts", TS_DTYPE),):
+                path = d / f"{name}.{dtype[1:]}"
+                tmp = path.with_suffix(".tmp")
+                (ts if name == "ts" else cols[name]).astype(dtype).tofile(tmp)
+                os.replace(tmp, path)
+            self._views.pop(key, None)
+            return len(ts)
+
+        stored = self._open(key)["ts"]
+        last = int(stored[-1]) if len(stored) else None
+        start = 0
+        if last is not None:
+            start = int(np.searchsorted(ts, last, side="left"))
+            if start < len(ts) and ts[start] == last:
+                # 마지막 봉 갱신 (장중 미완성 봉) - 크기는 그대로
+                for name, dtype in COLUMNS:
+                    with open(d / f"{name}.{dtype[1:]}", "r+b") as f:
+                        f.seek(-8, os.SEEK_END)
+                        f.write(cols[name][start:start + 1].tobytes())
+                start += 1
+        if start >= len(ts):
+            return 0
+        # 값 컬럼 먼저, ts 를 마지막에 (중간에 죽어도 ts 기준 봉 수까지만 유효)
+        for name, dtype in COLUMNS + (("ts", TS_DTYPE),):
+            with open(d / f"{name}.{dtype[1:]}", "ab") as f:
+                f.write((ts if name == "ts" else cols[name])[start:].tobytes())
+        self._views.pop(key, None)
+        return len(ts) - start
+
+    def _trim(self, key: Tuple[str, str]) -> None:
+        """이전 append 가 중간에 끊겨 값 컬럼이 ts 보다 길면 잘라 맞춤 (시작 시 1회)"""
+        d = self._dir(key)
+        if not (d / "ts.i8").exists():
+            return
+        size = (d / "ts.i8").stat().st_size
+        for name, dtype in COLUMNS:
+            path = d / f"{name}.{dtype[1:]}"
+            if path.exists() and path.stat().st_size > size:
+                os.truncate(path, size)
+
+    def read(self, ticker: str, interval: str, since: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """저장된 봉 (since 이후) → 컬럼별 memmap 뷰 (복사 없음)"""
+        views = self._open((ticker.strip().upper(), interval))
+        start = int(np.searchsorted(views["ts"], since, side="left")) if since is not None and len(views["ts"]) else 0
+        return {name: v[start:] for name, v in views.items()}
+
+    # ---------- 조회 ----------
+    def plan(self, key: Tuple[str, str], period: str, now: float) -> Tuple[Optional[str], bool]:
+        """(상류에 요청할 period 또는 None, 전체 교체 여부)"""
+        meta = self._load_meta(key)
+        views = self._open(key)
+        want = period_seconds(period, now)
+        if not len(views["ts"]) or meta.get("covered_from") is None or meta["covered_from"] > now - want:
+            return period, True
+        if now - meta.get("fetched_at", 0) <= self.refresh:
+            return None, False
+        return covering_period(now - float(views["ts"][-1])), False
+
+    def _sync(self, key: Tuple[str, str], period: str, data: Any, replace: bool, now: float) -> Optional[int]:
+        """
+        상류 결과 저장 → 새로 늘어난 봉 수. 읽을 봉이 없으면(에러 문자열, 타임아웃 payload 등) None 이고
+        메타를 건드리지 않음 → 구간 커버리지가 실제로 쓴 봉보다 앞서 나가지 않고, 다음 요청이 다시 조회
+        """
+        bars = parse_history(data)
+        if bars is None or not np.isfinite(bars["ts"]).any():
+            return None
+        n = self._write(key, bars, replace)
+        meta = dict(self._load_meta(key))
+        if replace and n:
+            want = period_seconds(period, now)
+            meta["covered_from"] = now - want if want != float("inf") else 0.0
+        meta["fetched_at"] = now
+        self._dir(key).mkdir(parents=True, exist_ok=True)
+        self._save_meta(key, meta)
+        return n
+
+    async def history(self, ticker: str, interval: str, period: str,
+                      fetch: Callable[[str], Awaitable[Any]]) -> Optional[Dict[str, Any]]:
+        """
+        [now - period, now] 구간 봉 → parse_history 와 같은 형태 (배열은 memmap 뷰).
+        fetch(period): 상류 get_historical_stock_prices 호출 → 빈 구간만 받아 저장
+        """
+        key = (ticker.strip().upper(), interval)
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            now = time.time()
+            need, replace = await asyncio.to_thread(self.plan, key, period, now)
+            if need is None:
+                self.counters["warm"] += 1
+            else:
+                self.counters["full" if replace else "incremental"] += 1
+                data = await fetch(need)
+                n = await asyncio.to_thread(self._sync, key, need, data, replace, now)
+                if n is None:
+                    self.counters["unparsed"] += 1
+                    LOGGER.warning("[bar-store] %s %s: unparseable %s fetch, keeping stored bars", *key, need)
+                else:
+                    self.counters["rewritten" if replace else "appended"] += n
+            want = period_seconds(period, now)
+            views = self.read(key[0], interval, None if want == float("inf") else now - want)
+        if not len(views["ts"]):
+            return None
+        return {**views, "bars": len(views["ts"]), "asof": asof_date(float(views["ts"][-1]))}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"root": str(self.root), "refresh": self.refresh, "open": len(self._views), **self.counters}
+
+
+# 전역 인스턴스 (history 노드가 사용)
+bar_store = BarStore(settings.bar_store_path, refresh=settings.bar_store_refresh,
+                     max_open=settings.bar_store_max_open)
@@ -0,0 +1,117 @@
+# app/workflow/checkpoint.py
+from __future__ import annotations
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Iterable
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from app.settings import settings
+
+LOGGER = logging.getLogger("ticker-graph")
+
+CHECKPOINTER_MODES = ("none", "memory", "sqlite")
+
+
+class BoundedMemorySaver(MemorySaver):
+    """
+    스레드(thread_id) 단위 TTL + LRU 로 제한되는 MemorySaver.
+    - put/put_writes 때마다 스레드 접근 시각 갱신
+    - 상한 초과 시 low watermark(90%)까지 오래된 스레드를 한 번에 제거 (writes/blobs 스캔 1회로 묶음)
+    - TTL 이 지난 스레드도 같은 시점에 함께 제거
+    """
+
+    def __init__(self, max_threads: int = 1000, ttl: float = 600.0, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.max_threads = max(1, max_threads)
+        self.ttl = ttl
+        self._threads: "OrderedDict[str, float]" = OrderedDict()  # thread_id -> last access
+        self.evicted = 0
+
+    def _touch(self, thread_id: str) -> None:
+        now = time.monotonic()
+        self._threads[thread_id] = now
+        self._threads.move_to_end(thread_id)
+
+        victims = []
+        low = int(self.max_threads * 0.9) if len(self._threads) > self.max_threads else None
+        for tid, ts in self._threads.items():
+            if tid == thread_id:
+                break
+            if (low is not None and len(self._threads) - len(victims) > low) or \
+                    (self.ttl > 0 and now - ts > self.ttl):
+                victims.append(tid)
+            else:
+                break
+        if victims:
+            self._evict(victims)
+
+    def _evict(self, thread_ids: Iterable[str]) -> None:
+        tids = set(thread_ids)
+        for tid in tids:
+            self._threads.pop(tid, None)
+            self.storage.pop(tid, None)
+        # writes/blobs 키의 첫 원소가 thread_id
+        for k in [k for k in self.writes if k[0] in tids]:
+            del self.writes[k]
+        for k in [k for k in self.blobs if k[0] in tids]:
+            del self.blobs[k]
+        self.evicted += len(tids)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        out = super().put(config, checkpoint, metadata, new_versions)
+        self._touch(config["configurable"]["thread_id"])
+        return out
+
+    def put_writes(self, config, writes, task_id, task_path: str = ""):
+        super().put_writes(config, writes, task_id, task_path)
+        self._touch(config["configurable"]["thread_id"])
+
+    def delete_thread(self, thread_id: str) -> None:
+        self._threads.pop(thread_id, None)
+        super().delete_thread(thread_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "threads": len(self._threads),
+            "max_threads": self.max_threads,
+            "ttl": self.ttl,
+            "evicted": self.evicted,
+            "blobs": len(self.blobs),
+            "writes": len(self.writes),
+        }
+
+
+def make_checkpointer(mode: str | None = None):
+    """
+    동기 생성 가능한 체크포인터.
+    - none: 체크포인트 없음 (무상태 스코어링)
+    - memory: BoundedMemorySaver (스레드 TTL/LRU)
+    - sqlite: 비동기 연결이 필요하므로 여기선 None, durable_checkpointer() 에서 연결
+    """
+    mode = (mode or settings.checkpointer_mode).lower()
+    if mode not in CHECKPOINTER_MODES:
+        raise ValueError(f"Unknown CHECKPOINTER_MODE: {mode} (expected one of {CHECKPOINTER_MODES})")
+    if mode == "memory":
+        return BoundedMemorySaver(
+            max_threads=settings.checkpointer_max_threads,
+            ttl=settings.checkpointer_ttl,
+        )
+    return None
+
+
+@asynccontextmanager
+async def durable_checkpointer(path: str | None = None):
+    """CHECKPOINTER_MODE=sqlite 용 AsyncSqliteSaver (선택 의존성: langgraph-checkpoint-sqlite)"""
+    try:
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    except ImportError as e:
+        raise RuntimeError(
+            "CHECKPOINTER_MODE=sqlite requires 'langgraph-checkpoint-sqlite' (pip install langgraph-checkpoint-sqlite)"
+        ) from e
+
+    async with AsyncSqliteSaver.from_conn_string(path or settings.checkpointer_path) as saver:
+        LOGGER.info("[checkpoint] sqlite saver opened: %s", path or settings.checkpointer_path)
+        yield saver
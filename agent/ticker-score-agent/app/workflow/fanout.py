@@ -0,0 +1,60 @@
+# app/workflow/fanout.py
+from __future__ import annotations
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List
+
+from app.workflow.trace import record_call
+
+
+@dataclass(frozen=True)
+class ToolCall:
+    """
+    데이터 노드가 선언하는 독립 MCP 호출 1건.
+    fn 은 mcp_clients 래퍼 형태: fn(client, ticker, **kwargs)
+    """
+    key: str
+    fn: Callable[..., Awaitable[Any]]
+    timeout: float
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class FanOutResult:
+    results: Dict[str, Any]
+    errors: Dict[str, str]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.results.get(key, default)
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.errors)
+
+
+async def fan_out(client: Any, ticker: str, calls: List[ToolCall]) -> FanOutResult:
+    """
+    독립 MCP 호출들을 동시에 실행.
+    - 호출별 timeout, 실패/타임아웃은 부분 결과로 처리 (다른 호출을 막지 않음)
+    - 호출별 소요 시간은 traced() 가 수집해 logs/trace 에 남긴다
+    """
+    async def _one(c: ToolCall):
+        t0 = time.perf_counter()
+        value, err, status = None, None, "ok"
+        try:
+            value = await asyncio.wait_for(c.fn(client, ticker, **c.kwargs), c.timeout)
+        except asyncio.TimeoutError:
+            status, err = "timeout", f"timeout after {c.timeout}s"
+        except Exception as e:
+            status, err = "error", f"{type(e).__name__}: {e}"
+        record_call(c.key, int((time.perf_counter() - t0) * 1000), status, err)
+        return c.key, value, err
+
+    results: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+    for key, value, err in await asyncio.gather(*(_one(c) for c in calls)):
+        results[key] = value
+        if err is not None:
+            errors[key] = err
+    return FanOutResult(results=results, errors=errors)
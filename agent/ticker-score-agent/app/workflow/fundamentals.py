@@ -0,0 +1,255 @@
+# app/workflow/fundamentals.py
+"""
+재무제표(손익/재무상태/현금흐름 × 연간/분기) + 주요 주주 → 재무 비율.
+- 표는 (항목 수, 기간 수) 배열로 (최신 기간이 0번 열). 마진/레버리지/성장률은 행 단위 나눗셈 한 번씩
+- 흐름 항목(매출·이익·현금흐름)은 분기 4개가 있으면 TTM 합, 아니면 최근 연간
+- 다음 실적 발표 예상 시각 = 최근 분기 말 + 한 분기 + 공시 지연(일) (report_dates). 캐시는 고정 TTL 대신 그 시각까지 유지
+  (이미 지났는데 새 분기가 없으면 overdue_ttl 간격으로 다시 확인)
+- 노드는 계산이 끝난 비율을 티커별로 캐시 → /score 마다 돌아도 대부분 MCP lease 없이 dict 조회 한 번
+"""
+from __future__ import annotations
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.settings import settings
+from a2a_common.cache import CachePolicy, TTLCache
+from app.workflow.report_dates import next_report_at, period_epoch, report_ttl
+
+# 항목 → yfinance 행 이름 후보 (앞에서부터)
+INCOME_ITEMS: Dict[str, Tuple[str, ...]] = {
+    "revenue": ("Total Revenue", "Operating Revenue"),
+    "gross_profit": ("Gross Profit",),
+    "operating_income": ("Operating Income", "EBIT"),
+    "net_income": ("Net Income", "Net Income Common Stockholders"),
+}
+BALANCE_ITEMS: Dict[str, Tuple[str, ...]] = {
+    "total_debt": ("Total Debt",),
+    "equity": ("Stockholders Equity", "Common Stock Equity", "Total Equity Gross Minority Interest"),
+    "total_liabilities": ("Total Liabilities Net Minority Interest", "Total Liabilities"),
+    "total_assets": ("Total Assets",),
+    "current_assets": ("Current Assets",),
+    "current_liabilities": ("Current Liabilities",),
+    "cash": ("Cash And Cash Equivalents", "Cash Cash Equivalents And Short Term Investments"),
+}
+CASHFLOW_ITEMS: Dict[str, Tuple[str, ...]] = {
+    "operating_cash_flow": ("Operating Cash Flow",),
+    "free_cash_flow": ("Free Cash Flow",),
+}
+
+
+# -------------------------
+# 툴 결과 파싱
+# -------------------------
+def _loads(data: Any) -> Any:
+    if isinstance(data, str):
+        try:
+            return json.loads(data)
+        except ValueError:
+            return None
+    return data
+
+
+def statement_table(data: Any, items: Dict[str, Tuple[str, ...]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    get_financial_statement 결과([{"date": ..., 행 이름: 값, ...}, ...]) → (기간 말 epoch (p,), 값 (항목 수, p)).
+    최신 기간이 0번 열, 없는 항목은 NaN
+    """
+    rows = _loads(data)
+    rows = [r for r in rows if isinstance(r, dict) and r.get("date")] if isinstance(rows, list) else []
+    rows.sort(key=lambda r: str(r["date"]), reverse=True)
+    dates = np.array([period_epoch(r["date"]) for r in rows])
+    table = np.full((len(items), len(rows)), np.nan)
+    for i, names in enumerate(items.values()):
+        for j, r in enumerate(rows):
+            v = next((r[n] for n in names if r.get(n) is not None), None)
+            try:
+                table[i, j] = float(v) if v is not None else np.nan
+            except (TypeError, ValueError):
+                pass
+    return dates, table
+
+
+def parse_holders(data: Any) -> Dict[str, Optional[float]]:
+    """get_holder_info(major_holders) 결과 → 내부자/기관 보유 비율"""
+    rows = _loads(data)
+    values: Dict[str, Any] = {}
+    if isinstance(rows, list):
+        for r in rows:
+            if isinstance(r, dict):
+                key = r.get("metric") or r.get("Breakdown") or r.get("index")
+                values[str(key)] = r.get("Value", r.get("value"))
+    elif isinstance(rows, dict):
+        values = rows.get("Value") if isinstance(rows.get("Value"), dict) else rows
+
+    def _pct(key: str) -> Optional[float]:
+        try:
+            return round(float(values[key]), 4)
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    return {"insiders_pct": _pct("insidersPercentHeld"), "institutions_pct": _pct("institutionsPercentHeld")}
+
+
+# -------------------------
+# 비율
+# -------------------------
+def _flows(q_dates: np.ndarray, q: np.ndarray, a_dates: np.ndarray,
+           a: np.ndarray) -> Tuple[np.ndarray, Optional[float], str]:
+    """흐름 항목 → (TTM 또는 최근 연간 값 (항목 수,), 기준 기간 말, "ttm" | "annual")"""
+    if q.shape[1] >= 4 and np.isfinite(q[:, :4]).all(axis=1).any():
+        return q[:, :4].sum(axis=1), float(q_dates[0]), "ttm"
+    if a.shape[1]:
+        return a[:, 0], float(a_dates[0]), "annual"
+    return np.full(q.shape[0], np.nan), None, "annual"
+
+
+def _growth(q: np.ndarray, a: np.ndarray) -> np.ndarray:
+    """전년 동기 대비 성장률 (분기 5개 이상이면 최근 분기 vs 4분기 전, 아니면 연간 전년 대비)"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if q.shape[1] >= 5:
+            return q[:, 0] / np.abs(q[:, 4]) - np.sign(q[:, 4])
+        if a.shape[1] >= 2:
+            return a[:, 0] / np.abs(a[:, 1]) - np.sign(a[:, 1])
+    return np.full(q.shape[0], np.nan)
+
+
+def _num(x: Any, digits: int = 4) -> Optional[float]:
+    x = float(x)
+    return round(x, digits) if np.isfinite(x) else None
+
+
+def _date(ts: Optional[float]) -> Optional[str]:
+    if ts is None or not np.isfinite(ts):
+        return None
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d")
+
+
+def fundamental_features(statements: Dict[str, Any], holders: Any = None,
+                         now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    statements: {"income_quarterly": 원본, "income_annual": ..., "balance_quarterly": ..., ...} (없는 키는 빈 표)
+    → 상태/프롬프트용 dict (+ next_report: 캐시 만료 기준 epoch)
+    """
+    def table(kind: str, period: str, items: Dict[str, Tuple[str, ...]]):
+        return statement_table(statements.get(f"{kind}_{period}"), items)
+
+    iq_d, iq = table("income", "quarterly", INCOME_ITEMS)
+    ia_d, ia = table("income", "annual", INCOME_ITEMS)
+    cq_d, cq = table("cashflow", "quarterly", CASHFLOW_ITEMS)
+    ca_d, ca = table("cashflow", "annual", CASHFLOW_ITEMS)
+    bq_d, bq = table("balance", "quarterly", BALANCE_ITEMS)
+    ba_d, ba = table("balance", "annual", BALANCE_ITEMS)
+    if not (iq.shape[1] or ia.shape[1] or bq.shape[1] or ba.shape[1]):
+        return None
+
+    inc, inc_end, basis = _flows(iq_d, iq, ia_d, ia)
+    cf, _, _ = _flows(cq_d, cq, ca_d, ca)
+    growth = _growth(iq, ia)
+    bal = bq[:, 0] if bq.shape[1] else (ba[:, 0] if ba.shape[1] else np.full(len(BALANCE_ITEMS), np.nan))
+    keys = list(INCOME_ITEMS)
+    rev = inc[keys.index("revenue")]
+    b = dict(zip(BALANCE_ITEMS, bal))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # 마진: 이익/현금흐름 항목 ÷ 매출 (한 번에)
+        margins = np.concatenate([inc[1:], cf]) / rev
+        # 레버리지: 분자 ÷ 분모 쌍
+        lev = (np.array([b["total_debt"], b["total_liabilities"], b["current_assets"]])
+               / np.array([b["equity"], b["total_assets"], b["current_liabilities"]]))
+
+    latest = max([float(d[0]) for d in (iq_d, bq_d) if len(d) and np.isfinite(d[0])], default=None)
+    if latest is not None:
+        next_report = next_report_at(latest, "quarterly")
+    else:
+        annual = [float(d[0]) for d in (ia_d, ba_d) if len(d) and np.isfinite(d[0])]
+        next_report = next_report_at(max(annual), "annual") if annual else None
+
+    out: Dict[str, Any] = {
+        "period": _date(latest if latest is not None else inc_end),
+        "basis": basis,
+        "revenue": _num(rev, 0),
+        "revenue_growth": _num(growth[keys.index("revenue")]),
+        "net_income_growth": _num(growth[keys.index("net_income")]),
+        "gross_margin": _num(margins[0]),
+        "operating_margin": _num(margins[1]),
+        "net_margin": _num(margins[2]),
+        "ocf_margin": _num(margins[3]),
+        "fcf_margin": _num(margins[4]),
+        "debt_to_equity": _num(lev[0]),
+        "liabilities_to_assets": _num(lev[1]),
+        "current_ratio": _num(lev[2]),
+        "net_debt": _num(b["total_debt"] - b["cash"], 0),
+        "next_report": next_report,
+        "next_report_date": _date(next_report),
+    }
+    out.update(parse_holders(holders) if holders is not None else {"insiders_pct": None, "institutions_pct": None})
+    return out
+
+
+# -------------------------
+# 프롬프트 요약
+# -------------------------
+def summarize_fundamentals(f: Optional[Dict[str, Any]]) -> str:
+    """'TTM(2024-09-30) 매출 성장 +6.1% | 마진 총 46% 영업 31% 순 24% FCF 27% | D/E 1.9, 유동비율 0.9 | 기관 61%' 한 줄"""
+    if not f:
+        return "(데이터 없음)"
+    pct = lambda v: f"{v * 100:.0f}%"  # noqa: E731
+    parts: List[str] = []
+    head = f"{'TTM' if f.get('basis') == 'ttm' else '연간'}({f.get('period')})"
+    growth = [f"{label} {f[k] * 100:+.1f}%" for k, label in (("revenue_growth", "매출"), ("net_income_growth", "순이익"))
+              if f.get(k) is not None]
+    parts.append(head + (" 성장(YoY) " + ", ".join(growth) if growth else ""))
+    margins = [f"{label} {pct(f[k])}" for k, label in
+               (("gross_margin", "총"), ("operating_margin", "영업"), ("net_margin", "순"), ("fcf_margin", "FCF"))
+               if f.get(k) is not None]
+    if margins:
+        parts.append("마진 " + " ".join(margins))
+    lev = [f"{label} {f[k]:.2f}" for k, label in
+           (("debt_to_equity", "D/E"), ("liabilities_to_assets", "부채/자산"), ("current_ratio", "유동비율"))
+           if f.get(k) is not None]
+    if lev:
+        parts.append(", ".join(lev))
+    holders = [f"{label} {pct(f[k])}" for k, label in (("institutions_pct", "기관"), ("insiders_pct", "내부자"))
+               if f.get(k) is not None]
+    if holders:
+        parts.append(" ".join(holders))
+    return " | ".join(parts)
+
+
+def fundamentals_key(f: Optional[Dict[str, Any]]) -> Optional[str]:
+    """점수 캐시 지문용 (재무는 기준 기간이 바뀔 때만 달라짐)"""
+    return (f or {}).get("period")
+
+
+# yahoo-finance-mcp get_financial_statement 의 financial_type (분기는 quarterly_ 접두)
+FINANCIAL_TYPES: Dict[str, str] = {"income": "income_stmt", "balance": "balance_sheet", "cashflow": "cashflow"}
+
+
+def financial_type(kind: str, period: str) -> str:
+    """("income", "quarterly") → "quarterly_income_stmt" """
+    base = FINANCIAL_TYPES[kind]
+    return f"quarterly_{base}" if period == "quarterly" else base
+
+
+def statements_spec() -> Sequence[Tuple[str, str]]:
+    """(fan_out 키, financial_type) - 노드가 동시에 조회할 표 6개"""
+    return [(f"{kind}_{period}", financial_type(kind, period))
+            for kind in FINANCIAL_TYPES for period in ("quarterly", "annual")]
+
+
+# -------------------------
+# 계산 결과 캐시 (티커 → fundamental_features)
+# -------------------------
+def features_ttl(f: Optional[Dict[str, Any]]) -> float:
+    """비율 캐시 TTL: 다음 공시 예상 시각까지. 없음/일부 실패는 retry_ttl 뒤 다시 (빈 표는 툴 캐시가 받아 줌)"""
+    if not f or f.get("failed_calls"):
+        return settings.fundamentals_retry_ttl
+    return report_ttl(f.get("next_report"))
+
+
+FUNDAMENTALS_POLICY = CachePolicy(ttl=settings.fundamentals_retry_ttl, stale=settings.fundamentals_stale,
+                                  ttl_for=features_ttl)
+fundamentals_cache = TTLCache("fundamentals", maxsize=settings.fundamentals_cache_max_entries)
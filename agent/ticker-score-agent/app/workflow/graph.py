@@ -1,55 +1,224 @@
 from __future__ import annotations
-from typing import Any, Dict
+import asyncio
+import time
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Tuple
+from contextlib import asynccontextmanager
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import MemorySaver
+from app.settings import settings
+from app.workflow.checkpoint import durable_checkpointer, make_checkpointer
 from app.workflow.state import ScoreState
-from app.workflow.nodes import node_yahoo, node_dart, node_score, node_finalize
+from app.workflow.nodes import (
+    node_yahoo, node_history, node_options, node_fundamentals, node_dart, node_score, node_finalize,
+)
 from uuid import uuid4
+from app.workflow.technicals import technicals_batching
 from app.workflow.trace import events_to_mermaid_flow
+from app.workflow.singleflight import SingleFlight
 
-# 그래프 선언 (병렬 노드 구성)
-memory = MemorySaver()
-builder = StateGraph(ScoreState)
+# 요청 sources → 데이터 노드 (price/news 는 같은 yahoo 노드에서 선택된 호출만, 나머지는 소스당 노드 하나)
+SOURCE_NODES: Dict[str, str] = {
+    "price":        "yahoo",
+    "news":         "yahoo",
+    "history":      "history",
+    "options":      "options",
+    "fundamentals": "fundamentals",
+    "filings":      "dart",
+}
+ALL_SOURCES: FrozenSet[str] = frozenset(SOURCE_NODES)
+DATA_NODES: Dict[str, Callable[..., Any]] = {
+    "yahoo":        node_yahoo,
+    "history":      node_history,
+    "options":      node_options,
+    "fundamentals": node_fundamentals,
+    "dart":         node_dart,
+}
 
-builder.add_node("yahoo",    node_yahoo)
-builder.add_node("dart",     node_dart)
-builder.add_node("score",    node_score)
-builder.add_node("finalize", node_finalize)
 
-# START → yahoo & dart (병렬) → score → finalize → END
-builder.add_edge(START, "yahoo")
-builder.add_edge(START, "dart")
-builder.add_edge("yahoo", "score")
-builder.add_edge("dart",  "score")
-builder.add_edge("score", "finalize")
-builder.add_edge("finalize", END)
+def parse_sources(sources: Iterable[str] | str | None) -> FrozenSet[str]:
+    """'price,news' | ["price", "news"] | None → frozenset (비어 있으면 전체). 모르는 이름은 ValueError"""
+    if sources is None:
+        return ALL_SOURCES
+    if isinstance(sources, str):
+        sources = sources.split(",")
+    picked = frozenset(s.strip().lower() for s in sources if s and s.strip())
+    unknown = picked - ALL_SOURCES
+    if unknown:
+        raise ValueError(f"unknown sources {sorted(unknown)} (choose from {sorted(ALL_SOURCES)})")
+    return picked or ALL_SOURCES
 
+
+def route_sources(state: ScoreState) -> List[str]:
+    """START 조건부 엣지: 요청 sources 에 필요한 데이터 노드만 (동시에 실행)"""
+    return sorted({SOURCE_NODES[s] for s in (state.get("sources") or ALL_SOURCES)})
+
+
+def build_graph(sources: FrozenSet[str] = ALL_SOURCES) -> StateGraph:
+    """START →(조건부) sources 에 필요한 데이터 노드 (병렬) → score → finalize → END"""
+    nodes = route_sources({"sources": sources})
+    builder = StateGraph(ScoreState)
+    for name in nodes:
+        builder.add_node(name, DATA_NODES[name])
+    builder.add_node("score",    node_score)
+    builder.add_node("finalize", node_finalize)
+
+    builder.add_conditional_edges(START, route_sources, nodes)
+    for name in nodes:
+        builder.add_edge(name, "score")
+    builder.add_edge("score", "finalize")
+    builder.add_edge("finalize", END)
+    return builder
+
+
+# 전체 소스 그래프 (sources 미지정 요청. 조건부 엣지라 어떤 선택이 와도 필요한 노드만 돈다)
+builder = build_graph()
+
+# 체크포인터: CHECKPOINTER_MODE=none | memory(스레드 TTL/LRU) | sqlite(lifespan 에서 연결)
+memory = make_checkpointer()
 graph = builder.compile(checkpointer=memory)
 
+# 선택별 컴파일 그래프 (필요한 노드 집합 → 그래프, 최대 2^5-1 개). 요청마다 다시 컴파일하지 않음
+_variants: Dict[Tuple[str, ...], Any] = {}
+
+
+def use_checkpointer(saver: Any) -> None:
+    """체크포인터 교체 → 전체 그래프 재컴파일, 선택별 그래프는 다음 요청에서 다시 컴파일"""
+    global graph
+    graph = builder.compile(checkpointer=saver)
+    _variants.clear()
+
+
+def graph_for(sources: FrozenSet[str]):
+    """sources 에 맞는 컴파일 그래프 (전체 선택이면 기본 그래프, 나머지는 노드 집합별로 한 번만 컴파일)"""
+    if sources == ALL_SOURCES:
+        return graph
+    nodes = tuple(route_sources({"sources": sources}))
+    compiled = _variants.get(nodes)
+    if compiled is None:
+        compiled = _variants[nodes] = build_graph(sources).compile(checkpointer=graph.checkpointer)
+    return compiled
+
+
+def graph_stats() -> Dict[str, Any]:
+    return {"variants": sorted(",".join(nodes) for nodes in _variants)}
+
+
+@asynccontextmanager
+async def graph_lifespan():
+    """sqlite 모드면 durable 체크포인터로 그래프를 다시 컴파일 (종료 시 원복)"""
+    if settings.checkpointer_mode.lower() != "sqlite":
+        yield
+        return
+    async with durable_checkpointer() as saver:
+        use_checkpointer(saver)
+        try:
+            yield
+        finally:
+            use_checkpointer(memory)
+
 # 실행 유틸
-async def run_once(ticker: str) -> Dict[str, Any]:
+def _initial_state(ticker: str, sources: FrozenSet[str]) -> ScoreState:
+    return {"ticker": ticker, "sources": sorted(sources)}
+
+
+async def run_once(ticker: str, sources: Iterable[str] | str | None = None) -> Dict[str, Any]:
+    sources = parse_sources(sources)
     cfg = {"configurable": {"thread_id": f"score-{ticker}-{uuid4()}"}}  # ✅ 새 스레드 id
-    final: ScoreState = await graph.ainvoke({"ticker": ticker}, config=cfg)
+    final: ScoreState = await graph_for(sources).ainvoke(_initial_state(ticker, sources), config=cfg)
     return {
         "ticker":    ticker,
+        "sources":   sorted(sources),
         "price":     final.get("price"),
         "news":      final.get("news"),
         "filings":   final.get("filings"),
+        "technicals": final.get("technicals"),
+        "options":   final.get("options"),
+        "fundamentals": final.get("fundamentals"),
         "score":     final.get("score"),
         "rationale": final.get("rationale"),
+        "cached":    bool(final.get("score_cached")),
         "logs":      final.get("logs"),
         "trace": final.get("trace", {}),  # 🔎 노드별 request/response 미리보기
     }
 
-async def run_stream(ticker: str):
+async def run_stream(ticker: str, sources: Iterable[str] | str | None = None):
+    sources = parse_sources(sources)
     cfg = {"configurable": {"thread_id": f"stream-{ticker}-{uuid4()}"}}  # ✅
-    async for ev in graph.astream({"ticker": ticker}, config=cfg):
-        yield ev  # {"yahoo": {...}}, {"dart": {...}}, {"score": {...}}, ...
+    # updates: 노드 완료 {"yahoo": {...}}, {"score": {...}}, ...
+    # custom:  score 노드 토큰 스트림 {"event": "delta" | "score", ...}
+    async for _mode, ev in graph_for(sources).astream(_initial_state(ticker, sources), config=cfg,
+                                                       stream_mode=["updates", "custom"]):
+        yield ev
+
+# 동일 티커 동시 요청 합치기 (single-flight)
+score_flight = SingleFlight("score")
+stream_flight = SingleFlight("stream")
+
+
+def normalize_ticker(ticker: str) -> str:
+    return ticker.strip().upper()
+
+
+def _flight_key(ticker: str, sources: FrozenSet[str]) -> str:
+    """같은 티커라도 sources 선택이 다르면 다른 실행 (전체 선택은 티커만)"""
+    return ticker if sources == ALL_SOURCES else f"{ticker}|{','.join(sorted(sources))}"
+
+
+async def run_once_coalesced(ticker: str, sources: Iterable[str] | str | None = None) -> Dict[str, Any]:
+    """같은 티커·sources 로 진행 중인 run_once 가 있으면 합류해 결과 공유"""
+    ticker, sources = normalize_ticker(ticker), parse_sources(sources)
+    return await score_flight.do(_flight_key(ticker, sources), lambda: run_once(ticker, sources))
+
+
+async def run_stream_coalesced(ticker: str, sources: Iterable[str] | str | None = None):
+    """같은 티커·sources 로 진행 중인 run_stream 이 있으면 합류 (놓친 이벤트는 처음부터 재생)"""
+    ticker, sources = normalize_ticker(ticker), parse_sources(sources)
+    async for ev in stream_flight.stream(_flight_key(ticker, sources), lambda: run_stream(ticker, sources)):
+        yield ev
+
+
+async def run_batch(tickers: List[str], concurrency: int, sources: Iterable[str] | str | None = None):
+    """
+    여러 티커를 동시성 상한 안에서 실행하고 끝나는 순서대로 결과 yield.
+    - MCP 세션은 풀에서 공유, 같은 티커는 single-flight 로 합쳐짐
+    - 실패한 티커는 error 결과로 내보내고 배치는 계속 진행
+    """
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def _one(ticker: str) -> Dict[str, Any]:
+        technicals_batching.set(True)  # 이 태스크의 그래프 실행만 지표 계산을 배처로 (태스크별 컨텍스트)
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                r = await run_once_coalesced(ticker, sources)
+                return {
+                    "ticker":     r["ticker"],
+                    "score":      r["score"],
+                    "rationale":  r["rationale"],
+                    "cached":     r["cached"],
+                    "elapsed_ms": int((time.perf_counter() - t0) * 1000),
+                }
+            except Exception as e:
+                return {
+                    "ticker":     ticker,
+                    "error":      f"{type(e).__name__}: {e}",
+                    "elapsed_ms": int((time.perf_counter() - t0) * 1000),
+                }
+
+    tasks = [asyncio.create_task(_one(t)) for t in tickers]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            yield await fut
+    finally:
+        # 클라이언트가 중간에 끊으면 남은 실행 정리
+        for t in tasks:
+            t.cancel()
+
 
-async def run_with_trace(ticker: str):
+async def run_with_trace(ticker: str, sources: Iterable[str] | str | None = None):
+    sources = parse_sources(sources)
     cfg = {"configurable": {"thread_id": f"trace-{ticker}-{uuid4()}"}}
     events = []
-    async for ev in graph.astream_events({"ticker": ticker}, version="v2", config=cfg):
+    async for ev in graph_for(sources).astream_events(_initial_state(ticker, sources), version="v2", config=cfg):
         # ev 예: {"event":"on_node_start","name":"yahoo",...}, {"event":"on_node_end","name":"yahoo",...}
         events.append(ev)
         yield {"event": ev.get("event"), "name": ev.get("name")}  # SSE 등으로 바로 전송 가능
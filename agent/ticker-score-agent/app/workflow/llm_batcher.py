@@ -0,0 +1,159 @@
+# app/workflow/llm_batcher.py
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.metrics import ERRORS, LLM_SECONDS
+from app.settings import settings
+from app.workflow.llm import llm_naver
+from app.workflow.prompts import parse_multi_scores, parse_score, render_multi_prompt, render_prompt
+
+LOGGER = logging.getLogger("ticker-graph")
+
+
+def _text(resp: Any) -> str:
+    return getattr(resp, "content", None) or str(resp)
+
+
+async def _timed(mode: str, coro: Any) -> Any:
+    t0 = time.perf_counter()
+    try:
+        return await coro
+    except Exception:
+        ERRORS.inc("llm")
+        raise
+    finally:
+        LLM_SECONDS.observe(time.perf_counter() - t0, mode)
+
+
+@dataclass
+class _Pending:
+    ticker: str
+    price: Optional[dict]
+    news: Optional[list]
+    filings: Optional[list]
+    technicals: Optional[dict]
+    options: Optional[dict]
+    fundamentals: Optional[dict]
+    future: asyncio.Future = field(repr=False)
+
+
+class ScoreBatcher:
+    """
+    node_score 요청을 짧은 시간창(window) 또는 최대 배치 크기까지 모아 LLM 호출 수를 줄인다.
+    - mode="prompt": 다종목 프롬프트 1회 호출 → JSON 배열 파싱, 빠진/깨진 종목만 개별 프롬프트로 폴백
+    - mode="abatch": 종목별 프롬프트를 llm.abatch 로 한 번에 전달
+    결과는 각 그래프 실행이 기다리는 future 로 되돌려준다.
+    """
+
+    def __init__(self, llm: Any = None, window: float = 0.02, max_batch: int = 8, mode: str = "prompt") -> None:
+        self.llm = llm
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self.mode = mode
+        self._pending: List[_Pending] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._bg: set[asyncio.Task] = set()
+        self.requests = 0
+        self.batches = 0
+        self.llm_calls = 0
+        self.fallbacks = 0
+
+    async def score(self, ticker: str, price: dict | None, news: list | None,
+                    filings: list | None, technicals: dict | None = None,
+                    options: dict | None = None,
+                    fundamentals: dict | None = None) -> Tuple[int, str | None, bool]:
+        """(score, rationale, 파싱 성공 여부) - 같은 창에 들어온 다른 요청과 함께 채점"""
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append(_Pending(ticker, price, news, filings, technicals, options, fundamentals, fut))
+        self.requests += 1
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await fut
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        # 대기 중 취소된 요청은 제외
+        batch = [p for p in batch if not p.future.done()]
+        if not batch:
+            return
+        t = asyncio.create_task(self._run(batch), name="llm-batch")
+        self._bg.add(t)
+        t.add_done_callback(self._bg.discard)
+
+    async def _run(self, batch: List[_Pending]) -> None:
+        self.batches += 1
+        try:
+            results = await self._score_batch(batch)
+        except Exception as e:
+            for p in batch:
+                if not p.future.done():
+                    p.future.set_exception(e)
+            return
+        for p, r in zip(batch, results):
+            if not p.future.done():
+                p.future.set_result(r)
+
+    async def _score_single(self, items: List[_Pending]) -> List[Tuple[int, str | None, bool]]:
+        prompts = [render_prompt(p.ticker, p.price, p.news, p.filings, p.technicals, p.options, p.fundamentals)
+                   for p in items]
+        if len(prompts) == 1:
+            resps = [await _timed("single", self.llm.ainvoke(prompts[0]))]
+        else:
+            resps = await _timed("abatch", self.llm.abatch(prompts))
+        self.llm_calls += len(prompts)
+        return [parse_score(_text(r)) for r in resps]
+
+    async def _score_batch(self, batch: List[_Pending]) -> List[Tuple[int, str | None, bool]]:
+        if len(batch) == 1 or self.mode == "abatch":
+            return await self._score_single(batch)
+
+        prompt = render_multi_prompt([
+            {"ticker": p.ticker, "price": p.price, "news": p.news, "filings": p.filings,
+             "technicals": p.technicals, "options": p.options, "fundamentals": p.fundamentals} for p in batch
+        ])
+        resp = await _timed("multi", self.llm.ainvoke(prompt))
+        self.llm_calls += 1
+        parsed = parse_multi_scores(_text(resp))
+
+        # 배열에서 빠졌거나 깨진 종목만 개별 프롬프트로 폴백
+        missing = [p for p in batch if p.ticker.strip().upper() not in parsed]
+        fallback: Dict[int, Tuple[int, str | None, bool]] = {}
+        if missing:
+            self.fallbacks += len(missing)
+            LOGGER.warning("[llm-batch] %d/%d tickers missing in batch response → single fallback",
+                           len(missing), len(batch))
+            for p, r in zip(missing, await self._score_single(missing)):
+                fallback[id(p)] = r
+
+        out: List[Tuple[int, str | None, bool]] = []
+        for p in batch:
+            hit = parsed.get(p.ticker.strip().upper())
+            out.append((hit[0], hit[1], True) if hit is not None else fallback[id(p)])
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "llm_calls": self.llm_calls,
+            "fallbacks": self.fallbacks,
+            "avg_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+score_batcher = ScoreBatcher(
+    llm=llm_naver,
+    window=settings.llm_batch_window_ms / 1000.0,
+    max_batch=settings.llm_batch_max_size,
+    mode=settings.llm_batch_mode,
+)
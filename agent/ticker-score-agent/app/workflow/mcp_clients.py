@@ -1,41 +1,145 @@
 from __future__ import annotations
 import json
-from typing import Any, Dict
+import time
+from typing import Callable, Dict
 from contextlib import asynccontextmanager
+from functools import partial
 
-from app.settings import settings
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from app.metrics import ERRORS, TOOL_SECONDS
+from app.settings import settings
+from a2a_common.cache import CachePolicy, TTLCache
+from app.workflow.report_dates import statement_period, statement_ttl
+from app.workflow.mcp_pool import mcp_pool, load_servers_config
+from app.workflow.tool_registry import ToolRegistry, check_tool_args, split_tool_name
 
 
-@asynccontextmanager
-async def open_mcp_client() -> MultiServerMCPClient:
-    """mcp_config.json 로드 후 MultiServerMCPClient 반환"""
-    with open(settings.mcp_config_path, "r", encoding="utf-8") as f:
-        cfg = json.load(f)
+class SpawnedMCPClient:
+    """
+    풀 미사용 시 open_mcp_client() 핸들.
+    컨텍스트 진입 시 서버별 툴 목록을 1회 해석해 인덱스로 들고 있는다.
+    """
 
-    servers_cfg = cfg.get("servers") or cfg.get("mcpServers") or {}
-    if not servers_cfg:
-        raise RuntimeError("No MCP servers found in config")
+    def __init__(self, client: MultiServerMCPClient, registry: ToolRegistry) -> None:
+        self.client = client
+        self.registry = registry
 
-    client = MultiServerMCPClient(servers_cfg)
-    await client.get_tools()  # 연결 확인
+    async def get_tools(self):
+        return self.registry.tools()
+
+    async def resolve_tool(self, name: str):
+        return self.registry.get(name)
+
+
+@asynccontextmanager
+async def open_mcp_client():
+    """
+    MCP 클라이언트 핸들 반환.
+    - 세션 풀이 떠 있으면(lifespan) 풀에서 미리 initialize 된 세션을 대여 → 요청마다 프로세스 spawn 없음
+    - 아니면 mcp_config.json 로드 후 MultiServerMCPClient 를 새로 생성 (스크립트/테스트용 기존 방식)
+    """
+    if mcp_pool.started:
+        async with mcp_pool.lease() as lease:
+            yield lease
+        return
+
+    client = MultiServerMCPClient(load_servers_config())
+    # 연결 확인 겸 툴 인덱스 1회 해석
+    registry = ToolRegistry({
+        server: await client.get_tools(server_name=server) for server in client.connections
+    })
     try:
-        yield client
+        yield SpawnedMCPClient(client, registry)
     finally:
         if hasattr(client, "close"):
             await client.close()
 
-async def call_tool(client: MultiServerMCPClient, name: str, args: dict):
+# ----------------------------
+# Tool result cache (TTL + LRU + stale-while-revalidate)
+# ----------------------------
+MINUTE, HOUR, DAY = 60, 3600, 86400
+
+# 툴별 캐시 정책 (없는 툴은 캐시하지 않음). 인자에 따라 달라지면 callable
+TOOL_CACHE_POLICIES: Dict[str, CachePolicy | Callable[[dict], CachePolicy]] = {
+    "get_stock_info":              CachePolicy(ttl=5, stale=30),
+    "get_yahoo_finance_news":      CachePolicy(ttl=2 * MINUTE, stale=10 * MINUTE),
+    "get_historical_stock_prices": CachePolicy(ttl=5 * MINUTE, stale=HOUR),
+    "get_stock_actions":           CachePolicy(ttl=DAY, stale=DAY),
+    # 재무제표는 분기마다만 바뀌므로 다음 실적 발표 예상 시각까지 (report_dates.statement_ttl)
+    "get_financial_statement":     lambda args: CachePolicy(
+        ttl=DAY, stale=DAY,
+        ttl_for=partial(statement_ttl, period=statement_period(args.get("financial_type", ""))),
+    ),
+    "get_holder_info":             CachePolicy(ttl=DAY, stale=DAY),
+    "get_option_expiration_dates": CachePolicy(ttl=HOUR, stale=HOUR),
+    "get_option_chain":            CachePolicy(ttl=MINUTE, stale=5 * MINUTE),
+    "get_recommendations":         CachePolicy(ttl=6 * HOUR, stale=DAY),
+}
+
+tool_cache = TTLCache("mcp-tools", maxsize=settings.tool_cache_max_entries)
+
+
+def tool_cache_policy(name: str, args: dict) -> CachePolicy | None:
+    policy = TOOL_CACHE_POLICIES.get(split_tool_name(name)[1])
+    return policy(args) if callable(policy) else policy
+
+
+class ToolResultError(RuntimeError):
+    """툴이 예외 대신 돌려준 'Error: ...' 문자열 (yahoo-finance-mcp 규약) → 캐시하지 않고 실패로 처리"""
+
+
+def _content_text(result):
+    """
+    langchain-mcp-adapters 최근 버전은 [{"type": "text", "text": ...}] 콘텐츠 블록 목록을 돌려줌
+    → 서버가 보낸 텍스트로 (파서들은 JSON 문자열/텍스트 기준). 그 외 형태는 그대로
+    """
+    if isinstance(result, list) and result and all(isinstance(b, dict) and b.get("type") == "text" for b in result):
+        result = "\n".join(b.get("text") or "" for b in result)
+    if isinstance(result, str) and result.startswith("Error"):
+        raise ToolResultError(result[:300])
+    return result
+
+
+async def _invoke_tool(client, name: str, args: dict):
+    tool = await client.resolve_tool(name)
+    t0 = time.perf_counter()
+    try:
+        check_tool_args(tool, args)
+        return _content_text(await tool.ainvoke(args))
+    except Exception:
+        ERRORS.inc("mcp_tool")
+        raise
+    finally:
+        TOOL_SECONDS.observe(time.perf_counter() - t0, tool.name)
+
+
+async def _invoke_tool_detached(name: str, args: dict):
+    """stale 갱신용: 호출자의 lease 가 반납된 뒤에도 돌 수 있도록 자체 클라이언트로 호출"""
+    async with open_mcp_client() as client:
+        return await _invoke_tool(client, name, args)
+
+
+async def call_tool(client, name: str, args: dict):
     """
     MCP 툴 호출 공통 함수.
     name: 'yahoo:get_stock_info' 같은 풀네임 또는 'price' 같은 단일 툴 이름
+    - 툴 해석은 세션당 1회 만든 인덱스에서 (호출마다 list_tools 왕복 없음)
+    - 없는 툴이면 인덱스에서 바로 ToolNotFoundError(RuntimeError)
+    - TOOL_CACHE_POLICIES 에 있는 툴은 (툴 이름, 인자) 키로 결과 캐시
     """
-    tools = await client.get_tools()
-    # 이름이 정확히 일치하는 툴 찾기
-    for t in tools:
-        if getattr(t, "name", None) == name:
-            return await t.ainvoke(args)
-    raise RuntimeError(f"Tool not found: {name}, available={[t.name for t in tools]}")
+    policy = tool_cache_policy(name, args) if settings.tool_cache_enabled else None
+    if policy is None:
+        return await _invoke_tool(client, name, args)
+
+    tool_name = split_tool_name(name)[1]
+    key = (tool_name, json.dumps(args, sort_keys=True, ensure_ascii=False, default=str))
+    return await tool_cache.get_or_load(
+        key,
+        lambda: _invoke_tool(client, name, args),
+        policy,
+        refresh=lambda: _invoke_tool_detached(name, args),
+        label=tool_name,
+    )
 
 
 # ----------------------------
@@ -62,17 +166,19 @@ async def get_stock_actions(client, ticker: str):
 # ----------------------------
 # Financial Statements
 # ----------------------------
-async def get_financial_statement(client, ticker: str, statement_type="income", period="annual"):
+async def get_financial_statement(client, ticker: str, financial_type="income_stmt"):
     return await call_tool(client, "get_financial_statement", {
         "ticker": ticker,
-        "statement_type": statement_type,  # "income" | "balance" | "cashflow"
-        "period": period                   # "annual" | "quarterly"
+        # "income_stmt" | "balance_sheet" | "cashflow" (분기는 "quarterly_" 접두)
+        "financial_type": financial_type,
     })
 
-async def get_holder_info(client, ticker: str, holder_type="major"):
+async def get_holder_info(client, ticker: str, holder_type="major_holders"):
     return await call_tool(client, "get_holder_info", {
         "ticker": ticker,
-        "holder_type": holder_type  # "major" | "institutional" | "mutual" | "insider"
+        # "major_holders" | "institutional_holders" | "mutualfund_holders"
+        # | "insider_transactions" | "insider_purchases" | "insider_roster_holders"
+        "holder_type": holder_type,
     })
 
 # ----------------------------
@@ -84,8 +190,8 @@ async def get_option_expiration_dates(client, ticker: str):
 async def get_option_chain(client, ticker: str, expiration: str, option_type="calls"):
     return await call_tool(client, "get_option_chain", {
         "ticker": ticker,
-        "expiration": expiration,  # "2025-01-17" 같은 만기일
-        "option_type": option_type # "calls" | "puts"
+        "expiration_date": expiration,  # "2025-01-17" 같은 만기일
+        "option_type": option_type      # "calls" | "puts"
     })
 
 # ----------------------------
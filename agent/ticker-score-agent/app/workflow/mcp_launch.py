@@ -0,0 +1,47 @@
+# app/workflow/mcp_launch.py
+from __future__ import annotations
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from mcp.client.stdio import get_default_environment
+
+from a2a_common.launch import LAUNCH_MODES, resolve_interpreter
+
+__all__ = ["LAUNCH_MODES", "direct_connection", "parse_uv_run", "resolve_interpreter"]
+
+
+def parse_uv_run(connection: Dict[str, Any]) -> Optional[Tuple[str, str, List[str]]]:
+    """'uv --directory DIR run script.py ...' 형태면 (uv 명령, DIR, [script.py, ...]), 아니면 None"""
+    command, args = connection.get("command") or "", list(connection.get("args") or [])
+    if Path(command).name not in ("uv", "uv.exe"):
+        return None
+    if len(args) < 4 or args[0] != "--directory" or args[2] != "run":
+        return None
+    return command, args[1], args[3:]
+
+
+async def direct_connection(connection: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    uv run 연결 설정을 '해석된 인터프리터로 바로 실행' 설정으로 변환.
+    uv run 과 같은 환경(VIRTUAL_ENV, PATH 앞에 venv bin)과 작업 디렉토리를 맞춘다.
+    uv run 형태가 아니면 그대로 반환.
+    """
+    parsed = parse_uv_run(connection)
+    if parsed is None:
+        return connection
+    uv_cmd, directory, script_args = parsed
+    python, prefix = await resolve_interpreter(uv_cmd, directory)
+
+    env = dict(connection.get("env") or get_default_environment())
+    bin_dir = str(Path(prefix) / ("Scripts" if sys.platform == "win32" else "bin"))
+    env["VIRTUAL_ENV"] = prefix
+    env["PATH"] = bin_dir + os.pathsep + env.get("PATH", "")
+    return {
+        **connection,
+        "command": python,
+        "args": script_args,
+        "cwd": str(Path(directory).expanduser().resolve()),
+        "env": env,
+    }
@@ -0,0 +1,471 @@
+# app/workflow/mcp_pool.py
+from __future__ import annotations
+import asyncio
+import json
+import logging
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+from langchain_mcp_adapters.sessions import create_session
+from langchain_mcp_adapters.tools import load_mcp_tools
+from mcp import types as mcp_types
+
+from app.metrics import MCP_SPAWN_SECONDS
+from app.settings import settings
+from app.workflow.mcp_launch import LAUNCH_MODES, direct_connection, parse_uv_run
+from app.workflow.tool_registry import ToolNotFoundError, ToolRegistry, split_tool_name
+
+LOGGER = logging.getLogger("ticker-graph")
+
+
+def load_servers_config(path: str | None = None) -> Dict[str, Any]:
+    """mcp_config.json 의 servers(mcpServers) 섹션 로드"""
+    with open(path or settings.mcp_config_path, "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+
+    servers_cfg = cfg.get("servers") or cfg.get("mcpServers") or {}
+    if not servers_cfg:
+        raise RuntimeError("No MCP servers found in config")
+    return servers_cfg
+
+
+# -------------------------
+# 풀 슬롯 (= stdio 자식 프로세스 1개)
+# -------------------------
+class PooledSession:
+    """
+    미리 initialize 된 MCP 세션 1개.
+    - stdio_client 는 anyio task group 을 쓰므로 '연 task 에서 닫아야' 한다.
+      → 세션 컨텍스트는 전용 owner task 안에서 열고, stop 신호를 받으면 같은 task 에서 닫는다.
+    - 툴 인덱스(ToolRegistry)는 세션당 1회 해석, 재기동/tools list_changed 알림 때만 무효화
+    """
+
+    def __init__(self, pool: "ServerPool", connection: Dict[str, Any], slot: int) -> None:
+        self.pool = pool
+        self.connection = connection
+        self.server = pool.server
+        self.slot = slot
+        self.session = None
+        self.generation = 0          # spawn 횟수 (재기동 감지용)
+        self.spawned_at: float = 0.0
+        self.spawn_ms: Optional[int] = None  # 마지막 spawn → initialize 완료까지
+        self.last_error: Optional[str] = None
+
+        self._registry: Optional[ToolRegistry] = None
+        self._registry_lock = asyncio.Lock()
+
+        self._task: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+
+    @property
+    def name(self) -> str:
+        return f"{self.server}#{self.slot}" if self.slot >= 0 else f"{self.server}#spare"
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def _on_message(self, message: Any) -> None:
+        """서버 알림 핸들러: 툴 목록 변경 시 인덱스 무효화"""
+        if isinstance(message, mcp_types.ServerNotification) and \
+                isinstance(message.root, mcp_types.ToolListChangedNotification):
+            LOGGER.info("[mcp-pool] %s tools/list_changed → registry invalidated", self.name)
+            self.invalidate_tools()
+
+    async def _owner(self) -> None:
+        session_kwargs = {**self.connection.get("session_kwargs", {}), "message_handler": self._on_message}
+        try:
+            async with create_session({**self.connection, "session_kwargs": session_kwargs}) as session:
+                await session.initialize()
+                self.session = session
+                self.spawned_at = time.monotonic()
+                self._ready.set()
+                await self._stop.wait()
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            LOGGER.warning("[mcp-pool] %s session closed with error: %s", self.name, self.last_error)
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def spawn(self, timeout: float) -> None:
+        self.invalidate_tools()  # 새 세션 = 새 인덱스
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        t0 = time.perf_counter()
+        self._task = asyncio.create_task(self._owner(), name=f"mcp-{self.name}")
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            await self.close()
+            raise RuntimeError(f"MCP session spawn timeout: {self.name} ({timeout}s)")
+        if self.session is None:
+            raise RuntimeError(f"MCP session spawn failed: {self.name}: {self.last_error}")
+        dt = time.perf_counter() - t0
+        MCP_SPAWN_SECONDS.observe(dt, self.pool.launch_mode)
+        self.spawn_ms = int(dt * 1000)
+        self.generation += 1
+        LOGGER.info("[mcp-pool] %s ready (gen=%d, %s launch %dms)",
+                    self.name, self.generation, self.pool.launch_mode, self.spawn_ms)
+
+    async def close(self, timeout: float = 5.0) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        self._stop.set()
+        try:
+            await asyncio.wait_for(task, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            pass
+        except Exception as e:
+            LOGGER.warning("[mcp-pool] %s close warning: %s", self.name, e)
+        self.session = None
+
+    async def respawn(self, timeout: float) -> None:
+        await self.close()
+        await self.spawn(timeout)
+
+    async def ping(self, timeout: float) -> bool:
+        if not self.alive:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout)
+            return True
+        except Exception as e:
+            self.last_error = f"ping: {type(e).__name__}: {e}"
+            return False
+
+    def invalidate_tools(self) -> None:
+        self._registry = None
+        self.pool.known_tools = None
+
+    async def registry(self) -> ToolRegistry:
+        """이 세션에 바인딩된 툴 인덱스 (세션당 list_tools 1회, 툴 호출이 새 프로세스를 띄우지 않음)"""
+        if self._registry is not None:
+            return self._registry
+        async with self._registry_lock:
+            if self._registry is None:
+                tools = await load_mcp_tools(self.session, server_name=self.server)
+                self._registry = ToolRegistry({self.server: tools})
+                self.pool.known_tools = set(self._registry.names())
+            return self._registry
+
+    async def get_tools(self) -> List[Any]:
+        return (await self.registry()).tools()
+
+
+# -------------------------
+# 서버별 풀
+# -------------------------
+class ServerPool:
+    """
+    서버 1개에 대한 고정 크기 세션 풀 (checkout/checkin).
+    warm_spares > 0 이면 로테이션 밖에 미리 initialize 해 둔 예비 세션을 유지하다가
+    재기동이 필요한 슬롯을 예비 세션으로 즉시 교체하고, 예비분은 백그라운드에서 다시 채운다.
+    """
+
+    def __init__(self, server: str, connection: Dict[str, Any], size: int,
+                 spawn_timeout: float, ping_timeout: float,
+                 warm_spares: int = 0, launch_mode: str = "config") -> None:
+        self.server = server
+        self.connection = connection
+        self.launch_mode = launch_mode
+        # 라우팅용 툴 이름 집합 (어느 슬롯이든 인덱스를 해석하면 갱신, None = 미해석/무효화됨)
+        self.known_tools: Optional[set[str]] = None
+        self.slots = [PooledSession(self, connection, i) for i in range(size)]
+        self.spawn_timeout = spawn_timeout
+        self.ping_timeout = ping_timeout
+        self.respawns = 0
+        self.checkouts = 0
+        self.warm_spares = max(0, warm_spares)
+        self.spares: List[PooledSession] = []
+        self.spare_swaps = 0
+        self._spares_pending = 0
+        self._idle: asyncio.Queue[PooledSession] = asyncio.Queue()
+        self._bg: set[asyncio.Task] = set()
+
+    def _background(self, coro: Any, name: str) -> None:
+        t = asyncio.create_task(coro, name=name)
+        self._bg.add(t)
+        t.add_done_callback(self._bg.discard)
+
+    async def _spawn_spare(self) -> None:
+        spare = PooledSession(self, self.connection, -1)
+        try:
+            await spare.spawn(self.spawn_timeout)
+            self.spares.append(spare)
+        except asyncio.CancelledError:
+            await spare.close()  # 풀 종료 중 취소: 띄우던 자식 프로세스까지 정리
+            raise
+        except Exception as e:
+            LOGGER.warning("[mcp-pool] %s spare spawn failed: %s", self.server, e)
+        finally:
+            self._spares_pending -= 1
+
+    def _refill_spares(self) -> None:
+        while len(self.spares) + self._spares_pending < self.warm_spares:
+            self._spares_pending += 1
+            self._background(self._spawn_spare(), f"mcp-spare-{self.server}")
+
+    def _take_spare(self) -> Optional[PooledSession]:
+        while self.spares:
+            spare = self.spares.pop(0)
+            if spare.alive:
+                return spare
+            self._background(spare.close(), f"mcp-close-{spare.name}")
+        return None
+
+    async def start(self) -> None:
+        self._refill_spares()  # 예비 세션은 슬롯과 동시에 띄우되 기동을 막지 않음
+        results = await asyncio.gather(
+            *(s.spawn(self.spawn_timeout) for s in self.slots), return_exceptions=True
+        )
+        for s, r in zip(self.slots, results):
+            if isinstance(r, Exception):
+                # 기동 실패 슬롯도 큐에 넣어 두고, checkout 시점에 재기동 시도
+                LOGGER.warning("[mcp-pool] %s initial spawn failed: %s", s.name, r)
+            self._idle.put_nowait(s)
+
+    async def close(self) -> None:
+        for t in list(self._bg):
+            t.cancel()
+        await asyncio.gather(*list(self._bg), return_exceptions=True)
+        spares, self.spares = self.spares, []
+        await asyncio.gather(*(s.close() for s in self.slots + spares), return_exceptions=True)
+
+    async def _respawn(self, slot: PooledSession) -> PooledSession:
+        """죽은 슬롯 교체: 예비 세션이 있으면 즉시 맞바꾸고(구 세션은 백그라운드 정리), 없으면 그 자리에서 재기동"""
+        self.respawns += 1
+        LOGGER.warning("[mcp-pool] respawn %s (last_error=%s)", slot.name, slot.last_error)
+        spare = self._take_spare()
+        if spare is None:
+            await slot.respawn(self.spawn_timeout)
+            self._refill_spares()
+            return slot
+
+        spare.slot = slot.slot
+        self.slots[self.slots.index(slot)] = spare
+        self.spare_swaps += 1
+        self._background(slot.close(), f"mcp-close-{slot.name}")
+        self._refill_spares()
+        LOGGER.info("[mcp-pool] %s replaced by warm spare", spare.name)
+        return spare
+
+    async def _recheck(self, slot: PooledSession) -> None:
+        """호출 중 에러가 난 슬롯: ping 으로 확인 후 죽었으면 재기동, 그 다음 큐로 반납"""
+        try:
+            if not await slot.ping(self.ping_timeout):
+                slot = await self._respawn(slot)
+        except Exception as e:
+            LOGGER.warning("[mcp-pool] recheck %s failed: %s", slot.name, e)
+        finally:
+            self._idle.put_nowait(slot)
+
+    @asynccontextmanager
+    async def checkout(self, timeout: float):
+        slot = await asyncio.wait_for(self._idle.get(), timeout)
+        self.checkouts += 1
+        healthy = True
+        try:
+            if not slot.alive:
+                slot = await self._respawn(slot)
+            yield slot
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            if healthy and slot.alive:
+                self._idle.put_nowait(slot)
+            else:
+                # 호출자의 예외 전파를 막지 않도록 점검/재기동은 백그라운드에서
+                t = asyncio.create_task(self._recheck(slot))
+                self._bg.add(t)
+                t.add_done_callback(self._bg.discard)
+
+    async def health_check(self) -> None:
+        """유휴 슬롯만 꺼내 ping → 죽은 슬롯 재기동 → 반납 (사용 중인 슬롯은 건드리지 않음)"""
+        idle: List[PooledSession] = []
+        while not self._idle.empty():
+            idle.append(self._idle.get_nowait())
+        try:
+            oks = await asyncio.gather(*(s.ping(self.ping_timeout) for s in idle))
+            for i, (s, ok) in enumerate(zip(idle, oks)):
+                if not ok:
+                    try:
+                        idle[i] = await self._respawn(s)
+                    except Exception as e:
+                        LOGGER.warning("[mcp-pool] health respawn %s failed: %s", s.name, e)
+        finally:
+            for s in idle:
+                self._idle.put_nowait(s)
+
+        # 예비 세션도 점검: 죽은 예비분은 버리고 다시 채움
+        oks = await asyncio.gather(*(s.ping(self.ping_timeout) for s in self.spares))
+        for s, ok in zip(list(self.spares), oks):
+            if not ok:
+                self.spares.remove(s)
+                self._background(s.close(), f"mcp-close-{s.name}")
+        self._refill_spares()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self.slots),
+            "idle": self._idle.qsize(),
+            "alive": sum(1 for s in self.slots if s.alive),
+            "checkouts": self.checkouts,
+            "respawns": self.respawns,
+            "launch_mode": self.launch_mode,
+            "spawn_ms": [s.spawn_ms for s in self.slots],
+            "warm_spares": len(self.spares),
+            "spare_swaps": self.spare_swaps,
+            "tools": sorted(self.known_tools) if self.known_tools is not None else None,
+        }
+
+
+# -------------------------
+# 노드가 쓰는 대여(lease) 핸들
+# -------------------------
+class MCPLease:
+    """
+    open_mcp_client() 가 풀 모드에서 돌려주는 핸들.
+    resolve_tool()/get_tools() 를 제공하며, 서버별 세션은 처음 필요할 때 checkout 한다.
+    """
+
+    def __init__(self, pool: "MCPSessionPool", stack: AsyncExitStack) -> None:
+        self._pool = pool
+        self._stack = stack
+        self._sessions: Dict[str, PooledSession] = {}
+        self._lock = asyncio.Lock()
+
+    async def session(self, server: str) -> PooledSession:
+        async with self._lock:
+            if server not in self._sessions:
+                server_pool = self._pool.servers[server]
+                self._sessions[server] = await self._stack.enter_async_context(
+                    server_pool.checkout(self._pool.checkout_timeout)
+                )
+            return self._sessions[server]
+
+    async def get_tools(self) -> List[Any]:
+        tools: List[Any] = []
+        for server in self._pool.servers:
+            s = await self.session(server)
+            tools.extend(await s.get_tools())
+        return tools
+
+    async def resolve_tool(self, name: str) -> Any:
+        """
+        'tool' 또는 'server:tool' → 이 lease 의 세션에 바인딩된 툴.
+        서버별 툴 이름 집합이 해석돼 있으면 없는 툴은 네트워크 호출 없이 ToolNotFoundError.
+        """
+        server, tool_name = split_tool_name(name)
+        servers = self._pool.servers
+        if server is not None:
+            if server not in servers:
+                raise ToolNotFoundError(name, self._pool.known_tool_names())
+            candidates = [server]
+        else:
+            candidates = [s for s, p in servers.items() if p.known_tools is None or tool_name in p.known_tools]
+
+        for srv in candidates:
+            registry = await (await self.session(srv)).registry()
+            if tool_name in registry:
+                return registry.get(tool_name)
+        raise ToolNotFoundError(name, self._pool.known_tool_names())
+
+
+class MCPSessionPool:
+    """
+    앱 단위(lifespan) MCP 세션 풀.
+    - 서버별 N개의 세션을 미리 띄워 두고 checkout/checkin
+    - 주기적 ping 헬스체크 + 죽은 자식 프로세스 자동 재기동
+    """
+
+    def __init__(self) -> None:
+        self.servers: Dict[str, ServerPool] = {}
+        self.checkout_timeout = settings.mcp_pool_checkout_timeout
+        self._health_task: Optional[asyncio.Task] = None
+
+    @property
+    def started(self) -> bool:
+        return bool(self.servers)
+
+    async def start(self, servers_cfg: Dict[str, Any] | None = None, size: int | None = None) -> None:
+        if self.started:
+            return
+        servers_cfg = servers_cfg or load_servers_config()
+        size = size or settings.mcp_pool_size
+
+        launch_mode = settings.mcp_launch_mode.lower()
+        if launch_mode not in LAUNCH_MODES:
+            raise ValueError(f"Unknown MCP_LAUNCH_MODE: {launch_mode} (expected one of {LAUNCH_MODES})")
+        # 실제 적용된 실행 방식 (spawn 지연 메트릭 라벨): uv run 설정이면 uv, direct 변환 성공 시 direct, 그 외 config
+        launched = {name: "uv" if parse_uv_run(c) else "config" for name, c in servers_cfg.items()}
+        if launch_mode == "direct":
+            servers_cfg = dict(servers_cfg)
+            for name, connection in servers_cfg.items():
+                servers_cfg[name], launched[name] = await self._direct(name, connection)
+
+        self.servers = {
+            name: ServerPool(name, connection, size,
+                             spawn_timeout=settings.mcp_pool_spawn_timeout,
+                             ping_timeout=settings.mcp_pool_ping_timeout,
+                             warm_spares=settings.mcp_pool_warm_spares,
+                             launch_mode=launched[name])
+            for name, connection in servers_cfg.items()
+        }
+        t0 = time.perf_counter()
+        await asyncio.gather(*(p.start() for p in self.servers.values()))
+        LOGGER.info("[mcp-pool] started servers=%s size=%d (%dms)",
+                    list(self.servers), size, int((time.perf_counter() - t0) * 1000))
+
+        if settings.mcp_pool_health_interval > 0:
+            self._health_task = asyncio.create_task(self._health_loop(), name="mcp-pool-health")
+
+    @staticmethod
+    async def _direct(name: str, connection: Dict[str, Any]) -> tuple[Dict[str, Any], str]:
+        """uv run 설정을 해석된 인터프리터 직접 실행으로 변환 (실패하면 설정 그대로 유지)"""
+        try:
+            direct = await direct_connection(connection)
+        except Exception as e:
+            LOGGER.warning("[mcp-pool] %s direct launch unavailable, keeping configured command: %s", name, e)
+            return connection, "uv" if parse_uv_run(connection) else "config"
+        return direct, ("direct" if direct is not connection else "config")
+
+    async def close(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        await asyncio.gather(*(p.close() for p in self.servers.values()), return_exceptions=True)
+        self.servers = {}
+        LOGGER.info("[mcp-pool] closed")
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.mcp_pool_health_interval)
+            for p in self.servers.values():
+                try:
+                    await p.health_check()
+                except Exception as e:
+                    LOGGER.warning("[mcp-pool] health check %s failed: %s", p.server, e)
+
+    @asynccontextmanager
+    async def lease(self):
+        async with AsyncExitStack() as stack:
+            yield MCPLease(self, stack)
+
+    def known_tool_names(self) -> List[str]:
+        return [f"{s}:{t}" for s, p in self.servers.items() for t in sorted(p.known_tools or ())]
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: p.stats() for name, p in self.servers.items()}
+
+
+# 전역 인스턴스 (app/main.py lifespan 에서 start/close)
+mcp_pool = MCPSessionPool()
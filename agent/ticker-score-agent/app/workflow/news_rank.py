@@ -0,0 +1,299 @@
+# app/workflow/news_rank.py
+"""
+정규화된 뉴스 레코드 중복 제거 + 랭킹 → 상위 k개 선택.
+- 근접 중복: 제목/요약 단어(1-gram + 2-gram) SimHash 64bit 를 numpy 로 일괄 계산, 해밍 거리 ≤ 임계값이면 같은 기사
+  (통신사 기사 재배포본은 문장부호/꼬리말 정도만 달라 거리가 작음). 정규화 URL 이 같아도 중복
+- 랭킹: 최신성(반감기 감쇠, 시각이 없으면 제공 순서) · 출처 가중치 · 종목 관련도의 가중합
+- 선택: 점수 순으로 하나 고르고 그와 중복인 기사를 한 번에 제외 → k 번 반복 (k × O(n) 벡터 연산)
+"""
+from __future__ import annotations
+import re
+import string
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# 출처(도메인/퍼블리셔) 기본 신뢰도 가중치 (settings.news_source_weights 로 덮어쓰기)
+DEFAULT_SOURCE_WEIGHTS: Dict[str, float] = {
+    "reuters.com": 1.0,
+    "bloomberg.com": 1.0,
+    "wsj.com": 0.95,
+    "ft.com": 0.95,
+    "apnews.com": 0.9,
+    "cnbc.com": 0.85,
+    "barrons.com": 0.85,
+    "marketwatch.com": 0.8,
+    "finance.yahoo.com": 0.7,
+    "investors.com": 0.7,
+    "fool.com": 0.5,
+    "seekingalpha.com": 0.5,
+    "zacks.com": 0.45,
+    "benzinga.com": 0.45,
+}
+DEFAULT_SOURCE_WEIGHT = 0.6
+# 퍼블리셔 표시 이름(소문자, 문장부호·앞의 "the" 제거) → 가중치 표의 도메인
+SOURCE_NAME_ALIASES: Dict[str, str] = {
+    "reuters": "reuters.com",
+    "bloomberg": "bloomberg.com",
+    "wall street journal": "wsj.com",
+    "wsj": "wsj.com",
+    "financial times": "ft.com",
+    "associated press": "apnews.com",
+    "ap": "apnews.com",
+    "cnbc": "cnbc.com",
+    "barrons": "barrons.com",
+    "marketwatch": "marketwatch.com",
+    "yahoo finance": "finance.yahoo.com",
+    "investors business daily": "investors.com",
+    "motley fool": "fool.com",
+    "seeking alpha": "seekingalpha.com",
+    "zacks": "zacks.com",
+    "zacks equity research": "zacks.com",
+    "benzinga": "benzinga.com",
+}
+
+_SEP = "\x01"  # 제목/요약 구분자 (토큰 사이 인접 관계를 끊음)
+# 문장부호(ASCII) → 공백 후 split: 정규식 \w+ 보다 빠르고 한글 등은 그대로 단어로 남음
+_PUNCT = str.maketrans({c: " " for c in string.punctuation})
+_URL = re.compile(r"^(?:[a-z][\w+.-]*:)?//(?:www\.)?([^/?#:]+)(?::\d+)?([^?#]*)", re.IGNORECASE)
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+_M1, _M2 = np.uint64(0xBF58476D1CE4E5B9), np.uint64(0x94D049BB133111EB)
+# 토큰 다항식 해시 밑 (홀수 → mod 2^64 역원 존재)
+_P = 0x100000001B3
+_P_INV = pow(_P, -1, 1 << 64)
+_MAX_FEATURES = 255  # 구간(제목/요약)당 특징 상한 → 바이트 단위 합산이 넘치지 않음
+
+
+# -------------------------
+# SimHash
+# -------------------------
+def _mix64(x: np.ndarray) -> np.ndarray:
+    """splitmix64 마무리 단계 (토큰/2-gram 해시 비트 섞기)"""
+    with np.errstate(over="ignore"):
+        x = (x ^ (x >> np.uint64(30))) * _M1
+        x = (x ^ (x >> np.uint64(27))) * _M2
+    return x ^ (x >> np.uint64(31))
+
+
+def _powers(base: int, n: int) -> np.ndarray:
+    """[1, base, base^2, …] mod 2^64"""
+    a = np.full(n, base, dtype=np.uint64)
+    a[0] = 1
+    return np.cumprod(a, dtype=np.uint64)
+
+
+def _token_hashes(text: str) -> tuple[np.ndarray, np.ndarray]:
+    """
+    공백(0x20 이하) 기준 토큰 → (토큰별 64bit 해시, 구간 번호). 바이트 배열에서 한 번에 계산:
+    접두 다항식 합 prefix[i] = Σ b_j·P^j 에서 토큰 [s, e) 의 해시 = (prefix[e] - prefix[s])·P^-s (mod 2^64).
+    파이썬 hash() 와 달리 프로세스/실행마다 같은 값 → 선택 결과가 재시작 후에도 같다.
+    """
+    b = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+    if len(b) == 0:
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.int64)
+    tok = b > 0x20
+    starts = np.flatnonzero(tok & ~np.concatenate(([False], tok[:-1])))
+    ends = np.flatnonzero(tok & ~np.concatenate((tok[1:], [False]))) + 1
+    with np.errstate(over="ignore"):
+        prefix = np.zeros(len(b) + 1, dtype=np.uint64)
+        np.cumsum(b * _powers(_P, len(b)), dtype=np.uint64, out=prefix[1:])
+        h = _mix64((prefix[ends] - prefix[starts]) * _powers(_P_INV, len(b))[starts])
+    seg = np.cumsum(b == ord(_SEP))[starts]
+    return h, seg
+
+
+def _segment_bits(h: np.ndarray, seg: np.ndarray, nseg: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    특징 해시(구간 순 정렬) → 구간별 (64비트 각각 1 인 특징 수, 특징 수).
+    비트 행렬 (F, 64) uint8 을 uint64 8개로 보고 reduceat → 한 번의 덧셈이 8비트 자리를 동시에 센다.
+    구간당 특징을 255 개로 제한하므로 바이트 자리 사이로 올림이 생기지 않는다.
+    """
+    starts = np.searchsorted(seg, np.arange(nseg))
+    keep = np.arange(len(seg)) - starts[seg] < _MAX_FEATURES
+    h, seg = h[keep], seg[keep]
+    counts = np.bincount(seg, minlength=nseg)
+    starts = np.searchsorted(seg, np.arange(nseg))
+
+    ones = np.zeros((nseg, 8), dtype=np.uint64)
+    nonempty = counts > 0
+    if nonempty.any():
+        bits = np.unpackbits(h.view(np.uint8).reshape(-1, 8), axis=1)  # (F, 64)
+        ones[nonempty] = np.add.reduceat(bits.view(np.uint64), starts[nonempty], axis=0)
+    return ones.view(np.uint8).reshape(nseg, 64).astype(np.int32), counts
+
+
+def simhash64(titles: List[str], summaries: List[str], title_weight: int = 2) -> np.ndarray:
+    """
+    문서별 SimHash (uint64 배열). 특징은 단어 1-gram + 인접 2-gram, 제목 특징은 title_weight 배 가중.
+    특징이 없는 문서는 0.
+    """
+    n = len(titles)
+    fps = np.zeros(n, dtype=np.uint64)
+    if n == 0:
+        return fps
+    # 모든 문서를 [제목, 요약, 제목, 요약, …] 구간으로 이어 붙여 한 번에 토큰화/해시
+    parts: List[str] = []
+    for t, s in zip(titles, summaries):
+        parts.append(t or "")
+        parts.append(s or "")
+    text = f" {_SEP} ".join(parts)
+    if text.count(_SEP) != len(parts) - 1:  # 입력에 구분자 문자가 섞여 있으면 지우고 다시
+        text = f" {_SEP} ".join(p.replace(_SEP, " ") for p in parts)
+    hu, seg = _token_hashes(text.translate(_PUNCT).lower())  # 구간 번호: 짝수 제목, 홀수 요약
+
+    # 2-gram: 같은 구간 안의 인접 단어 쌍
+    pair = seg[:-1] == seg[1:]
+    with np.errstate(over="ignore"):
+        bi = _mix64(hu[:-1][pair] * _M1 ^ hu[1:][pair])
+    ones_u, cnt_u = _segment_bits(hu, seg, 2 * n)
+    ones_b, cnt_b = _segment_bits(bi, seg[:-1][pair], 2 * n)
+    ones, cnt = ones_u + ones_b, cnt_u + cnt_b
+
+    w = title_weight
+    total = w * cnt[0::2] + cnt[1::2]
+    doc_ones = w * ones[0::2] + ones[1::2]
+    has = total > 0
+    packed = np.packbits(2 * doc_ones[has] > total[has, None], axis=1)
+    fps[has] = packed.view(np.uint64).ravel()
+    return fps
+
+
+def hamming(fps: np.ndarray, fp: np.uint64) -> np.ndarray:
+    x = np.bitwise_xor(fps, fp)
+    return _POPCOUNT[x.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+# -------------------------
+# 랭킹 특징
+# -------------------------
+def parse_published(value: Any) -> Optional[float]:
+    """epoch 초/밀리초, ISO-8601 또는 RFC 2822 문자열 → epoch 초"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        v = float(value)
+        return v / 1000.0 if v > 1e11 else v
+    text = str(value).strip()
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(text).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def split_url(url: str | None) -> tuple[str, str]:
+    """URL → (도메인, 정규화 URL: 도메인 + 경로, 쿼리/프래그먼트/www/끝 슬래시 제외)"""
+    m = _URL.match((url or "").strip())
+    if m is None:
+        return "", ""
+    host = m.group(1).lower()
+    return host, host + m.group(2).rstrip("/").lower()
+
+
+def _domain_weight(host: str, weights: Dict[str, float]) -> Optional[float]:
+    """도메인 정확 일치 → 상위 도메인 순으로 조회 (news.reuters.com → reuters.com)"""
+    parts = host.split(".")
+    for i in range(len(parts) - 1):
+        w = weights.get(".".join(parts[i:]))
+        if w is not None:
+            return w
+    return None
+
+
+def _name_weight(name: str, weights: Dict[str, float]) -> Optional[float]:
+    """퍼블리셔 이름 → 가중치 (weights 에 이름 그대로 있거나, 별칭으로 도메인을 찾음)"""
+    key = " ".join(name.lower().replace("'", "").translate(_PUNCT).split())
+    key = key[4:] if key.startswith("the ") else key
+    w = weights.get(key)
+    if w is None and key in SOURCE_NAME_ALIASES:
+        w = weights.get(SOURCE_NAME_ALIASES[key])
+    return w
+
+
+def source_weight(source: str, weights: Dict[str, float], host: str = "") -> float:
+    """
+    퍼블리셔 이름 또는 도메인 + URL 호스트 → 가중치.
+    알려진 퍼블리셔 이름이 먼저 (yahoo 는 Reuters/Bloomberg 기사를 finance.yahoo.com 에 재게시하므로),
+    없으면 URL 호스트 → source 를 도메인으로 → 기본값
+    """
+    source = (source or "").strip().lower()
+    for w in (_name_weight(source, weights) if source else None,
+              _domain_weight(host.lower(), weights) if host else None,
+              _domain_weight(source, weights) if "." in source else None):
+        if w is not None:
+            return w
+    return DEFAULT_SOURCE_WEIGHT
+
+
+def ticker_pattern(ticker: str) -> re.Pattern:
+    """티커 단어 매칭 (AAPL, $AAPL / XAAPL 은 제외)"""
+    return re.compile(rf"(?<!\w)\$?{re.escape(ticker)}(?!\w)", re.IGNORECASE)
+
+
+def relevance(pat: re.Pattern, title: str, summary: str) -> float:
+    """제목에 티커가 있으면 1.0, 요약에만 있으면 0.6, 없으면 0.3"""
+    if pat.search(title or ""):
+        return 1.0
+    if pat.search(summary or ""):
+        return 0.6
+    return 0.3
+
+
+# -------------------------
+# 중복 제거 + 랭킹
+# -------------------------
+def rank_news(records: List[Dict[str, Any]],
+              ticker: str,
+              k: int = 5,
+              max_distance: int = 12,
+              half_life_hours: float = 24.0,
+              weights: tuple[float, float, float] = (0.5, 0.3, 0.2),
+              source_weights: Dict[str, float] | None = None,
+              now: float | None = None) -> List[Dict[str, Any]]:
+    """
+    records: node_yahoo 가 정규화한 뉴스 {"title", "summary", "url", "published"?, "source"?, ...}
+    반환: 중복 묶음마다 대표 1건씩, 랭킹 순 상위 k개 (대표 레코드 사본에 "duplicates": 제외된 중복 수)
+    weights: (최신성, 출처, 관련도)
+    """
+    n = len(records)
+    if n == 0 or k <= 0:
+        return []
+    now = time.time() if now is None else now
+    sw = {**DEFAULT_SOURCE_WEIGHTS, **(source_weights or {})}
+    titles = [r.get("title") or "" for r in records]
+    summaries = [r.get("summary") or "" for r in records]
+
+    # 최신성: 게시 시각이 있으면 반감기 감쇠, 없으면 제공 순서(최신순 가정)로 1 → 0.5
+    published = np.array([parse_published(r.get("published")) or np.nan for r in records], dtype=np.float64)
+    age_h = np.maximum(now - published, 0.0) / 3600.0
+    recency = np.where(np.isnan(published), 1.0 - 0.5 * np.arange(n) / max(n - 1, 1),
+                       np.power(0.5, age_h / max(half_life_hours, 1e-6)))
+    hosts, urls = zip(*(split_url(r.get("url")) for r in records))
+    src = np.array([source_weight(str(r.get("source") or ""), sw, h) for r, h in zip(records, hosts)])
+    pat = ticker_pattern(ticker)
+    rel = np.array([relevance(pat, t, s) for t, s in zip(titles, summaries)])
+    w_rec, w_src, w_rel = weights
+    score = w_rec * recency + w_src * src + w_rel * rel
+
+    fps = simhash64(titles, summaries)
+    has_text = fps != 0
+    _, url_ids = np.unique(urls, return_inverse=True)
+    url_ids = np.where([bool(u) for u in urls], url_ids, -1 - np.arange(n))  # URL 없는 기사끼리는 같지 않음
+
+    remaining = np.ones(n, dtype=bool)
+    out: List[Dict[str, Any]] = []
+    while len(out) < k and remaining.any():
+        i = int(np.argmax(np.where(remaining, score, -np.inf)))
+        dup = url_ids == url_ids[i]
+        if has_text[i]:
+            dup |= has_text & (hamming(fps, fps[i]) <= max_distance)
+        dup &= remaining
+        remaining &= ~dup
+        out.append({**records[i], "duplicates": int(dup.sum()) - 1})
+    return out
@@ -1,19 +1,39 @@
 from __future__ import annotations
+from typing import Any, Dict, List, Tuple
+from app.settings import settings
 from app.workflow.state import ScoreState
 # ✅ 간단 버전 mcp_clients 기반
 from app.workflow.mcp_clients import (
     open_mcp_client,
     get_stock_info,
     get_yahoo_finance_news,
+    get_historical_stock_prices,
+    get_option_expiration_dates,
+    get_option_chain,
+    get_financial_statement,
+    get_holder_info,
     # 선택: 필요 시 불러와 사용
-    # get_historical_stock_prices,
     # get_recommendations,
 )
+from app.workflow.fanout import ToolCall, fan_out
 from app.workflow.llm import llm_naver
-from app.workflow.prompts import render_prompt
-from app.workflow.trace import traced
+from app.workflow.llm_batcher import score_batcher
+from app.workflow.prompts import ScoreStreamParser, render_prompt, parse_score
+from app.workflow.score_cache import score_cache, score_fingerprint
+from app.workflow.news_rank import rank_news
+from app.workflow.bar_store import bar_store
+from app.workflow.fundamentals import (
+    FUNDAMENTALS_POLICY, fundamental_features, fundamentals_cache, statements_spec,
+)
+from app.workflow.option_metrics import combine_chains, option_features, parse_chain, parse_expirations
+from app.workflow.technicals import TechnicalsBatcher, parse_history, technicals_batching, technicals_for
+from app.workflow.trace import record_call, traced
+import asyncio
 import json
 import re
+import time
+from langgraph.config import get_stream_writer
+from app.metrics import ERRORS, LLM_SECONDS, LLM_STREAM_SECONDS
 
 # ── 병렬 MCP 노드: yahoo ─────────────────────────────────────────────────────
 # -------------------------
@@ -29,18 +49,62 @@ def _parse_news_blocks(s: str, limit: int = 5) -> List[Dict[str, Any]]:
         summary = re.search(r"^Summary:\s*(.*)$", b, re.MULTILINE)
         desc = re.search(r"^Description:\s*(.*)$", b, re.MULTILINE)
         url = re.search(r"^URL:\s*(.*)$", b, re.MULTILINE)
+        published = re.search(r"^(?:Published|PubDate|Date):\s*(.*)$", b, re.MULTILINE | re.IGNORECASE)
+        source = re.search(r"^(?:Source|Publisher|Provider):\s*(.*)$", b, re.MULTILINE | re.IGNORECASE)
         out.append({
             "title": (title.group(1).strip() if title else None),
             "summary": (summary.group(1).strip() if summary else None) or (desc.group(1).strip() if desc else None),
             "sentiment": None,
             "url": (url.group(1).strip() if url else None),
+            "published": (published.group(1).strip() if published else None),
+            "source": (source.group(1).strip() if source else None),
         })
     return out
+
+
+def _news_record(n: Dict[str, Any]) -> Dict[str, Any]:
+    """list/dict(items) 형태 뉴스 1건 정규화 (yfinance 는 content 아래에 본문 필드가 있기도 함)"""
+    c = n.get("content") if isinstance(n.get("content"), dict) else n
+    provider = c.get("provider") if isinstance(c.get("provider"), dict) else {}
+    url = c.get("canonicalUrl") if isinstance(c.get("canonicalUrl"), dict) else {}
+    return {
+        "title": c.get("title"),
+        "summary": c.get("summary") or c.get("description"),
+        "sentiment": c.get("sentiment"),
+        "url": c.get("link") or c.get("url") or url.get("url"),
+        "published": c.get("pubDate") or c.get("providerPublishTime") or c.get("published"),
+        "source": provider.get("displayName") or c.get("publisher") or c.get("source"),
+    }
+
+
+def _rank_news(ticker: str, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    t0 = time.perf_counter()
+    out = rank_news(
+        records, ticker,
+        k=settings.news_top_k,
+        max_distance=settings.news_dedup_max_distance,
+        half_life_hours=settings.news_half_life_hours,
+        weights=(settings.news_weight_recency, settings.news_weight_source, settings.news_weight_relevance),
+        source_weights=settings.news_source_weights,
+    )
+    record_call("news_rank", int((time.perf_counter() - t0) * 1000))
+    return out
+
+# yahoo 노드의 독립 MCP 호출 (동시 실행, 호출별 timeout / 부분 결과 허용)
+YAHOO_CALLS = [
+    ToolCall("info", get_stock_info, timeout=settings.yahoo_info_timeout),
+    ToolCall("news", get_yahoo_finance_news, timeout=settings.yahoo_news_timeout),
+]
+# 호출 → 요청 sources 이름 (선택되지 않은 호출은 건너뜀)
+YAHOO_CALL_SOURCES = {"info": "price", "news": "news"}
+
 @traced("yahoo")
 async def node_yahoo(state: "ScoreState") -> dict:
+    sources = state.get("sources")
+    calls = [c for c in YAHOO_CALLS if not sources or YAHOO_CALL_SOURCES[c.key] in sources]
     async with open_mcp_client() as client:
-        info = await get_stock_info(client, state["ticker"])
-        news = await get_yahoo_finance_news(client, state["ticker"])
+        res = await fan_out(client, state["ticker"], calls)
+    info, news = res.get("info"), res.get("news")
 
     # --- 가격 정규화 ---
     # --- get_stock_info: 문자열(JSON) 또는 dict 모두 처리 ---
@@ -90,33 +154,178 @@ async def node_yahoo(state: "ScoreState") -> dict:
             # "currency": raw_info.get("currency"),
         }
 
-    # --- 뉴스 정규화 (list | dict(items) | str) ---
+    # --- 뉴스 정규화 (list | dict(items) | str) → 중복 제거/랭킹 후 상위 news_top_k ---
+    limit = settings.news_max_candidates
     norm_news: List[Dict[str, Any]] = []
     if isinstance(news, list):
-        for n in news[:5]:
-            norm_news.append({
-                "title": n.get("title"),
-                "summary": n.get("summary") or n.get("description"),
-                "sentiment": n.get("sentiment"),
-                "url": n.get("link") or n.get("url"),
-            })
+        norm_news = [_news_record(n) for n in news[:limit] if isinstance(n, dict)]
     elif isinstance(news, dict) and "items" in news:
-        for n in news["items"][:5]:
-            norm_news.append({
-                "title": n.get("title"),
-                "summary": n.get("summary") or n.get("description"),
-                "sentiment": n.get("sentiment"),
-                "url": n.get("link") or n.get("url"),
-            })
+        norm_news = [_news_record(n) for n in news["items"][:limit] if isinstance(n, dict)]
     elif isinstance(news, str):
-        norm_news = _parse_news_blocks(news, limit=5)
+        norm_news = _parse_news_blocks(news, limit=limit)
+    if norm_news:
+        # 수백 건 이상이면 이벤트 루프를 막지 않도록 스레드에서 (trace 컨텍스트는 to_thread 가 복사)
+        if len(norm_news) > 200:
+            norm_news = await asyncio.to_thread(_rank_news, state["ticker"], norm_news)
+        else:
+            norm_news = _rank_news(state["ticker"], norm_news)
 
     return {
         "price": price,
         "news": norm_news,
-        "logs": ["yahoo:ok"],
+        "logs": [f"yahoo:partial {sorted(res.errors)}" if res.partial else "yahoo:ok"],
     }
 
+# -------------------------
+# Node 1c: History (병렬) - 가격 이력 → 기술적 지표
+# -------------------------
+async def load_history(client, ticker: str, period: str, interval: str):
+    """기간 봉 → parse_history 형태. 저장소 사용 시 마지막 저장 봉 이후만 상류 조회하고 memmap 뷰 반환"""
+    if not settings.bar_store_enabled:
+        return parse_history(await get_historical_stock_prices(client, ticker, period=period, interval=interval))
+    return await bar_store.history(
+        ticker, interval, period,
+        lambda p: get_historical_stock_prices(client, ticker, period=p, interval=interval),
+    )
+
+
+technicals_batcher = TechnicalsBatcher(
+    window=settings.technicals_batch_window_ms / 1000.0,
+    max_batch=settings.technicals_batch_max_size,
+    periods_per_year=settings.history_periods_per_year,
+)
+
+HISTORY_CALLS = [
+    ToolCall("history", load_history, timeout=settings.history_timeout,
+             kwargs={"period": settings.history_period, "interval": settings.history_interval}),
+]
+
+@traced("history")
+async def node_history(state: ScoreState) -> dict:
+    if not settings.history_enabled:
+        return {"technicals": None, "logs": ["history:off"]}
+    async with open_mcp_client() as client:
+        res = await fan_out(client, state["ticker"], HISTORY_CALLS)
+    if res.partial:
+        return {"technicals": None, "logs": [f"history:partial {sorted(res.errors)}"]}
+
+    # 지표 계산: 단건은 1행짜리 2-D 배치로 바로, run_batch 안에서는 시간창에 모인 종목들과 (N, T) 배열 1개로
+    t0 = time.perf_counter()
+    history = res.get("history")
+    technicals = None
+    if history and settings.technicals_batch_enabled and technicals_batching.get():
+        technicals = await technicals_batcher.compute(history)
+    elif history:
+        technicals = technicals_for(history, settings.history_periods_per_year)
+    record_call("technicals", int((time.perf_counter() - t0) * 1000))
+    return {"technicals": technicals, "logs": ["history:ok" if technicals else "history:empty"]}
+
+# -------------------------
+# Node 1d: Options (병렬) - 만기별 calls/puts 체인 → 풋/콜 비율, IV 기간 구조, 스큐
+# -------------------------
+async def load_option_chains(client, ticker: str) -> Tuple[List[Tuple[str, str, Any]], int]:
+    """
+    가까운 만기 options_max_expirations 개 × (calls, puts) 를 동시성 상한 안에서 조회 → ([(만기, 유형, 체인)], 실패 수).
+    체인은 도착하는 대로 파싱하고, 노드 예산(options_timeout)을 넘긴 호출은 취소해 받은 것만 쓴다
+    → 만기 수가 늘어도 종목당 지연은 예산 안에 머문다. 체인 결과 캐시는 call_tool 의 툴 캐시(get_option_chain TTL)
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.options_timeout
+    expirations = parse_expirations(await asyncio.wait_for(
+        get_option_expiration_dates(client, ticker), settings.options_call_timeout,
+    ))[:max(0, settings.options_max_expirations)]
+    sem = asyncio.Semaphore(max(1, settings.options_concurrency))
+
+    async def _one(expiration: str, kind: str):
+        async with sem:
+            data = await asyncio.wait_for(get_option_chain(client, ticker, expiration, kind),
+                                          settings.options_call_timeout)
+        return expiration, kind, parse_chain(data)
+
+    tasks = [asyncio.create_task(_one(e, k)) for e in expirations for k in ("calls", "puts")]
+    if not tasks:
+        return [], 0
+    done, pending = await asyncio.wait(tasks, timeout=max(0.0, deadline - loop.time()))
+    for t in pending:
+        t.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    chains = [t.result() for t in done if t.exception() is None]
+    return chains, len(tasks) - len(chains)
+
+
+@traced("options")
+async def node_options(state: ScoreState) -> dict:
+    if not settings.options_enabled:
+        return {"options": None, "logs": ["options:off"]}
+    t0 = time.perf_counter()
+    try:
+        async with open_mcp_client() as client:
+            chains, failed = await load_option_chains(client, state["ticker"])
+    except Exception as e:
+        status = "timeout" if isinstance(e, asyncio.TimeoutError) else "error"
+        record_call("chains", int((time.perf_counter() - t0) * 1000), status, f"{type(e).__name__}: {e}")
+        return {"options": None, "logs": [f"options:{status}"]}
+    record_call("chains", int((time.perf_counter() - t0) * 1000),
+                "ok" if not failed else "partial", f"{failed} chain calls failed" if failed else None)
+
+    t0 = time.perf_counter()
+    chain = combine_chains(chains)
+    options = option_features(chain)
+    record_call("option_metrics", int((time.perf_counter() - t0) * 1000))
+    if options is None:
+        return {"options": None, "logs": ["options:empty"]}
+    options["failed_calls"] = failed
+    return {"options": options, "logs": [f"options:partial {failed}" if failed else "options:ok"]}
+
+# -------------------------
+# Node 1e: Fundamentals (병렬) - 재무제표 6종 + 주요 주주 → 재무 비율
+# -------------------------
+FUNDAMENTALS_CALLS = [
+    ToolCall(key, get_financial_statement, timeout=settings.fundamentals_timeout,
+             kwargs={"financial_type": ftype})
+    for key, ftype in statements_spec()
+] + [
+    ToolCall("holders", get_holder_info, timeout=settings.fundamentals_timeout,
+             kwargs={"holder_type": "major_holders"}),
+]
+
+
+async def load_fundamentals(ticker: str) -> Dict[str, Any] | None:
+    """
+    표 6종 + 주요 주주를 동시에 조회해 비율 계산 (실패한 호출은 빈 표로).
+    stale 갱신에서도 쓰이므로 호출자 lease 대신 자체 클라이언트를 연다
+    """
+    async with open_mcp_client() as client:
+        res = await fan_out(client, ticker, FUNDAMENTALS_CALLS)
+    t0 = time.perf_counter()
+    features = fundamental_features({key: res.get(key) for key, _ in statements_spec()}, res.get("holders"))
+    record_call("fundamental_metrics", int((time.perf_counter() - t0) * 1000))
+    if features is not None:
+        features["failed_calls"] = len(res.errors)
+    return features
+
+
+@traced("fundamentals")
+async def node_fundamentals(state: ScoreState) -> dict:
+    """
+    재무 비율은 분기마다만 바뀌므로 티커별 결과를 다음 실적 발표 예상 시각까지 캐시 (FUNDAMENTALS_POLICY).
+    히트면 MCP lease 도 열지 않는다 → /score 마다 돌려도 dict 조회 한 번
+    """
+    if not settings.fundamentals_enabled:
+        return {"fundamentals": None, "logs": ["fundamentals:off"]}
+    ticker = state["ticker"].strip().upper()
+    try:
+        fundamentals = await fundamentals_cache.get_or_load(
+            ticker, lambda: load_fundamentals(ticker), FUNDAMENTALS_POLICY, label="fundamentals",
+        )
+    except Exception as e:
+        record_call("statements", 0, "error", f"{type(e).__name__}: {e}")
+        return {"fundamentals": None, "logs": ["fundamentals:error"]}
+    if fundamentals is None:
+        return {"fundamentals": None, "logs": ["fundamentals:empty"]}
+    failed = fundamentals.get("failed_calls")
+    return {"fundamentals": fundamentals, "logs": [f"fundamentals:partial {failed}" if failed else "fundamentals:ok"]}
+
 @traced("dart")
 async def node_dart(state: ScoreState) -> dict:
     # DART 노드 구현 (예: 공시 데이터 수집)
@@ -131,32 +340,95 @@ async def node_dart(state: ScoreState) -> dict:
     }
 
 # ── Score 노드(Clova X 호출) ─────────────────────────────────────────────────
+async def _stream_llm(ticker: str, prompt: str) -> Tuple[str, int | None]:
+    """
+    LLM 응답을 토큰 단위로 받아 custom 스트림에 전달 (stream_mode 에 "custom" 이 없으면 writer 는 무시됨)
+    - {"event": "delta", "text": ...}: 도착한 토큰
+    - {"event": "score", "score": n}: JSON 의 score 값이 확정되는 즉시 (근거 문장 완료 전)
+    반환: (전체 텍스트, 스트림에서 보낸 score 또는 None)
+    """
+    writer = get_stream_writer()
+    parser = ScoreStreamParser()
+    parts: List[str] = []
+    t0 = time.perf_counter()
+    async for chunk in llm_naver.astream(prompt):
+        text = getattr(chunk, "content", None) or ""
+        if not isinstance(text, str) or not text:
+            continue
+        if not parts:
+            LLM_STREAM_SECONDS.observe(time.perf_counter() - t0, "first_token")
+        parts.append(text)
+        writer({"event": "delta", "ticker": ticker, "text": text})
+        score = parser.feed(text)
+        if score is not None:
+            LLM_STREAM_SECONDS.observe(time.perf_counter() - t0, "score")
+            writer({"event": "score", "ticker": ticker, "score": score})
+    return "".join(parts), parser.score
+
+
 @traced("score")
 async def node_score(state: ScoreState) -> dict:
-    prompt = render_prompt(
-        ticker=state["ticker"],
-        price=state.get("price"),
-        news=state.get("news"),
-        filings=state.get("filings"),
-    )
+    # 입력 지문(티커/가격 버킷/뉴스 URL/공시)이 같으면 LLM 호출 없이 캐시 결과 사용
+    cache_key = None
+    if settings.score_cache_enabled:
+        cache_key = score_fingerprint(
+            state["ticker"], state.get("price"), state.get("news"), state.get("filings"),
+            technicals=state.get("technicals"), options=state.get("options"),
+            fundamentals=state.get("fundamentals"),
+        )
+        cached = await score_cache.get(cache_key)
+        if cached is not None:
+            return {
+                "score": cached["score"],
+                "rationale": cached["rationale"],
+                "score_cached": True,
+                "logs": ["score:cache-hit"],
+            }
 
-    # LangChain ChatClovaX 호출
-    resp = await llm_naver.ainvoke(prompt)
-    # resp.content(혹은 resp.response) 구조는 사용하는 어댑터에 맞게 확인
-    text = getattr(resp, "content", None) or str(resp)
+    if settings.llm_batch_enabled:
+        # 같은 시간창의 다른 종목 요청과 묶어서 채점 (다종목 프롬프트 / abatch)
+        score, rationale, parsed = await score_batcher.score(
+            state["ticker"], state.get("price"), state.get("news"), state.get("filings"),
+            state.get("technicals"), state.get("options"), state.get("fundamentals"),
+        )
+    else:
+        prompt = render_prompt(
+            ticker=state["ticker"],
+            price=state.get("price"),
+            news=state.get("news"),
+            filings=state.get("filings"),
+            technicals=state.get("technicals"),
+            options=state.get("options"),
+            fundamentals=state.get("fundamentals"),
+        )
 
-    # 모델에게 JSON을 요청했으므로 파싱 시도
-    score, rationale = None, None
-    try:
-        data = json.loads(text)
-        score = int(data.get("score"))
-        rationale = data.get("rationale")
-    except Exception:
-        # 파싱 실패 시 보수적 폴백
-        rationale = text[:200]
-        score = 50
-
-    return {"score": score, "rationale": rationale, "logs": ["score:ok"]}
+        # LangChain ChatClovaX 호출 (스트리밍이면 토큰을 그대로 흘려보내고 전체 텍스트는 모아서 파싱)
+        t0 = time.perf_counter()
+        early_score = None
+        try:
+            if settings.llm_stream_enabled:
+                text, early_score = await _stream_llm(state["ticker"], prompt)
+            else:
+                resp = await llm_naver.ainvoke(prompt)
+                # resp.content(혹은 resp.response) 구조는 사용하는 어댑터에 맞게 확인
+                text = getattr(resp, "content", None) or str(resp)
+        except Exception:
+            ERRORS.inc("llm")
+            raise
+        finally:
+            LLM_SECONDS.observe(time.perf_counter() - t0, "stream" if settings.llm_stream_enabled else "single")
+
+        # 모델에게 JSON을 요청했으므로 파싱 시도 (실패 시 보수적 폴백 50)
+        score, rationale, parsed = parse_score(text)
+        if early_score is not None:
+            # 클라이언트가 이미 받은 score 이벤트와 최종 결과가 항상 같도록
+            score = early_score
+
+    # 폴백 값은 캐시하지 않음
+    if cache_key is not None and parsed:
+        await score_cache.set(cache_key, {"score": score, "rationale": rationale})
+
+    return {"score": score, "rationale": rationale, "score_cached": False, "logs": ["score:ok"]}
 
 # ── Finalize ─────────────────────────────────────────────────────────────────
 @traced("finalize")
@@ -0,0 +1,218 @@
+# app/workflow/option_metrics.py
+"""
+옵션 체인(만기 × calls/puts) → 옵션 신호 (모든 만기를 하나의 배열로 합쳐 numpy 로 일괄 계산).
+- 풋/콜 비율: 거래량, 미결제약정(OI) 합계 기준
+- IV 기간 구조: 만기별 ATM IV (콜/풋 ATM 평균) → 근월/원월, 기울기
+- 스큐: 만기별 IV(풋, 행사가 ≈ 현물×0.9) − IV(콜, ≈ 현물×1.1), 만기 30일에 가장 가까운 값을 대표로
+- 현물가는 인자로 받거나, 근월 콜의 inTheMoney 경계(ITM 최고 행사가와 OTM 최저 행사가의 중간)로 추정
+"만기×유형 그룹별 목표 행사가에 가장 가까운 계약" 은 lexsort 한 번으로 그룹별 최솟값을 고른다.
+"""
+from __future__ import annotations
+import json
+import math
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DAY = 86400
+IV_MIN, IV_MAX = 0.01, 5.0   # yfinance 가 주는 0.00001 같은 무효 IV 제외
+SKEW_MONEYNESS = (0.9, 1.1)  # (풋, 콜) 행사가 / 현물
+SKEW_TARGET_DTE = 30.0
+_EXPIRY_UTC_HOUR = 20        # 미국 옵션 만기 16:00 ET ≈ 20:00 UTC
+
+
+# -------------------------
+# 툴 결과 파싱
+# -------------------------
+def _loads(data: Any) -> Any:
+    if isinstance(data, str):
+        try:
+            return json.loads(data)
+        except ValueError:
+            return None
+    return data
+
+
+def parse_expirations(data: Any) -> List[str]:
+    """get_option_expiration_dates 결과 → 'YYYY-MM-DD' 목록 (가까운 순)"""
+    data = _loads(data)
+    if isinstance(data, dict):
+        data = data.get("expirations") or data.get("options") or []
+    if not isinstance(data, list):
+        return []
+    return sorted({str(x).strip()[:10] for x in data if x})
+
+
+def _col(rows: List[Dict[str, Any]], key: str) -> np.ndarray:
+    values = [r.get(key) for r in rows]
+    try:
+        return np.array(values, dtype=np.float64)  # None → NaN
+    except (TypeError, ValueError):
+        out = np.full(len(values), np.nan)
+        for i, v in enumerate(values):
+            try:
+                out[i] = float(v)
+            except (TypeError, ValueError):
+                pass
+        return out
+
+
+def parse_chain(data: Any) -> Optional[Dict[str, np.ndarray]]:
+    """get_option_chain 결과(records JSON) → strike / volume / oi / iv / itm 컬럼"""
+    data = _loads(data)
+    if isinstance(data, dict):
+        data = data.get("contracts") or data.get("records") or []
+    rows = [r for r in data if isinstance(r, dict)] if isinstance(data, list) else []
+    if not rows:
+        return None
+    return {
+        "strike": _col(rows, "strike"),
+        "volume": _col(rows, "volume"),
+        "oi": _col(rows, "openInterest"),
+        "iv": _col(rows, "impliedVolatility"),
+        "itm": np.array([bool(r.get("inTheMoney")) for r in rows]),
+    }
+
+
+def days_to_expiry(expiration: str, now: Optional[float] = None) -> float:
+    now = time.time() if now is None else now
+    try:
+        d = datetime.strptime(expiration[:10], "%Y-%m-%d").replace(hour=_EXPIRY_UTC_HOUR, tzinfo=timezone.utc)
+    except ValueError:
+        return math.nan
+    return max((d.timestamp() - now) / DAY, 0.0)
+
+
+def combine_chains(chains: Sequence[Tuple[str, str, Dict[str, np.ndarray]]],
+                   now: Optional[float] = None) -> Optional[Dict[str, np.ndarray]]:
+    """[(만기, "calls"|"puts", parse_chain 결과)] → 한 배열로 합친 체인 (+ 만기 번호 exp, is_put, 만기별 exp_dte)"""
+    chains = [c for c in chains if c[2] is not None and len(c[2]["strike"])]
+    if not chains:
+        return None
+    expirations = sorted({e for e, _, _ in chains})
+    index = {e: i for i, e in enumerate(expirations)}
+    dte = np.array([days_to_expiry(e, now) for e in expirations])
+    sizes = [len(c[2]["strike"]) for c in chains]
+    out = {k: np.concatenate([c[2][k] for c in chains]) for k in ("strike", "volume", "oi", "iv", "itm")}
+    out["exp"] = np.repeat([index[e] for e, _, _ in chains], sizes)
+    out["is_put"] = np.repeat([kind == "puts" for _, kind, _ in chains], sizes)
+    out["expirations"] = np.array(expirations)
+    out["exp_dte"] = dte
+    return out
+
+
+# -------------------------
+# 지표
+# -------------------------
+def estimate_spot(chain: Dict[str, np.ndarray]) -> Optional[float]:
+    """근월 콜의 ITM/OTM 경계 행사가 중간값 (콜은 행사가 < 현물이면 ITM)"""
+    front = (chain["exp"] == chain["exp"].min()) & ~chain["is_put"] & np.isfinite(chain["strike"])
+    itm = chain["strike"][front & chain["itm"]]
+    otm = chain["strike"][front & ~chain["itm"]]
+    if len(itm) and len(otm):
+        return float((itm.max() + otm.min()) / 2)
+    if len(itm) or len(otm):
+        return float(itm.max() if len(itm) else otm.min())
+    strikes = chain["strike"][np.isfinite(chain["strike"])]
+    return float(np.median(strikes)) if len(strikes) else None
+
+
+def _nearest_iv(group: np.ndarray, dist: np.ndarray, iv: np.ndarray, n_groups: int) -> np.ndarray:
+    """그룹별로 dist 가 가장 작은 계약의 IV (그룹에 유효 계약이 없으면 NaN)"""
+    order = np.lexsort((dist, group))
+    g = group[order]
+    first = order[np.r_[True, g[1:] != g[:-1]]] if len(g) else order
+    out = np.full(n_groups, np.nan)
+    out[group[first]] = iv[first]
+    return out
+
+
+def _ratio(num: float, den: float) -> Optional[float]:
+    return round(float(num / den), 4) if den > 0 else None
+
+
+def option_features(chain: Optional[Dict[str, np.ndarray]], spot: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """combine_chains 결과 → 상태/프롬프트용 dict (Python float, 없는 값은 None)"""
+    if chain is None:
+        return None
+    spot = spot if spot and spot > 0 else estimate_spot(chain)
+    is_put = chain["is_put"]
+    vol = np.nan_to_num(chain["volume"])
+    oi = np.nan_to_num(chain["oi"])
+    out: Dict[str, Any] = {
+        "spot": round(spot, 4) if spot else None,
+        "expirations": int(len(chain["expirations"])),
+        "contracts": int(len(chain["strike"])),
+        "put_call_volume": _ratio(vol[is_put].sum(), vol[~is_put].sum()),
+        "put_call_oi": _ratio(oi[is_put].sum(), oi[~is_put].sum()),
+        "term": [],
+        "atm_iv_near": None, "atm_iv_far": None, "term_slope": None,
+        "skew": None, "skew_dte": None,
+    }
+    if not spot:
+        return out
+
+    ok = (chain["iv"] > IV_MIN) & (chain["iv"] < IV_MAX) & np.isfinite(chain["strike"])
+    if not ok.any():
+        return out
+    n_exp = len(chain["expirations"])
+    exp, put, iv = chain["exp"][ok], is_put[ok], chain["iv"][ok]
+    money = chain["strike"][ok] / spot
+    group = exp * 2 + put  # 만기 × (콜 0 / 풋 1)
+
+    atm = _nearest_iv(group, np.abs(money - 1.0), iv, n_exp * 2).reshape(n_exp, 2)
+    cnt = (~np.isnan(atm)).sum(axis=1)
+    atm_iv = np.where(cnt > 0, np.nansum(atm, axis=1) / np.maximum(cnt, 1), np.nan)  # 콜/풋 ATM 평균
+    put_wing = _nearest_iv(group, np.abs(money - SKEW_MONEYNESS[0]), iv, n_exp * 2).reshape(n_exp, 2)[:, 1]
+    call_wing = _nearest_iv(group, np.abs(money - SKEW_MONEYNESS[1]), iv, n_exp * 2).reshape(n_exp, 2)[:, 0]
+    skew = put_wing - call_wing
+
+    dte = chain["exp_dte"]
+    has = ~np.isnan(atm_iv)
+    out["term"] = [{"dte": round(float(d), 1), "atm_iv": round(float(v), 4)} for d, v in zip(dte[has], atm_iv[has])]
+    if has.any():
+        near, far = np.flatnonzero(has)[[0, -1]]
+        out["atm_iv_near"] = round(float(atm_iv[near]), 4)
+        out["atm_iv_far"] = round(float(atm_iv[far]), 4)
+        out["term_slope"] = round(float(atm_iv[far] - atm_iv[near]), 4) if far != near else None
+    has_skew = ~np.isnan(skew)
+    if has_skew.any():
+        i = np.flatnonzero(has_skew)[np.argmin(np.abs(dte[has_skew] - SKEW_TARGET_DTE))]
+        out["skew"] = round(float(skew[i]), 4)
+        out["skew_dte"] = round(float(dte[i]), 1)
+    return out
+
+
+def options_bucket(o: Optional[Dict[str, Any]]) -> Optional[Tuple[Any, ...]]:
+    """점수 캐시 지문용 거친 값 (풋/콜 OI 비율 0.1, 근월 ATM IV 2%p 단위)"""
+    if not o:
+        return None
+    pc = o.get("put_call_oi")
+    iv = o.get("atm_iv_near")
+    return (round(pc, 1) if pc is not None else None, round(iv * 50) if iv is not None else None)
+
+
+# -------------------------
+# 프롬프트 요약
+# -------------------------
+def summarize_options(o: Optional[Dict[str, Any]]) -> str:
+    """'P/C 거래량 0.85, OI 1.10 | ATM IV 28%(7일) → 31%(90일) | 스큐(30일) +4.2%p' 한 줄"""
+    if not o or not o.get("contracts"):
+        return "(데이터 없음)"
+    parts: List[str] = []
+    pcs = [f"{label} {o[k]:.2f}" for k, label in (("put_call_volume", "거래량"), ("put_call_oi", "OI"))
+           if o.get(k) is not None]
+    if pcs:
+        parts.append("P/C " + ", ".join(pcs))
+    term = o.get("term") or []
+    if term:
+        first, last = term[0], term[-1]
+        line = f"ATM IV {first['atm_iv'] * 100:.0f}%({first['dte']:.0f}일)"
+        if len(term) > 1:
+            line += f" → {last['atm_iv'] * 100:.0f}%({last['dte']:.0f}일)"
+        parts.append(line)
+    if o.get("skew") is not None:
+        parts.append(f"스큐({o['skew_dte']:.0f}일, 90%P-110%C) {o['skew'] * 100:+.1f}%p")
+    return " | ".join(parts) if parts else "(데이터 없음)"
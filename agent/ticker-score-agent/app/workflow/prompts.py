@@ -1,7 +1,12 @@
 from __future__ import annotations
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
+import json
 import logging
 
+from app.workflow.fundamentals import summarize_fundamentals
+from app.workflow.option_metrics import summarize_options
+from app.workflow.technicals import summarize_technicals
+
 LOGGER = logging.getLogger("ticker-graph")
 
 PROMPT_TEMPLATE = """\
@@ -11,6 +16,9 @@ PROMPT_TEMPLATE = """\
 [컨텍스트]
 - 종목: {ticker}
 - 가격: last={last}, change={change}
+- 기술지표: {tech_line}
+- 옵션: {options_line}
+- 재무: {fundamentals_line}
 
 - 뉴스(최대 5개):
 {news_lines}
@@ -23,10 +31,36 @@ PROMPT_TEMPLATE = """\
 - 예: {{"score": 87, "rationale": "긍정적 뉴스와 안정적 가격 흐름"}}
 """
 
-def render_prompt(ticker: str,
-                  price: dict | None,
-                  news: list[dict] | None,
-                  filings: list[dict] | None) -> str:
+MULTI_PROMPT_TEMPLATE = """\
+당신은 한국어로 금융 뉴스를 요약하고 투자 관점의 점수를 산정하는 애널리스트입니다.
+아래 {count}개 종목 각각에 대해 1~100 사이의 점수와 짧은 한국어 근거를 생성하세요.
+
+{blocks}
+
+[요구사항]
+- 종목마다 "ticker", 숫자만 포함된 "score"(정수), "rationale"(짧은 한국어 문장 1~3개)를 가진 객체
+- 입력 순서대로 JSON 배열 하나만 출력
+- 예: [{{"ticker": "AAPL", "score": 87, "rationale": "긍정적 뉴스와 안정적 가격 흐름"}}]
+"""
+
+CONTEXT_BLOCK = """\
+[종목 {idx}: {ticker}]
+- 가격: last={last}, change={change}
+- 기술지표: {tech_line}
+- 옵션: {options_line}
+- 재무: {fundamentals_line}
+- 뉴스(최대 5개):
+{news_lines}
+- 공시요약(최대 5개):
+{filing_lines}"""
+
+
+def _context_fields(price: dict | None,
+                    news: list[dict] | None,
+                    filings: list[dict] | None,
+                    technicals: dict | None = None,
+                    options: dict | None = None,
+                    fundamentals: dict | None = None) -> Dict[str, Any]:
     last = price.get("last") if price else None
     change = price.get("chg") or price.get("change") if price else None
 
@@ -50,16 +84,166 @@ def render_prompt(ticker: str,
     else:
         filing_lines = "  - (데이터 없음)\n"
 
-    prompt = PROMPT_TEMPLATE.format(
-        ticker=ticker,
-        last=last,
-        change=change,
-        news_lines=news_lines.rstrip(),
-        filing_lines=filing_lines.rstrip()
-    )
+    return {
+        "last": last,
+        "change": change,
+        "tech_line": summarize_technicals(technicals),
+        "options_line": summarize_options(options),
+        "fundamentals_line": summarize_fundamentals(fundamentals),
+        "news_lines": news_lines.rstrip(),
+        "filing_lines": filing_lines.rstrip(),
+    }
+
+
+def render_prompt(ticker: str,
+                  price: dict | None,
+                  news: list[dict] | None,
+                  filings: list[dict] | None,
+                  technicals: dict | None = None,
+                  options: dict | None = None,
+                  fundamentals: dict | None = None) -> str:
+    prompt = PROMPT_TEMPLATE.format(ticker=ticker, **_context_fields(price, news, filings, technicals, options,
+                                                                     fundamentals))
 
     # --- 로그/트레이스 남기기 ---
     preview = prompt if len(prompt) < 500 else prompt[:500] + "…"
     LOGGER.info("[prompt] ticker=%s, preview=%s", ticker, preview)
 
     return prompt
+
+
+def render_multi_prompt(items: List[Dict[str, Any]]) -> str:
+    """items: [{"ticker", "price", "news", "filings", "technicals", "options", "fundamentals"}, ...] → 다종목 1회 호출용 프롬프트"""
+    blocks = "\n\n".join(
+        CONTEXT_BLOCK.format(
+            idx=i + 1,
+            ticker=it["ticker"],
+            **_context_fields(it.get("price"), it.get("news"), it.get("filings"),
+                               it.get("technicals"), it.get("options"), it.get("fundamentals")),
+        )
+        for i, it in enumerate(items)
+    )
+    prompt = MULTI_PROMPT_TEMPLATE.format(count=len(items), blocks=blocks)
+    LOGGER.info("[prompt] multi tickers=%s, chars=%d", [it["ticker"] for it in items], len(prompt))
+    return prompt
+
+
+# -------------------------
+# 응답 파싱
+# -------------------------
+def parse_score(text: str) -> Tuple[int, str | None, bool]:
+    """
+    단일 종목 응답 → (score, rationale, 파싱 성공 여부). 실패 시 보수적 폴백 50
+    ```json 펜스/앞뒤 설명문이 있어도 "score" 를 가진 첫 {…} 객체를 찾는다 (ScoreStreamParser 와 같은 값,
+    "77" 같은 문자열 숫자 포함)
+    """
+    decoder = json.JSONDecoder()
+    start = text.find("{")
+    while start >= 0:
+        try:
+            data, end = decoder.raw_decode(text, start)
+        except ValueError:
+            data, end = None, start + 1
+        if isinstance(data, dict) and "score" in data:
+            try:
+                return int(float(data["score"])), data.get("rationale"), True
+            except (TypeError, ValueError):
+                break
+        start = text.find("{", end)  # 최상위 객체만 (중첩 객체의 score 는 무시)
+    return 50, text[:200], False
+
+
+def parse_multi_scores(text: str) -> Dict[str, Tuple[int, str | None]]:
+    """
+    다종목 응답(JSON 배열) → {ticker: (score, rationale)}.
+    배열이 깨졌거나 일부 원소가 잘못돼도 파싱된 종목만 돌려준다 (나머지는 호출 측에서 개별 폴백).
+    """
+    start, end = text.find("["), text.rfind("]")
+    if start < 0 or end <= start:
+        return {}
+    try:
+        arr = json.loads(text[start:end + 1])
+    except Exception:
+        return {}
+    out: Dict[str, Tuple[int, str | None]] = {}
+    for el in arr if isinstance(arr, list) else []:
+        try:
+            out[str(el["ticker"]).strip().upper()] = (int(el["score"]), el.get("rationale"))
+        except Exception:
+            continue
+    return out
+
+
+class ScoreStreamParser:
+    """
+    토큰 스트림에서 최상위 객체의 "score" 값을 점진적으로 추출.
+    문자열/이스케이프/중첩 깊이를 추적해 rationale 안의 "score" 같은 텍스트는 무시하고,
+    값이 끝나는 순간(, } 공백 또는 닫는 따옴표) 정수로 돌려준다 → 근거 문장 생성 전에 점수 전송 가능.
+    """
+
+    def __init__(self) -> None:
+        self.score: int | None = None
+        self._depth = 0
+        self._in_str = False
+        self._esc = False
+        self._buf: list[str] = []     # 현재 문자열 토큰
+        self._key: str | None = None  # 직전에 읽은 최상위 키
+        self._want_value = False      # ':' 뒤, 값 시작 대기
+        self._value: list[str] | None = None  # score 값 수집 중
+        self._value_quoted = False
+
+    def feed(self, text: str) -> int | None:
+        """청크 추가. 이번 청크에서 score 가 확정되면 그 값, 아니면 None (확정 후에는 항상 None)"""
+        if self.score is not None:
+            return None
+        for ch in text:
+            if self._value is not None and self._collect(ch):
+                return self.score
+            if self._in_str:
+                if self._esc:
+                    self._esc = False
+                elif ch == "\\":
+                    self._esc = True
+                elif ch == '"':
+                    self._in_str = False
+                    if self._depth == 1 and not self._want_value:
+                        self._key = "".join(self._buf)
+                else:
+                    self._buf.append(ch)
+                continue
+            if ch == '"':
+                self._in_str, self._buf = True, []
+                if self._want_value:
+                    self._want_value = False
+                    if self._key == "score":
+                        self._value, self._value_quoted = [], True
+            elif ch in "{[":
+                self._depth += 1
+                self._want_value = False
+            elif ch in "}]":
+                self._depth -= 1
+            elif ch == ":" and self._depth == 1:
+                self._want_value = True
+            elif self._want_value and not ch.isspace():
+                self._want_value = False
+                if self._key == "score":
+                    self._value, self._value_quoted = [ch], False
+        return None
+
+    def _collect(self, ch: str) -> bool:
+        """score 값 문자 1개 처리, 값이 끝났으면 True"""
+        done = ch == '"' if self._value_quoted else (ch in ",}" or ch.isspace())
+        if not done:
+            self._value.append(ch)
+            return False
+        raw, self._value = "".join(self._value).strip(), None
+        try:
+            self.score = int(float(raw))
+            return True
+        except ValueError:
+            # 숫자가 아니면 무시 (최종 parse_score 폴백에 맡김)
+            if self._value_quoted:
+                self._in_str = False
+            elif ch == "}":
+                self._depth -= 1
+            return False
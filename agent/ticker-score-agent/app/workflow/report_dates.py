@@ -0,0 +1,61 @@
+# app/workflow/report_dates.py
+"""
+실적 발표 일정 → 캐시 TTL.
+- 다음 실적 발표 예상 시각 = 최근 기간 말 + 한 분기(연간이면 1년) + 공시 지연(일)
+- 그 시각까지 캐시 유지 (이미 지났는데 새 기간이 없으면 overdue_ttl 간격으로 다시 확인)
+툴 캐시(mcp_clients)와 비율 계산(fundamentals)이 같이 쓰므로 settings 외에는 의존하지 않는다
+"""
+from __future__ import annotations
+import json
+import math
+import time
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from app.settings import settings
+
+DAY = 86400
+QUARTER_DAYS = 91.3
+YEAR_DAYS = 365.25
+
+
+def period_epoch(date: Any) -> float:
+    """'2024-09-30' (뒤에 시각이 붙어도 됨) → UTC epoch, 아니면 NaN"""
+    try:
+        d = datetime.strptime(str(date)[:10], "%Y-%m-%d")
+    except ValueError:
+        return float("nan")
+    return d.replace(tzinfo=timezone.utc).timestamp()
+
+
+def next_report_at(latest_period_end: float, period: str = "quarterly") -> float:
+    """기간 말 → 다음 기간 실적이 공시될 것으로 예상되는 epoch"""
+    if period == "annual":
+        return latest_period_end + (YEAR_DAYS + settings.fundamentals_annual_lag_days) * DAY
+    return latest_period_end + (QUARTER_DAYS + settings.fundamentals_report_lag_days) * DAY
+
+
+def report_ttl(next_report: Optional[float], now: Optional[float] = None) -> float:
+    """다음 공시 예상 시각까지 남은 초 (모르거나 이미 지났으면 overdue_ttl, 최대 max_ttl)"""
+    now = time.time() if now is None else now
+    if next_report is None or not math.isfinite(next_report) or next_report <= now:
+        return settings.fundamentals_overdue_ttl
+    return min(next_report - now, settings.fundamentals_max_ttl)
+
+
+def statement_period(financial_type: str) -> str:
+    """financial_type → "quarterly" | "annual" (툴 캐시 TTL 계산용)"""
+    return "quarterly" if str(financial_type).startswith("quarterly_") else "annual"
+
+
+def statement_ttl(data: Any, period: str) -> float:
+    """get_financial_statement 원본 결과의 툴 캐시 TTL (최근 기간 말 기준)"""
+    rows = data
+    if isinstance(rows, str):
+        try:
+            rows = json.loads(rows)
+        except ValueError:
+            rows = None
+    dates = [period_epoch(r.get("date")) for r in rows if isinstance(r, dict)] if isinstance(rows, list) else []
+    dates = [d for d in dates if math.isfinite(d)]
+    return report_ttl(next_report_at(max(dates), period) if dates else None)
@@ -0,0 +1,153 @@
+# app/workflow/score_cache.py
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.settings import settings
+from a2a_common.cache import CachePolicy, TTLCache
+from app.workflow.fundamentals import fundamentals_key
+from app.workflow.option_metrics import options_bucket
+
+LOGGER = logging.getLogger("ticker-graph")
+
+
+# -------------------------
+# 입력 지문 (render_prompt 가 소비하는 값 기준)
+# -------------------------
+def price_bucket(last: Any, pct: float) -> Optional[int]:
+    """가격을 상대 pct(%) 폭의 로그 버킷으로 (100.0 과 100.2 는 0.5% 버킷에서 같은 값)"""
+    try:
+        last = float(last)
+    except (TypeError, ValueError):
+        return None
+    if last <= 0 or pct <= 0:
+        return None
+    return math.floor(math.log(last) / math.log1p(pct / 100.0))
+
+
+def score_fingerprint(ticker: str,
+                      price: dict | None,
+                      news: list[dict] | None,
+                      filings: list[dict] | None,
+                      bucket_pct: float | None = None,
+                      technicals: dict | None = None,
+                      options: dict | None = None,
+                      fundamentals: dict | None = None) -> str:
+    bucket_pct = settings.score_cache_price_bucket_pct if bucket_pct is None else bucket_pct
+    canon = {
+        "ticker": (ticker or "").strip().upper(),
+        "price": price_bucket((price or {}).get("last"), bucket_pct),
+        "news": sorted({n.get("url") or n.get("title") or "" for n in (news or [])}),
+        "filings": sorted({f"{f.get('type')}|{f.get('date')}|{f.get('summary')}" for f in (filings or [])}),
+        # 기술지표는 마지막 봉 날짜 기준 (같은 날 안의 변화는 가격 버킷이 반영)
+        "technicals": (technicals or {}).get("asof"),
+        "options": options_bucket(options),
+        # 재무는 기준 분기가 바뀔 때만
+        "fundamentals": fundamentals_key(fundamentals),
+    }
+    raw = json.dumps(canon, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# -------------------------
+# 디스크 저장소 (선택, 재시작 후에도 유지)
+# -------------------------
+class SQLiteScoreStore:
+    """key → (value json, 만료 epoch). 동기 sqlite 호출은 to_thread 로 감싼다"""
+
+    def __init__(self, path: str) -> None:
+        Path(path).expanduser().parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(Path(path).expanduser()), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS score_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("DELETE FROM score_cache WHERE expires_at < ?", (time.time(),))
+        self._conn.commit()
+        self._writes = 0
+
+    def _get(self, key: str) -> Optional[tuple[Dict[str, Any], float]]:
+        row = self._conn.execute(
+            "SELECT value, expires_at FROM score_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0]), row[1]
+
+    def _set(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO score_cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), time.time() + ttl),
+        )
+        self._writes += 1
+        if self._writes % 256 == 0:  # 가끔 만료분 정리
+            self._conn.execute("DELETE FROM score_cache WHERE expires_at < ?", (time.time(),))
+        self._conn.commit()
+
+    async def get(self, key: str) -> Optional[tuple[Dict[str, Any], float]]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        await asyncio.to_thread(self._set, key, value, ttl)
+
+
+class ScoreCache:
+    """
+    node_score 결과 캐시: 메모리 TTL/LRU → (선택) SQLite 순서로 조회.
+    디스크에서 찾으면 남은 TTL 로 메모리에 올린다.
+    """
+
+    def __init__(self, ttl: float, maxsize: int, path: str = "") -> None:
+        self.ttl = ttl
+        self.memory = TTLCache("score", maxsize=maxsize)
+        self.disk: Optional[SQLiteScoreStore] = SQLiteScoreStore(path) if path else None
+        self.disk_hits = 0
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        state, value = self.memory.lookup(key)
+        if state == "fresh":
+            self.memory.counters["hits"] += 1
+            return value
+
+        if self.disk is not None:
+            try:
+                found = await self.disk.get(key)
+            except Exception as e:
+                LOGGER.warning("[score-cache] disk get failed: %s", e)
+                found = None
+            if found is not None:
+                value, expires_at = found
+                self.memory.set(key, value, CachePolicy(ttl=max(0.0, expires_at - time.time())))
+                self.memory.counters["hits"] += 1
+                self.disk_hits += 1
+                return value
+
+        self.memory.counters["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        self.memory.set(key, value, CachePolicy(ttl=self.ttl))
+        if self.disk is not None:
+            try:
+                await self.disk.set(key, value, self.ttl)
+            except Exception as e:
+                LOGGER.warning("[score-cache] disk set failed: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        st = self.memory.stats()
+        st.pop("by_label", None)
+        return {**st, "ttl": self.ttl, "disk": self.disk is not None, "disk_hits": self.disk_hits}
+
+
+score_cache = ScoreCache(
+    ttl=settings.score_cache_ttl,
+    maxsize=settings.score_cache_max_entries,
+    path=settings.score_cache_path,
+)
@@ -0,0 +1,93 @@
+# app/workflow/singleflight.py
+from __future__ import annotations
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+
+class _StreamFlight:
+    """진행 중인 스트림 실행 1건: 이벤트 버퍼 + 구독자 깨우기"""
+
+    def __init__(self) -> None:
+        self.events: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def notify(self) -> None:
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class SingleFlight:
+    """
+    같은 key 의 동시 요청을 진행 중인 실행 1건에 합류시킨다.
+    - do(): 결과 공유 (리더 요청이 끊겨도 실행은 백그라운드 task 로 끝까지 진행)
+    - stream(): 이벤트 스트림 공유, 늦게 합류한 구독자는 놓친 이벤트부터 재생
+    - 실행이 끝나면 key 를 비우므로 캐시가 아니라 '동시 실행 합치기'만 한다
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._streams: Dict[str, _StreamFlight] = {}
+        self.requests = 0
+        self.executions = 0
+        self.joined = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.requests += 1
+        task = self._calls.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.create_task(fn(), name=f"singleflight-{self.name}-{key}")
+            self._calls[key] = task
+            task.add_done_callback(lambda _t: self._calls.pop(key, None))
+        else:
+            self.joined += 1
+        # shield: 한 요청이 취소돼도 공유 실행은 취소되지 않음
+        return await asyncio.shield(task)
+
+    async def stream(self, key: str, agen_factory: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        self.requests += 1
+        fl = self._streams.get(key)
+        if fl is None:
+            self.executions += 1
+            fl = _StreamFlight()
+            self._streams[key] = fl
+            fl.task = asyncio.create_task(self._produce(key, fl, agen_factory), name=f"singleflight-{self.name}-{key}")
+        else:
+            self.joined += 1
+
+        i = 0
+        while True:
+            while i < len(fl.events):
+                yield fl.events[i]
+                i += 1
+            if fl.done:
+                break
+            changed = fl.changed
+            await changed.wait()
+        if fl.error is not None:
+            raise fl.error
+
+    async def _produce(self, key: str, fl: _StreamFlight, agen_factory: Callable[[], AsyncIterator[Any]]) -> None:
+        try:
+            async for ev in agen_factory():
+                fl.events.append(ev)
+                fl.notify()
+        except Exception as e:
+            fl.error = e
+        finally:
+            fl.done = True
+            self._streams.pop(key, None)
+            fl.notify()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "executions": self.executions,
+            "joined": self.joined,
+            "coalescing_ratio": round(self.joined / self.requests, 4) if self.requests else 0.0,
+            "inflight": len(self._calls) + len(self._streams),
+        }
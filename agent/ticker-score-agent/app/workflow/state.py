@@ -4,12 +4,23 @@ from typing import Any, Dict, List, Optional, TypedDict
 from typing_extensions import Annotated
 import operator
 
+
+def merge_dicts(a: Dict[str, Any] | None, b: Dict[str, Any] | None) -> Dict[str, Any]:
+    return {**(a or {}), **(b or {})}
+
 class ScoreState(TypedDict, total=False):
     ticker: str
+    sources: Optional[List[str]]  # 요청이 고른 데이터 소스 (graph.SOURCE_NODES 키, 없으면 전체)
     price: Optional[Dict[str, Any]]
     news: Optional[List[Dict[str, Any]]]
     filings: Optional[List[Dict[str, Any]]]
+    technicals: Optional[Dict[str, Any]]  # history 노드: 가격 이력 기술적 지표
+    options: Optional[Dict[str, Any]]     # options 노드: 풋/콜 비율, IV 기간 구조, 스큐
+    fundamentals: Optional[Dict[str, Any]]  # fundamentals 노드: 마진, 레버리지, 성장률, 주요 주주
     score: Optional[int]
     rationale: Optional[str]
+    score_cached: Optional[bool]  # node_score 가 LLM 대신 캐시 결과를 썼는지
     # 병렬 합치기: 리스트 이어붙이기
     logs: Annotated[List[str], operator.add]
+    # 노드별 트레이스 (traced 가 기록, 병렬 노드 결과는 dict 병합)
+    trace: Annotated[Dict[str, Any], merge_dicts]
@@ -0,0 +1,319 @@
+# app/workflow/technicals.py
+"""
+가격 이력(OHLCV) → 기술적 지표 (numpy 한 번의 벡터 연산).
+- 입력은 (종목 수, 봉 수) 2-D 배열: 길이가 다른 이력은 오른쪽(최신) 정렬 + 왼쪽 NaN 패딩 (stack_series)
+  → 단일 종목도 1행짜리 배치로 같은 경로를 탄다
+- 지표: 기간 수익률, 실현 변동성(연율), RSI(단순 평균), 이동평균 괴리, 최대 낙폭, 거래량 z-score
+- 창 길이보다 이력이 짧으면 해당 지표는 NaN (요약/상태에서는 None)
+- run_batch 안에서는 TechnicalsBatcher 가 동시에 도착한 종목들을 모아 한 배열로 계산
+"""
+from __future__ import annotations
+import asyncio
+import json
+import math
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+RETURN_WINDOWS = (1, 5, 20)
+VOL_WINDOW = 20
+RSI_WINDOW = 14
+MA_WINDOWS = (20, 50)
+VOLUME_WINDOW = 20
+
+_CLOSE_KEYS = ("close", "adj close", "adjclose")
+_VOLUME_KEYS = ("volume",)
+_OPEN_KEYS, _HIGH_KEYS, _LOW_KEYS = ("open",), ("high",), ("low",)
+_DATE_KEYS = ("date", "datetime", "timestamp", "index")
+
+
+# -------------------------
+# 툴 결과 파싱
+# -------------------------
+def _key(row: Dict[str, Any], keys: Sequence[str]) -> Any:
+    """대소문자/공백 무시하고 row 의 실제 키 찾기 (첫 행에서 1회만)"""
+    return next((k for k in row if str(k).strip().lower() in keys), None)
+
+
+def _float(v: Any) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _epoch(v: Any) -> float:
+    """봉 시각 → epoch 초 (ISO 문자열 / epoch 초·밀리초, columns 형태의 문자열 키 포함)"""
+    if v is None:
+        return math.nan
+    try:
+        x = float(v)
+        return x / 1000.0 if x > 1e11 else x
+    except (TypeError, ValueError):
+        pass
+    try:
+        dt = datetime.fromisoformat(str(v).strip().replace("Z", "+00:00"))
+    except ValueError:
+        return math.nan
+    return (dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def _epochs(values: List[Any]) -> np.ndarray:
+    # 빠른 경로: pandas to_json(date_format="iso") 의 UTC 'Z' 문자열은 numpy 로 한 번에
+    if values and all(isinstance(v, str) and v.endswith("Z") for v in values):
+        try:
+            return np.array([v[:-1] for v in values], dtype="datetime64[ms]").astype(np.int64) / 1000.0
+        except ValueError:
+            pass
+    return np.array([_epoch(v) for v in values], dtype=np.float64)
+
+
+def asof_date(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d")
+
+
+def _column(rows: List[Dict[str, Any]], key: Any) -> np.ndarray:
+    values = [r.get(key) for r in rows] if key is not None else [None] * len(rows)
+    try:
+        return np.array(values, dtype=np.float64)  # None → NaN
+    except (TypeError, ValueError):
+        return np.array([_float(v) for v in values], dtype=np.float64)
+
+
+def parse_history(data: Any) -> Optional[Dict[str, Any]]:
+    """
+    get_historical_stock_prices 결과 → {"ts", "open", "high", "low", "close", "volume"(np.ndarray, 오래된 순),
+    "asof", "bars"}. records(JSON 문자열/list[dict]) 와 columns({"Close": {...}|[...]}) 형태 모두 처리,
+    종가 없는 봉은 버림. ts 는 epoch 초 (시각을 못 읽으면 NaN)
+    """
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except ValueError:
+            return None
+    rows: List[Dict[str, Any]] = []
+    if isinstance(data, list):
+        rows = [r for r in data if isinstance(r, dict)]
+    elif isinstance(data, dict):
+        cols = {str(k).strip().lower(): v for k, v in data.items()}
+        close = next((cols[k] for k in _CLOSE_KEYS if k in cols), None)
+        if isinstance(close, dict):
+            idx = list(close)
+            rows = [{"date": i, **{k: (v.get(i) if isinstance(v, dict) else None) for k, v in cols.items()}}
+                    for i in idx]
+        elif isinstance(close, list):
+            n = len(close)
+            rows = [{k: (v[i] if isinstance(v, list) and i < len(v) else None) for k, v in cols.items()}
+                    for i in range(n)]
+    if not rows:
+        return None
+
+    close = _column(rows, _key(rows[0], _CLOSE_KEYS))
+    keep = np.isfinite(close) & (close > 0)
+    if not keep.any():
+        return None
+    date_key = _key(rows[0], _DATE_KEYS)
+    ts = _epochs([r.get(date_key) for r in rows])
+    out = {name: _column(rows, _key(rows[0], keys))[keep] for name, keys in
+           (("open", _OPEN_KEYS), ("high", _HIGH_KEYS), ("low", _LOW_KEYS), ("volume", _VOLUME_KEYS))}
+    out.update(ts=ts[keep], close=close[keep], bars=int(keep.sum()))
+    last = out["ts"][-1]
+    asof = rows[int(np.flatnonzero(keep)[-1])].get(date_key)
+    out["asof"] = asof_date(last) if np.isfinite(last) else (str(asof)[:10] if asof is not None else None)
+    return out
+
+
+def stack_series(series: Sequence[np.ndarray], length: Optional[int] = None) -> np.ndarray:
+    """1-D 이력들 → (n, length) 배열 (최신 봉 오른쪽 정렬, 부족분은 왼쪽 NaN)"""
+    length = length or max((len(s) for s in series), default=0)
+    out = np.full((len(series), length), np.nan)
+    for i, s in enumerate(series):
+        s = np.asarray(s, dtype=np.float64)[-length:]
+        if len(s):
+            out[i, length - len(s):] = s
+    return out
+
+
+# -------------------------
+# 지표 (행 = 종목)
+# -------------------------
+def _tail_stats(x: np.ndarray, w: int):
+    """마지막 w 칸의 (평균, 표본표준편차, 유효 개수) - NaN 은 제외, 유효 개수 < w 면 NaN"""
+    tail = x[:, -w:]
+    valid = ~np.isnan(tail)
+    cnt = valid.sum(axis=1)
+    mean = np.where(valid, tail, 0.0).sum(axis=1) / np.maximum(cnt, 1)
+    dev = np.where(valid, tail - mean[:, None], 0.0)
+    std = np.sqrt((dev * dev).sum(axis=1) / np.maximum(cnt - 1, 1))
+    full = cnt >= w
+    return np.where(full, mean, np.nan), np.where(full, std, np.nan), cnt
+
+
+def compute_features(close: np.ndarray, volume: Optional[np.ndarray] = None,
+                     periods_per_year: float = 252.0) -> Dict[str, np.ndarray]:
+    """
+    close/volume: (n, T) 배열 (stack_series 형태). 반환: 지표 이름 → (n,) 배열
+    수익률/괴리/낙폭은 비율(0.05 = 5%), 변동성은 연율 비율, RSI 는 0~100
+    """
+    close = np.atleast_2d(np.asarray(close, dtype=np.float64))
+    n, t = close.shape
+    last = close[:, -1]
+    valid = ~np.isnan(close)
+    bars = valid.sum(axis=1)
+    rows = np.arange(n)
+    out: Dict[str, np.ndarray] = {"bars": bars.astype(np.float64)}
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for k in RETURN_WINDOWS:
+            out[f"ret_{k}"] = last / close[:, -1 - k] - 1 if t > k else np.full(n, np.nan)
+        first = close[rows, np.minimum(t - bars, t - 1)]
+        out["ret_period"] = last / first - 1
+
+        logret = np.diff(np.log(close), axis=1) if t > 1 else np.full((n, 1), np.nan)
+        _, sd, _ = _tail_stats(logret, VOL_WINDOW)
+        out["volatility"] = sd * math.sqrt(periods_per_year)
+
+        diff = np.diff(close, axis=1)[:, -RSI_WINDOW:] if t > 1 else np.full((n, 1), np.nan)
+        ok = ~np.isnan(diff)
+        gain = np.where(ok & (diff > 0), diff, 0.0).sum(axis=1)
+        loss = np.where(ok & (diff < 0), -diff, 0.0).sum(axis=1)
+        rsi = np.where(loss > 0, 100.0 - 100.0 / (1.0 + gain / loss), np.where(gain > 0, 100.0, 50.0))
+        out["rsi"] = np.where(ok.sum(axis=1) >= RSI_WINDOW, rsi, np.nan)
+
+        for w in MA_WINDOWS:
+            ma, _, _ = _tail_stats(close, w)
+            out[f"ma_gap_{w}"] = last / ma - 1
+
+        # fmax 는 NaN 을 건너뛰므로 왼쪽 패딩이 누적 최고가에 섞이지 않음
+        peak = np.fmax.accumulate(close, axis=1)
+        out["max_drawdown"] = np.where(valid, close / peak - 1, 0.0).min(axis=1)
+
+        if volume is not None:
+            volume = np.atleast_2d(np.asarray(volume, dtype=np.float64))
+            if volume.shape[1] > 1:
+                # 마지막 봉 vs 직전 VOLUME_WINDOW 봉
+                mean, sd, _ = _tail_stats(volume[:, :-1], VOLUME_WINDOW)
+                out["volume_z"] = np.where(sd > 0, (volume[:, -1] - mean) / sd, np.nan)
+            else:
+                out["volume_z"] = np.full(n, np.nan)
+    return out
+
+
+def _row(feats: Dict[str, np.ndarray], i: int, asof: Any) -> Dict[str, Any]:
+    """compute_features 결과의 i 번째 행 → 상태/프롬프트용 dict (Python float, NaN → None)"""
+    out: Dict[str, Any] = {"asof": asof}
+    for k, v in feats.items():
+        x = float(v[i])
+        out[k] = None if math.isnan(x) else (int(x) if k == "bars" else round(x, 4))
+    return out
+
+
+def technicals_for(history: Dict[str, Any], periods_per_year: float = 252.0) -> Dict[str, Any]:
+    """parse_history 결과 1건 → 상태/프롬프트용 dict"""
+    feats = compute_features(history["close"][None, :], history["volume"][None, :], periods_per_year)
+    return _row(feats, 0, history.get("asof"))
+
+
+def technicals_batch(histories: Sequence[Dict[str, Any]], periods_per_year: float = 252.0) -> List[Dict[str, Any]]:
+    """parse_history 결과 N 건 → stack_series 로 (N, T) 배열 1개 만들어 compute_features 1회"""
+    feats = compute_features(stack_series([h["close"] for h in histories]),
+                             stack_series([h["volume"] for h in histories]), periods_per_year)
+    return [_row(feats, i, h.get("asof")) for i, h in enumerate(histories)]
+
+
+# -------------------------
+# 배치 계산 (run_batch 전용)
+# -------------------------
+# run_batch 가 티커 태스크마다 켠다 → 그 그래프 실행의 node_history 만 배처를 거침 (단건 /score 는 대기 없이 바로 계산)
+technicals_batching: ContextVar[bool] = ContextVar("technicals_batching", default=False)
+
+
+@dataclass
+class _Pending:
+    history: Dict[str, Any]
+    future: asyncio.Future = field(repr=False)
+
+
+class TechnicalsBatcher:
+    """
+    node_history 지표 계산을 짧은 시간창(window) 또는 최대 배치 크기까지 모아 technicals_batch 1회로 처리
+    (ScoreBatcher 와 같은 방식). 계산은 종목당 수십 µs 라 태스크 없이 flush 시점에 이벤트 루프에서 바로 한다.
+    """
+
+    def __init__(self, window: float = 0.005, max_batch: int = 64, periods_per_year: float = 252.0) -> None:
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self.periods_per_year = periods_per_year
+        self._pending: List[_Pending] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.requests = 0
+        self.batches = 0
+
+    async def compute(self, history: Dict[str, Any]) -> Dict[str, Any]:
+        """같은 창에 들어온 다른 종목과 함께 계산한 technicals_for 결과"""
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append(_Pending(history, fut))
+        self.requests += 1
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await fut
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        # 대기 중 취소된 요청은 제외
+        batch = [p for p in batch if not p.future.done()]
+        if not batch:
+            return
+        self.batches += 1
+        try:
+            rows = technicals_batch([p.history for p in batch], self.periods_per_year)
+        except Exception as e:
+            for p in batch:
+                p.future.set_exception(e)
+            return
+        for p, r in zip(batch, rows):
+            p.future.set_result(r)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+# -------------------------
+# 프롬프트 요약
+# -------------------------
+def summarize_technicals(t: Optional[Dict[str, Any]]) -> str:
+    """'5일 +1.2%, 20일 -3.4% | 변동성 28% | RSI 55 | …' 한 줄 (없는 지표는 생략)"""
+    if not t:
+        return "(데이터 없음)"
+    pct = lambda v: f"{v * 100:+.1f}%"  # noqa: E731
+    parts: List[str] = []
+    rets = [f"{label} {pct(t[k])}" for k, label in
+            (("ret_1", "1일"), ("ret_5", "5일"), ("ret_20", "20일"), ("ret_period", f"{t.get('bars')}봉"))
+            if t.get(k) is not None]
+    if rets:
+        parts.append("수익률 " + ", ".join(rets))
+    if t.get("volatility") is not None:
+        parts.append(f"변동성(연율) {t['volatility'] * 100:.0f}%")
+    if t.get("rsi") is not None:
+        parts.append(f"RSI{RSI_WINDOW} {t['rsi']:.0f}")
+    gaps = [f"MA{w} {pct(t[f'ma_gap_{w}'])}" for w in MA_WINDOWS if t.get(f"ma_gap_{w}") is not None]
+    if gaps:
+        parts.append("이평 괴리 " + ", ".join(gaps))
+    if t.get("max_drawdown") is not None:
+        parts.append(f"최대낙폭 {t['max_drawdown'] * 100:.1f}%")
+    if t.get("volume_z") is not None:
+        parts.append(f"거래량 z {t['volume_z']:+.1f}")
+    return " | ".join(parts) if parts else "(데이터 없음)"
@@ -0,0 +1,81 @@
+# app/workflow/tool_registry.py
+from __future__ import annotations
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+
+class ToolNotFoundError(RuntimeError):
+    """인덱스에 없는 툴 이름 (네트워크 호출 없이 판정)"""
+
+    def __init__(self, name: str, available: List[str]) -> None:
+        super().__init__(f"Tool not found: {name}, available={available}")
+        self.name = name
+        self.available = available
+
+
+class ToolArgumentError(ValueError):
+    """툴 입력 스키마(inputSchema)와 맞지 않는 인자 이름 (네트워크 호출 없이 판정)"""
+
+    def __init__(self, name: str, unknown: List[str], missing: List[str], expected: List[str]) -> None:
+        super().__init__(f"Bad arguments for {name}: unknown={unknown}, missing={missing}, expected={expected}")
+        self.name = name
+        self.unknown = unknown
+        self.missing = missing
+
+
+def tool_params(tool: Any) -> Optional[Tuple[FrozenSet[str], FrozenSet[str]]]:
+    """툴 입력 스키마 → (인자 이름, 필수 인자 이름). 스키마가 없는 툴은 None (검사 생략)"""
+    schema = getattr(tool, "args_schema", None)
+    if schema is not None and not isinstance(schema, dict) and hasattr(schema, "model_json_schema"):
+        schema = schema.model_json_schema()
+    if not isinstance(schema, dict) or not isinstance(schema.get("properties"), dict):
+        return None
+    return frozenset(schema["properties"]), frozenset(schema.get("required") or ())
+
+
+def check_tool_args(tool: Any, args: Dict[str, Any]) -> None:
+    """래퍼가 보내는 인자 이름을 세션이 알려 준 스키마와 대조 (서버 버전과 래퍼가 어긋나면 호출 전에 실패)"""
+    params = tool_params(tool)
+    if params is None:
+        return
+    names, required = params
+    unknown = sorted(set(args) - names)
+    missing = sorted(required - set(args))
+    if unknown or missing:
+        raise ToolArgumentError(tool.name, unknown, missing, sorted(names))
+
+
+def split_tool_name(name: str) -> Tuple[str | None, str]:
+    """'yahoo:get_stock_info' → ('yahoo', 'get_stock_info'), 'get_stock_info' → (None, 'get_stock_info')"""
+    server, sep, tool = name.partition(":")
+    return (server, tool) if sep else (None, name)
+
+
+class ToolRegistry:
+    """
+    세션 1회 해석으로 만든 툴 인덱스.
+    - 'tool' 단일 이름과 'server:tool' 풀네임 모두 O(1) 조회
+    - 같은 이름이 여러 서버에 있으면 단일 이름은 config 순서상 첫 서버로 해석
+    """
+
+    def __init__(self, tools_by_server: Dict[str, List[Any]]) -> None:
+        self._qualified: Dict[str, Any] = {}
+        self._by_name: Dict[str, Any] = {}
+        for server, tools in tools_by_server.items():
+            for t in tools:
+                self._qualified[f"{server}:{t.name}"] = t
+                self._by_name.setdefault(t.name, t)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._qualified or name in self._by_name
+
+    def get(self, name: str) -> Any:
+        tool = self._qualified.get(name) or self._by_name.get(name)
+        if tool is None:
+            raise ToolNotFoundError(name, self.names())
+        return tool
+
+    def names(self) -> List[str]:
+        return list(self._by_name)
+
+    def tools(self) -> List[Any]:
+        return list(self._qualified.values())
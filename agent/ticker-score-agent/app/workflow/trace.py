@@ -1,11 +1,26 @@
 # app/workflow/trace.py
 from __future__ import annotations
-import json, time, functools
-from typing import Any, Dict, Callable
+import json, time, functools, random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Callable, List, Optional
 
 import logging
+from app.metrics import ERRORS, NODE_SECONDS
+
 LOGGER = logging.getLogger("ticker-graph")
 
+# 노드 실행 중 하위 호출(fan_out 등) 타이밍 수집용 (traced 가 노드마다 새 리스트로 설정)
+_CALLS: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("traced_calls", default=None)
+
+
+def record_call(name: str, dt_ms: int, status: str = "ok", error: str | None = None) -> None:
+    """현재 traced 노드에 하위 호출 1건의 소요 시간 기록 (traced 밖에서 호출되면 무시)"""
+    calls = _CALLS.get()
+    if calls is not None:
+        calls.append({"name": name, "duration_ms": dt_ms, "status": status, "error": error})
+
+
 def _safe_json(obj: Any) -> str:
     try:
         return json.dumps(obj, ensure_ascii=False)
@@ -42,80 +57,151 @@ def state_preview(state: Dict[str, Any]) -> Dict[str, Any]:
         "logs_len": len(logs),
     }
 
+# -------------------------
+# 트레이스 레벨 / 샘플링
+# -------------------------
+# off: 래핑만 (기록 없음) / timings: 소요 ms + 하위 호출 / preview: + before/after 프리뷰, INFO 로그 / full: + 응답 프리뷰
+TRACE_LEVELS = ("off", "timings", "preview", "full")
+_LEVEL_NO = {name: i for i, name in enumerate(TRACE_LEVELS)}
+_TRACE_LEVEL: ContextVar[Optional[str]] = ContextVar("trace_level", default=None)
+
+
+def resolve_trace_level(requested: str | None = None) -> str:
+    """
+    요청 단위 트레이스 레벨 결정.
+    - 헤더 등으로 명시된 레벨(settings.trace_allow_header 일 때)이 우선
+    - 아니면 trace_sample_rate 확률로 trace_sampled_level, 나머지는 trace_level
+    """
+    from app.settings import settings  # 순환 import 회피
+
+    if requested and settings.trace_allow_header and requested.lower() in _LEVEL_NO:
+        return requested.lower()
+    if settings.trace_sample_rate > 0 and random.random() < settings.trace_sample_rate:
+        return settings.trace_sampled_level
+    return settings.trace_level
+
+
+def set_trace_level(level: str) -> None:
+    """현재 컨텍스트(요청 task)의 트레이스 레벨 지정 (이후 생성되는 노드 task 로 전파)"""
+    _TRACE_LEVEL.set(level)
+
+
+@contextmanager
+def trace_level(level: str):
+    token = _TRACE_LEVEL.set(level)
+    try:
+        yield
+    finally:
+        _TRACE_LEVEL.reset(token)
+
+
+def current_trace_level() -> int:
+    level = _TRACE_LEVEL.get()
+    if level is None:
+        from app.settings import settings
+        level = settings.trace_level
+    return _LEVEL_NO.get(level, _LEVEL_NO["timings"])
+
+
+_OFF, _TIMINGS, _PREVIEW, _FULL = range(4)
+
+
 def traced(node_name: str):
     """
-    노드 함수(async)에 적용하는 데코레이터.
-    - 입력/출력/소요 ms 를 logs에 추가
-    - trace[node_name]에 before_state/after_state 프리뷰를 함께 기록
+    노드 함수(async)에 적용하는 데코레이터. 요청별 트레이스 레벨에 따라 비용이 달라진다.
+    - timings 이상: 소요 ms 와 record_call() 로 수집된 하위 호출별 ms 를 logs/trace 에 추가
+    - preview 이상: before/after 상태 프리뷰를 만들어 INFO 로그와 trace 에 기록 (이 레벨에서만 생성)
+    - full: 주요 응답 필드의 JSON 프리뷰까지 trace 에 기록
     """
     def deco(fn: Callable[..., Any]):
         @functools.wraps(fn)
         async def wrapper(state: dict):
+            level = current_trace_level()
             t0 = time.perf_counter()
-
-            # BEFORE PREVIEW (입력 상태)
-            before = state_preview(state)
-            LOGGER.info("[%-8s] START  before=%s", node_name, shorten(before, 300))
-
+            if level == _OFF:
+                try:
+                    return await fn(state)
+                except Exception as e:
+                    ERRORS.inc(f"node.{node_name}")
+                    LOGGER.exception("[%-8s] ERROR  %s", node_name, e)
+                    return {"logs": [f"{node_name}:ERROR {type(e).__name__} {str(e)}"]}
+                finally:
+                    NODE_SECONDS.observe(time.perf_counter() - t0, node_name)
+
+            log_info = level >= _PREVIEW and LOGGER.isEnabledFor(logging.INFO)
+
+            # BEFORE PREVIEW (입력 상태) - preview 레벨 이상에서만 생성
+            before = state_preview(state) if level >= _PREVIEW else None
+            if log_info:
+                LOGGER.info("[%-8s] START  before=%s", node_name, shorten(before, 300))
+
+            calls: List[Dict[str, Any]] = []
+            calls_token = _CALLS.set(calls)
             try:
                 out = await fn(state)  # 노드 본체 실행
-                dt_ms = int((time.perf_counter() - t0) * 1000)
-
-                # AFTER PREVIEW (출력 상태 = 입력+p(reset)atch 가 아니고, 노드 반환 값만 프리뷰)
-                # 반환 out 자체의 핵심만 요약해서 본다.
-                out_for_preview = {
-                    "price": out.get("price"),
-                    "news": out.get("news"),
-                    "filings": out.get("filings"),
-                    "score": out.get("score"),
-                    "rationale": out.get("rationale"),
-                    "logs": out.get("logs"),
-                }
-                after = state_preview(out_for_preview)
-
-                LOGGER.info("[%-8s] END    %dms  after=%s", node_name, dt_ms, shorten(after, 300))
+                dt = time.perf_counter() - t0
+                NODE_SECONDS.observe(dt, node_name)
+                dt_ms = int(dt * 1000)
 
                 # logs 는 리듀서로 합쳐지므로 증분만 넣기
                 out_logs = out.get("logs", [])
                 out_trace = out.get("trace", {})
-                out = {**out, "logs": out_logs + [f"{node_name}: {dt_ms}ms"]}
-
-                # response preview: 주요 필드만 축약
-                resp_preview = {
-                    k: shorten(v, 400)
-                    for k, v in out.items()
-                    if k in ("price", "news", "filings", "score", "rationale")
-                }
-
-                # trace(노드별 상세) 추가: before/after 포함
-                out["trace"] = {
-                    **out_trace,
-                    node_name: {
-                        "duration_ms": dt_ms,
-                        "before_state": before,
-                        "after_state": after,
-                        "request": {  # 요청 요약 (필요 시 확장)
-                            "ticker": state.get("ticker"),
-                        },
-                        "response_preview": resp_preview,
+                call_logs = [f"{node_name}.{c['name']}: {c['duration_ms']}ms {c['status']}" for c in calls]
+                out = {**out, "logs": out_logs + call_logs + [f"{node_name}: {dt_ms}ms"]}
+
+                entry: Dict[str, Any] = {"duration_ms": dt_ms, "calls": calls}
+                if level >= _PREVIEW:
+                    # AFTER PREVIEW: 노드 반환 값만 프리뷰
+                    after = state_preview({
+                        "price": out.get("price"),
+                        "news": out.get("news"),
+                        "filings": out.get("filings"),
+                        "score": out.get("score"),
+                        "rationale": out.get("rationale"),
+                        "logs": out_logs,
+                    })
+                    entry["before_state"] = before
+                    entry["after_state"] = after
+                    entry["request"] = {"ticker": state.get("ticker")}  # 요청 요약 (필요 시 확장)
+                    if log_info:
+                        LOGGER.info("[%-8s] END    %dms  after=%s", node_name, dt_ms, shorten(after, 300))
+                        for c in calls:
+                            LOGGER.info("[%-8s]   call %s %dms %s",
+                                        node_name, c["name"], c["duration_ms"], c["status"])
+                else:
+                    LOGGER.debug("[%-8s] END    %dms", node_name, dt_ms)
+
+                if level >= _FULL:
+                    # response preview: 주요 필드만 축약
+                    entry["response_preview"] = {
+                        k: shorten(v, 400)
+                        for k, v in out.items()
+                        if k in ("price", "news", "filings", "score", "rationale")
                     }
-                }
+
+                out["trace"] = {**out_trace, node_name: entry}
                 return out
 
             except Exception as e:
-                dt_ms = int((time.perf_counter() - t0) * 1000)
+                dt = time.perf_counter() - t0
+                NODE_SECONDS.observe(dt, node_name)
+                ERRORS.inc(f"node.{node_name}")
+                dt_ms = int(dt * 1000)
                 LOGGER.exception("[%-8s] ERROR  %dms  %s", node_name, dt_ms, e)
+                entry = {
+                    "duration_ms": dt_ms,
+                    "calls": calls,
+                    "error": f"{type(e).__name__}: {e}",
+                    "request": {"ticker": state.get("ticker")},
+                }
+                if before is not None:
+                    entry["before_state"] = before
                 return {
                     "logs": [f"{node_name}:ERROR {type(e).__name__} {str(e)} ({dt_ms}ms)"],
-                    "trace": {
-                        node_name: {
-                            "duration_ms": dt_ms,
-                            "error": f"{type(e).__name__}: {e}",
-                            "before_state": before,
-                            "request": {"ticker": state.get("ticker")},
-                        }
-                    }
+                    "trace": {node_name: entry},
                 }
+            finally:
+                _CALLS.reset(calls_token)
         return wrapper
     return deco
 
@@ -0,0 +1,114 @@
+# bench/bench_bar_store.py
+"""
+로컬 OHLCV 저장소(app.workflow.bar_store) 벤치: history 노드 1회분 (봉 확보 + 기술지표) 소요 시간.
+- no-store   : 매번 기간 전체를 JSON 으로 받아 파싱 (저장소 도입 전 경로)
+- cold       : 저장소가 비어 있음 → 전체 조회 + 컬럼 파일 쓰기 + memmap
+- warm       : 재조회 간격 안 → 상류 호출 없이 memmap 뷰만
+- incremental: 재조회 간격 지남, 새 봉 1개 → 5d 조회 + append
+상류 호출은 미리 만든 records JSON 을 --fetch-latency-ms 만큼 기다렸다 돌려줌 (MCP/네트워크 비용 모사).
+
+실행 (ticker-score-agent/ 에서):
+    python -m bench.bench_bar_store --periods 1y,5y --fetch-latency-ms 0
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from app.workflow.bar_store import BarStore, period_seconds
+from app.workflow.technicals import parse_history, technicals_for
+
+DAY = 86400
+
+
+def records(end: float, seconds: float, seed: int = 7) -> str:
+    """end 까지 seconds 구간의 일봉 records JSON (yahoo MCP get_historical_stock_prices 형태)"""
+    rng = random.Random(seed)
+    n = int(min(seconds, 20 * 366 * DAY) // DAY)
+    price, rows = 100.0, []
+    for i in range(n, -1, -1):
+        t = end - i * DAY
+        price *= 1 + rng.gauss(0, 0.015)
+        rows.append({
+            "Date": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(t - t % DAY)),
+            "Open": round(price, 2), "High": round(price * 1.01, 2), "Low": round(price * 0.99, 2),
+            "Close": round(price, 2), "Volume": int(rng.uniform(5e6, 2e7)), "Dividends": 0.0, "Stock Splits": 0.0,
+        })
+    return json.dumps(rows)
+
+
+async def timeit(fn: Callable[[], Awaitable[Any]], repeat: int) -> float:
+    """p50 ms"""
+    times: List[float] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        await fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+async def run(period: str, latency: float, repeat: int) -> Dict[str, float]:
+    now = time.time()
+    payload = {p: records(now, period_seconds(p)) for p in (period, "5d")}
+
+    async def fetch(p: str) -> str:
+        if latency:
+            await asyncio.sleep(latency)
+        return payload[p]
+
+    async def no_store():
+        technicals_for(parse_history(await fetch(period)))
+
+    root = tempfile.mkdtemp(prefix="bars-")
+    try:
+        store = BarStore(root, refresh=300.0)
+        seq = iter(range(1_000_000))
+
+        async def cold():
+            # 매번 새 티커 → 빈 저장소에서 전체 조회
+            technicals_for(await store.history(f"T{next(seq)}", "1d", period, fetch))
+
+        async def warm():
+            technicals_for(await store.history("T0", "1d", period, fetch))
+
+        inc_store = BarStore(root, refresh=0.0)
+
+        async def incremental():
+            technicals_for(await inc_store.history("T0", "1d", period, fetch))
+
+        out = {
+            "no-store": await timeit(no_store, repeat),
+            "cold": await timeit(cold, repeat),
+            "warm": await timeit(warm, repeat * 5),
+            "incremental": await timeit(incremental, repeat),
+        }
+        out["json_kb"] = len(payload[period]) / 1024
+        out["bars"] = float(len(json.loads(payload[period])))
+        return out
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--periods", default="1y,5y")
+    ap.add_argument("--fetch-latency-ms", type=float, default=0.0, help="상류(MCP) 호출 1회 지연")
+    ap.add_argument("--repeat", type=int, default=10)
+    args = ap.parse_args()
+
+    print(f"fetch_latency={args.fetch_latency_ms:g}ms  (p50 ms per history-node call, bars + technicals)")
+    print(f"{'period':>6} {'bars':>6} {'json KiB':>9} {'no-store':>9} {'cold':>8} {'warm':>8} {'incr':>8}")
+    for period in [p.strip() for p in args.periods.split(",") if p.strip()]:
+        r = await run(period, args.fetch_latency_ms / 1000.0, args.repeat)
+        print(f"{period:>6} {int(r['bars']):>6} {r['json_kb']:9.1f} {r['no-store']:9.2f} {r['cold']:8.2f} "
+              f"{r['warm']:8.3f} {r['incremental']:8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
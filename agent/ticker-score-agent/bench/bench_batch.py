@@ -0,0 +1,73 @@
+# bench/bench_batch.py
+"""
+티커 N개: 순차 run_once vs run_batch(동시성 상한) 처리량 비교.
+MCP 세션 풀을 띄운 상태에서 실행한다 (app lifespan 과 동일 조건).
+- --mcp stdio (기본): bench.fake_mcp_server 를 세션 풀로 + 가짜 LLM (오프라인, 재현 가능)
+- --mcp real      : mcp_config.json 의 실제 서버 + 실제 LLM (네트워크/API 키 필요)
+
+실행 (ticker-score-agent/ 에서):
+    python -m bench.bench_batch --mcp-latency-ms 50 --llm-latency-ms 500 --concurrency 8
+    python -m bench.bench_batch --mcp real --tickers AAPL,MSFT,NVDA,AMZN,GOOGL,META,TSLA,AMD
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import time
+
+from bench.fakes import fake_servers_config, install_fake_llm
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tickers", default="AAPL,MSFT,NVDA,AMZN,GOOGL,META,TSLA,AMD")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--pool-size", type=int, default=4)
+    ap.add_argument("--mcp", choices=["stdio", "real"], default="stdio",
+                    help="stdio: bench.fake_mcp_server + 가짜 LLM / real: mcp_config.json + 실제 LLM")
+    ap.add_argument("--mcp-latency-ms", type=float, default=50.0, help="가짜 MCP 툴 호출당 지연 (stdio)")
+    ap.add_argument("--llm-latency-ms", type=float, default=500.0, help="가짜 LLM 호출당 지연 (stdio)")
+    args = ap.parse_args()
+    tickers = [t.strip().upper() for t in args.tickers.split(",") if t.strip()]
+
+    servers_cfg = None
+    if args.mcp == "stdio":
+        install_fake_llm(args.llm_latency_ms / 1000)
+        servers_cfg = fake_servers_config(args.mcp_latency_ms / 1000)
+    from app.settings import settings
+    from app.workflow.fundamentals import fundamentals_cache
+    from app.workflow.graph import run_batch, run_once
+    from app.workflow.mcp_pool import mcp_pool
+    from app.workflow.nodes import technicals_batcher
+
+    # 캐시가 두 번째 실행을 왜곡하지 않도록 끔
+    settings.tool_cache_enabled = False
+    settings.score_cache_enabled = False
+    settings.bar_store_enabled = False
+
+    await mcp_pool.start(servers_cfg=servers_cfg, size=args.pool_size)
+    print(f"mcp={args.mcp} pool={args.pool_size}"
+          + (f" mcp_latency={args.mcp_latency_ms:g}ms llm_latency={args.llm_latency_ms:g}ms"
+             if args.mcp == "stdio" else ""))
+    try:
+        t0 = time.perf_counter()
+        for t in tickers:
+            await run_once(t)
+        seq = time.perf_counter() - t0
+        print(f"sequential  n={len(tickers):<4} {seq:7.2f}s  {len(tickers) / seq:6.2f} tickers/s")
+
+        fundamentals_cache.clear()
+        t0 = time.perf_counter()
+        failed = 0
+        async for r in run_batch(tickers, args.concurrency):
+            failed += "error" in r
+        bat = time.perf_counter() - t0
+        print(f"batch c={args.concurrency:<3} n={len(tickers):<4} {bat:7.2f}s  {len(tickers) / bat:6.2f} tickers/s"
+              f"  failed={failed}  speedup x{seq / bat:.1f}")
+        tb = technicals_batcher.stats()
+        print(f"technicals batches={tb['batches']} avg_batch_size={tb['avg_batch_size']}")
+    finally:
+        await mcp_pool.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
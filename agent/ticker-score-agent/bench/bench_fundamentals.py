@@ -0,0 +1,89 @@
+# bench/bench_fundamentals.py
+"""
+fundamentals 노드 벤치 (가짜 MCP, 호출당 고정 지연): /score 1회당 노드 비용.
+- serial    : 표 6종 + 주주를 차례로 호출 (노드 도입 전 개별 래퍼를 그대로 부르던 방식) + 비율 계산
+- cold      : 7개 호출 동시 (fan_out) + 비율 계산, 툴 캐시·비율 캐시 모두 비어 있음
+- tool-warm : 비율 캐시만 만료 (툴 캐시에 원본 표가 있음 → lease + 캐시 조회 7회 + JSON 파싱 + 계산)
+- hit       : 비율 캐시 히트 (다음 공시 예상 시각 전의 평소 경로, MCP lease 없음)
+metrics 열은 fundamental_features (파싱 + 비율) 1회 시간.
+
+실행 (ticker-score-agent/ 에서):
+    python -m bench.bench_fundamentals --mcp-latency-ms 50 --repeat 20
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any, Awaitable, Callable, List
+
+from bench import fakes
+
+
+async def timeit(fn: Callable[[], Awaitable[Any]], repeat: int) -> float:
+    """p50 ms"""
+    times: List[float] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        await fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mcp-latency-ms", type=float, default=50.0)
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    fakes.install_fakes(mcp_latency=args.mcp_latency_ms / 1000.0, llm_latency=0.0)
+    from app.workflow import mcp_clients
+    from app.workflow.fundamentals import fundamental_features, fundamentals_cache, statements_spec
+    from app.workflow.nodes import node_fundamentals
+
+    seq = iter(range(1_000_000))
+
+    async def serial():
+        async with mcp_clients.open_mcp_client() as client:
+            ticker = f"S{next(seq)}"
+            tables = {key: await mcp_clients.get_financial_statement(client, ticker, ftype)
+                      for key, ftype in statements_spec()}
+            holders = await mcp_clients.get_holder_info(client, ticker)
+        fundamental_features(tables, holders)
+
+    async def cold():
+        # 매번 새 티커 → 두 캐시 모두 미스
+        await node_fundamentals({"ticker": f"C{next(seq)}"})
+
+    async def tool_warm():
+        fundamentals_cache.clear()
+        await node_fundamentals({"ticker": "AAPL"})
+
+    async def hit():
+        await node_fundamentals({"ticker": "AAPL"})
+
+    await hit()  # 캐시 채우기
+    results = {
+        "serial": await timeit(serial, max(1, args.repeat // 4)),
+        "cold": await timeit(cold, args.repeat),
+        "tool-warm": await timeit(tool_warm, args.repeat),
+        "hit": await timeit(hit, args.repeat * 50),
+    }
+
+    tables = {key: fakes.fake_financial_statement({"ticker": "AAPL", "financial_type": ftype})
+              for key, ftype in statements_spec()}
+    holders = fakes.fake_holder_info({"ticker": "AAPL", "holder_type": "major_holders"})
+    times = []
+    for _ in range(args.repeat * 10):
+        t0 = time.perf_counter()
+        fundamental_features(tables, holders)
+        times.append((time.perf_counter() - t0) * 1000)
+
+    print(f"mcp_latency={args.mcp_latency_ms:g}ms  (p50 ms per /score fundamentals node)")
+    print(f"{'serial':>8} {'cold':>8} {'tool-warm':>10} {'hit':>8} {'metrics':>8}")
+    print(f"{results['serial']:8.1f} {results['cold']:8.1f} {results['tool-warm']:10.2f} {results['hit']:8.3f} "
+          f"{statistics.median(times):8.3f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,171 @@
+# bench/bench_graph.py
+"""
+LangGraph 파이프라인 자체 오버헤드 벤치 (오프라인, 가짜 MCP/LLM).
+run_once / run_stream / run_with_trace 를 동시성 단계별로 돌려
+- 지연 p50/p95/p99, 처리량
+- 요청당 할당 (tracemalloc: 요청 중 peak 증가분 / 요청 후 잔류분)
+- 노드별 소요 (NODE_SECONDS 히스토그램) 와 주입 지연을 뺀 오버헤드
+를 출력한다. 캐시는 모두 끔 (매 요청이 전체 파이프라인을 탐).
+
+실행 (ticker-score-agent/ 에서):
+    python -m bench.bench_graph                                   # 인프로세스 가짜 MCP
+    python -m bench.bench_graph --mcp stdio --pool-size 4         # bench.fake_mcp_server + 세션 풀
+    python -m bench.bench_graph --runners once --concurrency 1,8,64 --requests 2000 --llm-latency-ms 50
+    python -m bench.bench_graph --runners once --sources price --mcp-latency-ms 50   # 선택 소스만 (조건부 그래프)
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import gc
+import logging
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from bench.fakes import fake_servers_config, install_fake_llm, install_fakes
+
+
+def pct(sorted_vals: List[float], p: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    i = min(len(sorted_vals) - 1, max(0, round(p / 100 * len(sorted_vals)) - 1))
+    return sorted_vals[i]
+
+
+def node_totals() -> Dict[str, List[float]]:
+    """NODE_SECONDS 의 노드별 [count, sum] (공개 samples() 로 읽음)"""
+    from app.metrics import NODE_SECONDS
+
+    out: Dict[str, List[float]] = {}
+    for name, labels, v in NODE_SECONDS.samples():
+        if name.endswith("_count"):
+            out.setdefault(labels["node"], [0, 0.0])[0] = v
+        elif name.endswith("_sum"):
+            out.setdefault(labels["node"], [0, 0.0])[1] = v
+    return out
+
+
+def runners(sources: str | None = None) -> Dict[str, Callable[[str], Any]]:
+    from app.workflow import graph as graph_mod
+
+    async def once(t: str) -> None:
+        await graph_mod.run_once(t, sources)
+
+    async def stream(t: str) -> None:
+        async for _ in graph_mod.run_stream(t, sources):
+            pass
+
+    async def trace(t: str) -> None:
+        async for _ in graph_mod.run_with_trace(t, sources):
+            pass
+
+    return {"once": once, "stream": stream, "trace": trace}
+
+
+async def measure(run: Callable[[str], Any], requests: int, concurrency: int) -> Dict[str, float]:
+    sem = asyncio.Semaphore(concurrency)
+    lat: List[float] = []
+
+    async def one(i: int) -> None:
+        async with sem:
+            t0 = time.perf_counter()
+            await run(f"T{i % 500}")
+            lat.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    wall = time.perf_counter() - t0
+    lat.sort()
+    return {
+        "p50": pct(lat, 50) * 1000, "p95": pct(lat, 95) * 1000, "p99": pct(lat, 99) * 1000,
+        "rps": requests / wall,
+    }
+
+
+async def allocations(run: Callable[[str], Any], requests: int) -> Dict[str, float]:
+    """순차 실행하며 요청당 peak 증가분(일시 할당)과 잔류분(누수 후보) KiB"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        peaks = []
+        for i in range(requests):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await run(f"A{i}")
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+        gc.collect()
+        end, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"peak_kib": sum(peaks) / len(peaks) / 1024, "retained_kib": (end - base) / requests / 1024}
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mcp", choices=["inproc", "stdio"], default="inproc",
+                    help="inproc: FakeMCPClient / stdio: bench.fake_mcp_server 를 세션 풀로")
+    ap.add_argument("--pool-size", type=int, default=4)
+    ap.add_argument("--runners", default="once,stream,trace")
+    ap.add_argument("--concurrency", default="1,4,16,64")
+    ap.add_argument("--requests", type=int, default=500, help="동시성 단계별 요청 수")
+    ap.add_argument("--alloc-requests", type=int, default=200)
+    ap.add_argument("--mcp-latency-ms", type=float, default=0.0)
+    ap.add_argument("--llm-latency-ms", type=float, default=0.0)
+    ap.add_argument("--trace-level", default="off", help="traced() 레벨 (off/timings/preview/full)")
+    ap.add_argument("--sources", default=None, help="쉼표 구분 데이터 소스 (없으면 전체, 예: price,news)")
+    args = ap.parse_args()
+
+    logging.getLogger("ticker-graph").setLevel(logging.WARNING)
+
+    from app.settings import settings
+    settings.tool_cache_enabled = False
+    settings.score_cache_enabled = False
+
+    from app.workflow.mcp_pool import mcp_pool
+    from app.workflow.trace import set_trace_level
+
+    mcp_latency, llm_latency = args.mcp_latency_ms / 1000, args.llm_latency_ms / 1000
+    if args.mcp == "stdio":
+        install_fake_llm(llm_latency)
+        await mcp_pool.start(servers_cfg=fake_servers_config(mcp_latency), size=args.pool_size)
+    else:
+        install_fakes(mcp_latency, llm_latency)
+    set_trace_level(args.trace_level)
+
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    table = runners(args.sources)
+    # 주입 지연 (노드 오버헤드 = 평균 소요 - 주입 지연). yahoo 는 info/news 병렬 → 1회분
+    injected = {"yahoo": mcp_latency, "score": llm_latency}
+    print(f"mcp={args.mcp} mcp_latency={args.mcp_latency_ms}ms llm_latency={args.llm_latency_ms}ms "
+          f"trace={args.trace_level} sources={args.sources or 'all'} requests/level={args.requests}")
+    try:
+        for name in [r.strip() for r in args.runners.split(",") if r.strip()]:
+            run = table[name]
+            await measure(run, min(50, args.requests), 8)  # 워밍업
+            before = node_totals()
+            print(f"\n[{name}]")
+            print(f"{'conc':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+            for c in levels:
+                r = await measure(run, args.requests, c)
+                print(f"{c:>5} {r['p50']:9.2f} {r['p95']:9.2f} {r['p99']:9.2f} {r['rps']:9.1f}")
+
+            after = node_totals()
+            print(f"{'node':>10} {'mean ms':>9} {'overhead ms':>12}")
+            for node, (cnt, total) in sorted(after.items()):
+                c0, s0 = before.get(node, [0, 0.0])
+                if cnt - c0 <= 0:
+                    continue
+                mean = (total - s0) / (cnt - c0)
+                print(f"{node:>10} {mean * 1000:9.3f} {(mean - injected.get(node, 0.0)) * 1000:12.3f}")
+
+            a = await allocations(run, args.alloc_requests)
+            print(f"alloc/request: peak {a['peak_kib']:.1f} KiB, retained {a['retained_kib']:.2f} KiB")
+    finally:
+        if mcp_pool.started:
+            await mcp_pool.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,68 @@
+# bench/bench_mcp_pool.py
+"""
+요청마다 MCP 서버를 spawn 하는 방식 vs 세션 풀 방식 비교.
+
+실행 (ticker-score-agent/ 에서):
+    python -m bench.bench_mcp_pool --requests 20 --concurrency 4 --ticker AAPL
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+from app.workflow.mcp_clients import open_mcp_client, get_stock_info
+from app.workflow.mcp_pool import mcp_pool
+
+
+def _pct(xs: List[float], p: float) -> float:
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(round(p / 100 * (len(xs) - 1))))]
+
+
+async def _one(ticker: str) -> float:
+    t0 = time.perf_counter()
+    async with open_mcp_client() as client:
+        await get_stock_info(client, ticker)
+    return (time.perf_counter() - t0) * 1000
+
+
+async def _run(label: str, n: int, concurrency: int, ticker: str) -> None:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def worker() -> float:
+        async with sem:
+            return await _one(ticker)
+
+    t0 = time.perf_counter()
+    lat = await asyncio.gather(*(worker() for _ in range(n)))
+    wall = time.perf_counter() - t0
+    print(f"{label:<6} n={n:<4} conc={concurrency:<3} "
+          f"mean={statistics.mean(lat):8.1f}ms p50={_pct(lat, 50):8.1f}ms "
+          f"p95={_pct(lat, 95):8.1f}ms  throughput={n / wall:6.2f} req/s")
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=20)
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--pool-size", type=int, default=4)
+    ap.add_argument("--ticker", default="AAPL")
+    args = ap.parse_args()
+
+    # 1) 요청마다 spawn (풀 미기동 상태의 open_mcp_client)
+    await _run("spawn", args.requests, args.concurrency, args.ticker)
+
+    # 2) 세션 풀
+    t0 = time.perf_counter()
+    await mcp_pool.start(size=args.pool_size)
+    print(f"pool warm-up: {(time.perf_counter() - t0) * 1000:.1f}ms (size={args.pool_size})")
+    try:
+        await _run("pool", args.requests, args.concurrency, args.ticker)
+    finally:
+        await mcp_pool.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
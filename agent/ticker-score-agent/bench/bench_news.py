@@ -0,0 +1,115 @@
+# bench/bench_news.py
+"""
+뉴스 중복 제거/랭킹(app.workflow.news_rank) 벤치.
+합성 기사: 서로 다른 원 기사 S 개 + 각 기사의 재배포본(출처 꼬리말, 문장부호, 단어 1~2개 추가/삭제)
+- 규모별 rank_news 소요 시간 (p50)
+- 근접 중복 / 서로 다른 기사 쌍의 SimHash 해밍 거리 분포 (임계값 선택 근거)
+- 상위 k 에 같은 원 기사가 두 번 이상 들어갔는지 (중복 누수)
+
+실행 (ticker-score-agent/ 에서):
+    python -m bench.bench_news --sizes 100,1000,5000 --k 5
+"""
+from __future__ import annotations
+import argparse
+import random
+import statistics
+import time
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from app.workflow.news_rank import hamming, rank_news, simhash64
+
+_WORDS = ("shares stock earnings revenue guidance analysts quarter growth margin demand supply chip iphone "
+          "services cloud ai chips sales forecast investors market rally drop record profit outlook deal "
+          "regulators lawsuit china tariffs buyback dividend upgrade downgrade target price beats misses "
+          "expectations surge slump launch product ceo says report week year strong weak higher lower").split()
+_SOURCES = ["reuters.com", "bloomberg.com", "finance.yahoo.com", "fool.com", "benzinga.com",
+            "marketwatch.com", "zacks.com", "cnbc.com"]
+
+
+def _sentence(rng: random.Random, n: int) -> List[str]:
+    return [rng.choice(_WORDS) for _ in range(n)]
+
+
+def _variant(rng: random.Random, words: List[str]) -> List[str]:
+    w = list(words)
+    for _ in range(rng.randint(0, 2)):
+        if rng.random() < 0.5 and len(w) > 5:
+            del w[rng.randrange(len(w))]
+        else:
+            w.insert(rng.randrange(len(w) + 1), rng.choice(_WORDS))
+    return w
+
+
+def synth(n: int, stories: int, ticker: str = "AAPL", seed: int = 7) -> Tuple[List[Dict[str, Any]], List[int]]:
+    """n 개 기사 (원 기사 stories 개를 재배포본으로 채움), 기사별 원 기사 번호"""
+    rng = random.Random(seed)
+    base = [(_sentence(rng, 10), _sentence(rng, 40)) for _ in range(stories)]
+    now = time.time()
+    recs, story_of = [], []
+    for i in range(n):
+        s = rng.randrange(stories)
+        title, summary = base[s]
+        if i >= stories:  # 처음 stories 개는 원문, 이후는 재배포본
+            title, summary = _variant(rng, title), _variant(rng, summary)
+        src = rng.choice(_SOURCES)
+        recs.append({
+            "title": f"{ticker} " + " ".join(title) + rng.choice(["", ".", " - " + src.split(".")[0].title()]),
+            "summary": " ".join(summary) + rng.choice(["", " (Reuters)", "..."]),
+            "url": f"https://www.{src}/news/{s}-{i}",
+            "published": now - rng.uniform(0, 72) * 3600,
+            "sentiment": None,
+        })
+        story_of.append(s)
+    return recs, story_of
+
+
+def distances(recs: List[Dict[str, Any]], story_of: List[int], pairs: int = 20000) -> Tuple[List[int], List[int]]:
+    fps = simhash64([r["title"] for r in recs], [r["summary"] for r in recs])
+    rng = random.Random(1)
+    same, diff = [], []
+    for _ in range(pairs):
+        a, b = rng.randrange(len(recs)), rng.randrange(len(recs))
+        if a == b:
+            continue
+        d = int(hamming(fps[a:a + 1], fps[b])[0])
+        (same if story_of[a] == story_of[b] else diff).append(d)
+    return same, diff
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="100,1000,5000")
+    ap.add_argument("--stories", type=int, default=40, help="원 기사 수 (나머지는 재배포본)")
+    ap.add_argument("--k", type=int, default=5)
+    ap.add_argument("--max-distance", type=int, default=None, help="기본: settings.news_dedup_max_distance")
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    from app.settings import settings
+    max_d = settings.news_dedup_max_distance if args.max_distance is None else args.max_distance
+
+    recs, story_of = synth(2000, args.stories)
+    same, diff = distances(recs, story_of)
+    q = lambda xs, p: int(np.percentile(xs, p))  # noqa: E731
+    print(f"hamming  near-dup p50={q(same, 50)} p95={q(same, 95)} p99={q(same, 99)} | "
+          f"distinct p1={q(diff, 1)} p5={q(diff, 5)} p50={q(diff, 50)}")
+    print(f"threshold={max_d}: near-dup caught {np.mean(np.array(same) <= max_d):.1%}, "
+          f"distinct merged {np.mean(np.array(diff) <= max_d):.2%}")
+
+    print(f"{'n':>6} {'p50 ms':>8} {'leaks':>6}  (leaks: 상위 {args.k} 에 같은 원 기사가 중복된 수)")
+    for n in [int(x) for x in args.sizes.split(",") if x.strip()]:
+        recs, story_of = synth(n, min(args.stories, n))
+        story = {r["url"]: s for r, s in zip(recs, story_of)}
+        times = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            top = rank_news(recs, "AAPL", k=args.k, max_distance=max_d)
+            times.append((time.perf_counter() - t0) * 1000)
+        picked = [story[r["url"]] for r in top]
+        print(f"{n:>6} {statistics.median(times):8.2f} {len(picked) - len(set(picked)):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# bench/bench_options.py
+"""
+options 노드 벤치 (가짜 MCP, 호출당 고정 지연).
+만기 수를 늘려 가며 종목당 소요 시간을 잰다:
+- serial : 동시성 1 (만기 × calls/puts 를 차례로) → 만기 수에 비례
+- fan-out: options_concurrency 만큼 동시 호출 → ⌈2N / 동시성⌉ 라운드
+- budget : fan-out + 노드 예산(options_timeout) → 예산을 넘는 호출은 버리고 받은 체인만 사용
+- cached : 툴 캐시에 체인이 있는 상태 (get_option_chain TTL 안의 재요청)
+metrics 열은 합친 체인에 대한 지표 계산(combine_chains + option_features) 시간.
+
+실행 (ticker-score-agent/ 에서):
+    python -m bench.bench_options --expirations 4,8,16,32 --mcp-latency-ms 50 --concurrency 8 --budget-ms 250
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any, Awaitable, Callable, List
+
+from bench import fakes
+from bench.fakes import FakeMCPClient
+
+
+async def timeit(fn: Callable[[], Awaitable[Any]], repeat: int) -> float:
+    """p50 ms"""
+    times: List[float] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        await fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--expirations", default="4,8,16,32")
+    ap.add_argument("--mcp-latency-ms", type=float, default=50.0)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--budget-ms", type=float, default=250.0)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    from app.settings import settings
+    from app.workflow import mcp_clients
+    from app.workflow.nodes import load_option_chains
+    from app.workflow.option_metrics import combine_chains, option_features
+
+    client = FakeMCPClient(args.mcp_latency_ms / 1000.0)
+    settings.options_call_timeout = 60.0
+
+    async def node(ticker: str = "AAPL") -> Any:
+        chains, failed = await load_option_chains(client, ticker)
+        return option_features(combine_chains(chains)), failed
+
+    print(f"mcp_latency={args.mcp_latency_ms:g}ms concurrency={args.concurrency} budget={args.budget_ms:g}ms "
+          f"(p50 ms per ticker)")
+    print(f"{'exp':>4} {'calls':>6} {'serial':>8} {'fan-out':>8} {'budget':>8} {'kept':>6} {'cached':>8} {'metrics':>8}")
+    for n in [int(x) for x in args.expirations.split(",") if x.strip()]:
+        fakes.FAKE_OPTION_EXPIRATIONS = n
+        settings.options_max_expirations = n
+        settings.tool_cache_enabled = False
+        settings.options_timeout = 600.0
+
+        settings.options_concurrency = 1
+        serial = await timeit(node, 1)
+        settings.options_concurrency = args.concurrency
+        fan = await timeit(node, args.repeat)
+        settings.options_timeout = args.budget_ms / 1000.0
+        budget = await timeit(node, args.repeat)
+        _, failed = await node()
+        kept = 2 * n - failed
+
+        settings.options_timeout = 600.0
+        settings.tool_cache_enabled = True
+        mcp_clients.tool_cache.clear()
+        await node()  # 캐시 채우기
+        cached = await timeit(node, args.repeat)
+
+        chains, _ = await load_option_chains(client, "AAPL")
+        times = []
+        for _ in range(args.repeat * 4):
+            t0 = time.perf_counter()
+            option_features(combine_chains(chains))
+            times.append((time.perf_counter() - t0) * 1000)
+        metrics = statistics.median(times)
+        print(f"{n:>4} {2 * n:>6} {serial:8.1f} {fan:8.1f} {budget:8.1f} {kept:>3}/{2 * n:<2} {cached:8.1f} "
+              f"{metrics:8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,77 @@
+# bench/bench_spawn.py
+"""
+MCP 세션 spawn → initialize 완료(ready)까지 시간, 실행 방식별 비교.
+- uv:     설정 그대로 'uv --directory … run server.py' (매번 uv 해석/동기화)
+- direct: 기동 시 1회 해석한 인터프리터로 직접 exec (해석 1회 비용은 따로 출력)
+- spare:  warm spare 가 있을 때 슬롯 교체(_respawn)에 걸리는 시간
+
+실행 (ticker-score-agent/ 에서, mcp_config.json 의 uv 설정 사용):
+    python -m bench.bench_spawn --server yahoo --spawns 5
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from typing import Any, Dict, List
+
+from app.workflow.mcp_launch import direct_connection, parse_uv_run
+from app.workflow.mcp_pool import PooledSession, ServerPool, load_servers_config
+
+
+def _report(label: str, ms: List[float]) -> None:
+    print(f"{label:<7} n={len(ms):<3} mean={statistics.mean(ms):8.1f}ms "
+          f"p50={statistics.median(ms):8.1f}ms max={max(ms):8.1f}ms")
+
+
+async def _spawns(pool: ServerPool, connection: Dict[str, Any], n: int) -> List[float]:
+    out = []
+    for _ in range(n):
+        s = PooledSession(pool, connection, 0)
+        await s.spawn(pool.spawn_timeout)
+        out.append(float(s.spawn_ms))
+        await s.close()
+    return out
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--config", default=None, help="mcp_config.json 경로 (기본: settings.mcp_config_path)")
+    ap.add_argument("--server", default="yahoo")
+    ap.add_argument("--spawns", type=int, default=5)
+    args = ap.parse_args()
+    logging.getLogger("ticker-graph").setLevel(logging.WARNING)
+
+    connection = load_servers_config(args.config)[args.server]
+    if parse_uv_run(connection) is None:
+        raise SystemExit(f"{args.server}: not a 'uv --directory DIR run …' connection")
+
+    def new_pool(conn: Dict[str, Any], mode: str, spares: int = 0) -> ServerPool:
+        return ServerPool(args.server, conn, 1, spawn_timeout=120.0, ping_timeout=5.0,
+                          warm_spares=spares, launch_mode=mode)
+
+    _report("uv", await _spawns(new_pool(connection, "uv"), connection, args.spawns))
+
+    t0 = time.perf_counter()
+    direct = await direct_connection(connection)
+    print(f"direct: interpreter resolved once in {(time.perf_counter() - t0) * 1000:.1f}ms → {direct['command']}")
+    _report("direct", await _spawns(new_pool(direct, "direct"), direct, args.spawns))
+
+    pool = new_pool(direct, "direct", spares=1)
+    await pool.start()
+    swaps = []
+    try:
+        for _ in range(args.spawns):
+            while not pool.spares:  # 예비분 재충전 대기
+                await asyncio.sleep(0.05)
+            t0 = time.perf_counter()
+            await pool._respawn(pool.slots[0])
+            swaps.append((time.perf_counter() - t0) * 1000)
+    finally:
+        await pool.close()
+    _report("spare", swaps)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+# bench/bench_technicals.py
+"""
+기술적 지표(app.workflow.technicals) 계산 벤치.
+- single: history 노드 경로 그대로 (records JSON 파싱 → 1행 배치 → dict), 종목당 1회
+- batch : 길이가 제각각인 이력 N 개를 stack_series 로 (N, T) 배열로 만든 뒤 compute_features 1회
+종목당 µs 를 출력한다 (목표: 종목당 1ms 미만).
+
+실행 (ticker-score-agent/ 에서):
+    python -m bench.bench_technicals --tickers 1,100,1000 --bars 126
+"""
+from __future__ import annotations
+import argparse
+import statistics
+import time
+from typing import Callable, List
+
+import numpy as np
+
+from app.workflow.technicals import compute_features, parse_history, stack_series, technicals_for
+from bench.fakes import fake_history
+
+
+def timeit(fn: Callable[[], object], repeat: int) -> float:
+    """p50 ms"""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tickers", default="1,100,1000")
+    ap.add_argument("--bars", type=int, default=126, help="종목당 최대 봉 수 (6mo 일봉 ≈ 126)")
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    raw = fake_history({"ticker": "AAPL"}, bars=args.bars)
+    history = parse_history(raw)
+    parse_ms = timeit(lambda: parse_history(raw), args.repeat * 5)
+    feat_ms = timeit(lambda: technicals_for(history), args.repeat * 5)
+    print(f"single  parse {parse_ms * 1000:7.1f} µs  features {feat_ms * 1000:7.1f} µs  "
+          f"(bars={history['bars']})")
+
+    rng = np.random.default_rng(7)
+    print(f"{'N':>6} {'stack ms':>9} {'features ms':>12} {'µs/ticker':>10}")
+    for n in [int(x) for x in args.tickers.split(",") if x.strip()]:
+        # 상장 기간이 짧은 종목도 섞이도록 길이를 무작위로
+        lengths = rng.integers(args.bars // 4, args.bars + 1, size=n)
+        closes: List[np.ndarray] = [100 * np.exp(np.cumsum(rng.normal(0, 0.015, k))) for k in lengths]
+        volumes: List[np.ndarray] = [rng.uniform(5e6, 2e7, k) for k in lengths]
+        stack_ms = timeit(lambda: (stack_series(closes), stack_series(volumes)), args.repeat)
+        c, v = stack_series(closes), stack_series(volumes)
+        ms = timeit(lambda: compute_features(c, v), args.repeat)
+        print(f"{n:>6} {stack_ms:9.2f} {ms:12.2f} {(stack_ms + ms) * 1000 / n:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
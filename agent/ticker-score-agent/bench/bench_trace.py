@@ -0,0 +1,63 @@
+# bench/bench_trace.py
+"""
+traced() 데코레이터 레벨별 오버헤드 마이크로벤치 (노드 1회 호출당 µs).
+노드 본체는 즉시 반환하는 가짜 노드, 상태는 실제 파이프라인 크기(뉴스 5건/공시 2건)로 구성.
+
+실행 (ticker-score-agent/ 에서):
+    python -m bench.bench_trace --iterations 20000
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import logging
+import time
+
+from app.workflow.trace import TRACE_LEVELS, trace_level, traced
+
+STATE = {
+    "ticker": "AAPL",
+    "price": {"ticker": "AAPL", "last": 231.5, "chg": 1.2, "pct": 0.52},
+    "news": [
+        {"title": f"headline {i}", "summary": "summary " * 20, "sentiment": None,
+         "url": f"https://news.example.com/{i}"}
+        for i in range(5)
+    ],
+    "filings": [{"type": "분기보고서", "date": "2023-06-30", "summary": "2023년 2분기 분기보고서 제출"}] * 2,
+    "logs": ["yahoo:ok", "dart:ok"],
+}
+OUT = {"score": 72, "rationale": "긍정적 뉴스와 안정적 가격 흐름 " * 3, "logs": ["score:ok"]}
+
+
+async def raw_node(state):
+    return OUT
+
+
+async def _measure(fn, n: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        await fn(STATE)
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--iterations", type=int, default=20_000)
+    ap.add_argument("--log-level", default="INFO", help="ticker-graph 로거 레벨 (preview 로그 비용 포함 여부)")
+    args = ap.parse_args()
+
+    logger = logging.getLogger("ticker-graph")
+    logger.setLevel(args.log_level)
+    logger.propagate = False
+    logger.addHandler(logging.NullHandler())  # 로그 인자(프리뷰 JSON) 생성 비용은 측정하되 출력은 버림
+
+    node = traced("bench")(raw_node)
+    base = await _measure(raw_node, args.iterations)
+    print(f"{'raw':<8} {base:8.2f} µs/call")
+    for level in TRACE_LEVELS:
+        with trace_level(level):
+            us = await _measure(node, args.iterations)
+        print(f"{level:<8} {us:8.2f} µs/call  (overhead {us - base:8.2f} µs)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
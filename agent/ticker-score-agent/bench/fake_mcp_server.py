@@ -0,0 +1,83 @@
+# bench/fake_mcp_server.py
+"""
+오프라인 벤치마크용 가짜 yahoo MCP 서버 (stdio).
+bench.fakes 와 같은 결정적 응답을 실제 MCP 프로토콜로 돌려준다 → 세션/어댑터/직렬화 비용까지 포함해 측정.
+
+실행 (ticker-score-agent/ 에서, 보통은 bench.fakes.fake_servers_config() 가 띄움):
+    python -m bench.fake_mcp_server --latency-ms 20
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+
+from mcp.server.fastmcp import FastMCP
+
+from bench.fakes import (
+    fake_financial_statement, fake_history, fake_holder_info, fake_news, fake_option_chain,
+    fake_option_expirations, fake_stock_info,
+)
+
+mcp = FastMCP("fake-yahoo", log_level="WARNING")
+LATENCY = 0.0
+
+
+async def _delay() -> None:
+    if LATENCY:
+        await asyncio.sleep(LATENCY)
+
+
+@mcp.tool()
+async def get_stock_info(ticker: str) -> str:
+    """결정적 가짜 시세 (JSON 문자열)"""
+    await _delay()
+    return fake_stock_info({"ticker": ticker})
+
+
+@mcp.tool()
+async def get_yahoo_finance_news(ticker: str) -> str:
+    """결정적 가짜 뉴스 (Title/Summary/URL 블록)"""
+    await _delay()
+    return fake_news({"ticker": ticker})
+
+
+@mcp.tool()
+async def get_historical_stock_prices(ticker: str, period: str = "1mo", interval: str = "1d") -> str:
+    """결정적 가짜 일봉 (records JSON)"""
+    await _delay()
+    return fake_history({"ticker": ticker})
+
+
+@mcp.tool()
+async def get_option_expiration_dates(ticker: str) -> str:
+    """결정적 가짜 옵션 만기 (JSON 목록)"""
+    await _delay()
+    return fake_option_expirations({"ticker": ticker})
+
+
+@mcp.tool()
+async def get_option_chain(ticker: str, expiration_date: str, option_type: str) -> str:
+    """결정적 가짜 옵션 체인 (records JSON)"""
+    await _delay()
+    return fake_option_chain({"ticker": ticker, "expiration_date": expiration_date, "option_type": option_type})
+
+
+
+@mcp.tool()
+async def get_financial_statement(ticker: str, financial_type: str) -> str:
+    """결정적 가짜 재무제표 (records JSON)"""
+    await _delay()
+    return fake_financial_statement({"ticker": ticker, "financial_type": financial_type})
+
+
+@mcp.tool()
+async def get_holder_info(ticker: str, holder_type: str) -> str:
+    """결정적 가짜 주요 주주 비율 (records JSON)"""
+    await _delay()
+    return fake_holder_info({"ticker": ticker, "holder_type": holder_type})
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    LATENCY = ap.parse_args().latency_ms / 1000.0
+    mcp.run()
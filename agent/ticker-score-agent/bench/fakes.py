@@ -0,0 +1,262 @@
+# bench/fakes.py
+"""
+오프라인 벤치마크용 가짜 MCP 클라이언트 / 가짜 LLM.
+- install_fakes(): 노드가 쓰는 open_mcp_client / llm 을 바꿔 끼운다 (네트워크·자식 프로세스 없음)
+- fake_servers_config(): 같은 응답을 주는 stdio MCP 서버(bench.fake_mcp_server) 설정 → 실제 세션 풀 경로 측정
+"""
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import random
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+
+def _seed(ticker: str) -> int:
+    return int(hashlib.md5(ticker.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def fake_stock_info(args: Dict[str, Any]) -> str:
+    s = _seed(args["ticker"])
+    prev = 50 + s % 400
+    last = prev * (1 + ((s >> 8) % 200 - 100) / 2000)
+    return json.dumps({"currentPrice": round(last, 2), "previousClose": prev})
+
+
+def fake_news(args: Dict[str, Any]) -> str:
+    t = args["ticker"]
+    return "\n\n".join(
+        f"Title: {t} headline {i}\nSummary: {t} summary {i}\nURL: https://news.example.com/{t}/{i}"
+        for i in range(8)
+    )
+
+
+def fake_history(args: Dict[str, Any], bars: int = 126) -> str:
+    """결정적 랜덤워크 일봉, 오늘로 끝남 (yahoo MCP 와 같은 records JSON: Date/Open/High/Low/Close/Volume)"""
+    rng = random.Random(_seed(args["ticker"]))
+    price, rows = 50.0 + _seed(args["ticker"]) % 400, []
+    today = int(time.time()) // 86400 * 86400
+    for i in range(bars):
+        price *= 1 + rng.gauss(0, 0.015)
+        rows.append({
+            "Date": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(today - (bars - 1 - i) * 86400)),
+            "Open": round(price * 0.998, 2), "High": round(price * 1.01, 2), "Low": round(price * 0.99, 2),
+            "Close": round(price, 2), "Volume": int(rng.uniform(5e6, 2e7)),
+        })
+    return json.dumps(rows)
+
+
+# 가짜 옵션 만기 수 (bench_options 에서 바꿔 가며 측정)
+FAKE_OPTION_EXPIRATIONS = 12
+
+
+def fake_option_expirations(args: Dict[str, Any]) -> str:
+    """오늘 이후 금요일 만기 FAKE_OPTION_EXPIRATIONS 개 (JSON 목록)"""
+    day = int(time.time()) // 86400 * 86400
+    day += ((4 - time.gmtime(day).tm_wday) % 7 or 7) * 86400  # 다음 금요일
+    return json.dumps([time.strftime("%Y-%m-%d", time.gmtime(day + 7 * 86400 * i))
+                       for i in range(FAKE_OPTION_EXPIRATIONS)])
+
+
+def fake_option_chain(args: Dict[str, Any], strikes: int = 41) -> str:
+    """현물 ±30% 행사가, 스마일/기간 구조가 있는 IV (yahoo MCP 와 같은 records JSON)"""
+    spot = json.loads(fake_stock_info(args))["currentPrice"]
+    put = args.get("option_type") == "puts"
+    expiration = args["expiration_date"]
+    rng = random.Random(_seed(f"{args['ticker']}|{expiration}|{args.get('option_type')}"))
+    weeks = max(1, (int(time.mktime(time.strptime(expiration, "%Y-%m-%d"))) - time.time()) / (7 * 86400))
+    rows = []
+    for i in range(strikes):
+        strike = round(spot * (0.7 + 0.6 * i / (strikes - 1)), 1)
+        m = strike / spot
+        rows.append({
+            "contractSymbol": f"{args['ticker']}{expiration}{'P' if put else 'C'}{strike}",
+            "strike": strike, "lastPrice": round(max(spot - strike if not put else strike - spot, 0) + 1, 2),
+            "volume": float(int(rng.expovariate(1 / 500) / (1 + 20 * (m - 1) ** 2))),
+            "openInterest": int(rng.expovariate(1 / 3000)),
+            "impliedVolatility": round(0.25 + 0.01 * weeks ** 0.5 + 0.3 * (1 - m) + 0.8 * (m - 1) ** 2, 4),
+            "inTheMoney": strike > spot if put else strike < spot,
+        })
+    return json.dumps(rows)
+
+
+def _period_ends(period: str, count: int) -> list:
+    """최근 count 개 기간 말 날짜 (최신 순). 분기는 30일 전까지 끝난 분기부터 → 다음 공시 예상일이 항상 미래"""
+    t = time.gmtime(time.time() - 30 * 86400)
+    if period != "quarterly":
+        return [f"{y}-12-31" for y in range(t.tm_year - 1, t.tm_year - 1 - count, -1)]
+    n = t.tm_year * 4 + (t.tm_mon - 1) // 3 - 1  # 마지막으로 끝난 분기 번호
+    return [f"{(n - i) // 4}-{3 * ((n - i) % 4 + 1):02d}-{[31, 30, 30, 31][(n - i) % 4]}" for i in range(count)]
+
+
+def fake_financial_statement(args: Dict[str, Any]) -> str:
+    """결정적 가짜 재무제표 (yahoo MCP 와 같은 records JSON: date + 행 이름, 최신 순). 분기 5개 / 연간 4개"""
+    ftype = args["financial_type"]
+    kinds = {"income_stmt": "income", "balance_sheet": "balance", "cashflow": "cashflow"}
+    period = "quarterly" if ftype.startswith("quarterly_") else "annual"
+    kind = kinds.get(ftype.removeprefix("quarterly_"))
+    if kind is None:
+        return f"Error: invalid financial type {ftype}"
+    rng = random.Random(_seed(f"{args['ticker']}|{kind}|{period}"))
+    scale = (1 + _seed(args["ticker"]) % 50) * (1e9 if period == "quarterly" else 4e9)
+    rows = []
+    for i, date in enumerate(_period_ends(period, 5 if period == "quarterly" else 4)):
+        rev = scale * (1 - 0.02 * i) * rng.uniform(0.97, 1.03)
+        if kind == "income":
+            row = {"Total Revenue": rev, "Gross Profit": rev * 0.45, "Operating Income": rev * 0.3,
+                   "Net Income": rev * rng.uniform(0.18, 0.26)}
+        elif kind == "balance":
+            assets = scale * 3.5
+            row = {"Total Assets": assets, "Total Liabilities Net Minority Interest": assets * 0.6,
+                   "Stockholders Equity": assets * 0.4, "Total Debt": assets * 0.3,
+                   "Cash And Cash Equivalents": assets * 0.1, "Current Assets": assets * 0.35,
+                   "Current Liabilities": assets * 0.3}
+        else:
+            row = {"Operating Cash Flow": rev * 0.32, "Capital Expenditure": -rev * 0.05,
+                   "Free Cash Flow": rev * 0.27}
+        rows.append({"date": date, **{k: round(v) for k, v in row.items()}})
+    return json.dumps(rows)
+
+
+def fake_holder_info(args: Dict[str, Any]) -> str:
+    """결정적 가짜 주요 주주 비율 (records JSON: metric / Value). major_holders 외에는 실제 서버처럼 에러 문자열"""
+    if args.get("holder_type") != "major_holders":
+        return f"Error: invalid holder type {args.get('holder_type')}"
+    s = _seed(args["ticker"])
+    return json.dumps([
+        {"metric": "insidersPercentHeld", "Value": round((s % 100) / 2000, 4)},
+        {"metric": "institutionsPercentHeld", "Value": round(0.4 + (s >> 8) % 50 / 100, 4)},
+    ])
+
+
+FAKE_TOOLS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "get_stock_info": fake_stock_info,
+    "get_yahoo_finance_news": fake_news,
+    "get_historical_stock_prices": fake_history,
+    "get_option_expiration_dates": fake_option_expirations,
+    "get_option_chain": fake_option_chain,
+    "get_financial_statement": fake_financial_statement,
+    "get_holder_info": fake_holder_info,
+}
+
+
+def _schema(*required: str, optional: tuple = ()) -> Dict[str, Any]:
+    return {"type": "object", "properties": {k: {"type": "string"} for k in required + optional},
+            "required": list(required)}
+
+
+# 실제 yahoo-finance-mcp(v0.1.2) 의 툴 입력 스키마 (인자 이름이 어긋나면 call_tool 이 ToolArgumentError)
+FAKE_TOOL_SCHEMAS: Dict[str, Dict[str, Any]] = {
+    "get_stock_info": _schema("ticker"),
+    "get_yahoo_finance_news": _schema("ticker"),
+    "get_historical_stock_prices": _schema("ticker", optional=("period", "interval")),
+    "get_option_expiration_dates": _schema("ticker"),
+    "get_option_chain": _schema("ticker", "expiration_date", "option_type"),
+    "get_financial_statement": _schema("ticker", "financial_type"),
+    "get_holder_info": _schema("ticker", "holder_type"),
+}
+
+
+class FakeTool:
+    def __init__(self, name: str, fn: Callable[[Dict[str, Any]], Any], latency: float) -> None:
+        self.name = name
+        self.args_schema = FAKE_TOOL_SCHEMAS.get(name)
+        self._fn = fn
+        self._latency = latency
+
+    async def ainvoke(self, args: Dict[str, Any]) -> Any:
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        return self._fn(args)
+
+
+class FakeMCPClient:
+    """open_mcp_client() 핸들과 같은 resolve_tool()/get_tools() 인터페이스"""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.tools = {name: FakeTool(name, fn, latency) for name, fn in FAKE_TOOLS.items()}
+
+    async def resolve_tool(self, name: str) -> FakeTool:
+        return self.tools[name.partition(":")[2] or name]
+
+    async def get_tools(self):
+        return list(self.tools.values())
+
+
+class _Resp:
+    def __init__(self, content: str) -> None:
+        self.content = content
+
+
+class FakeLLM:
+    """ChatClovaX 대역: 고정 지연 후 결정적 JSON 점수 응답 (astream 은 같은 지연을 토큰에 나눠 흘림)"""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.calls = 0
+
+    @staticmethod
+    def _answer(prompt: str) -> str:
+        score = 1 + _seed(prompt) % 100
+        rationale = "가짜 LLM 응답: 최근 뉴스 흐름과 가격 변동을 종합하면 단기적으로 중립에 가까운 관점입니다."
+        return json.dumps({"score": score, "rationale": rationale}, ensure_ascii=False)
+
+    async def ainvoke(self, prompt: str) -> _Resp:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return _Resp(self._answer(prompt))
+
+    async def astream(self, prompt: str):
+        """첫 토큰까지 지연의 20%, 나머지 80% 를 4글자 토큰들에 균등 분배"""
+        self.calls += 1
+        text = self._answer(prompt)
+        tokens = [text[i:i + 4] for i in range(0, len(text), 4)]
+        if self.latency:
+            await asyncio.sleep(self.latency * 0.2)
+        for i, tok in enumerate(tokens):
+            if i and self.latency:
+                await asyncio.sleep(self.latency * 0.8 / (len(tokens) - 1))
+            yield _Resp(tok)
+
+    async def abatch(self, prompts):
+        return await asyncio.gather(*(self.ainvoke(p) for p in prompts))
+
+
+def fake_servers_config(latency: float = 0.0) -> Dict[str, Any]:
+    """bench.fake_mcp_server 를 stdio 로 띄우는 servers 설정 (mcp_pool.start(servers_cfg=...) 용)"""
+    return {
+        "yahoo": {
+            "transport": "stdio",
+            "command": sys.executable,
+            "args": ["-m", "bench.fake_mcp_server", "--latency-ms", str(latency * 1000)],
+            "cwd": str(Path(__file__).resolve().parent.parent),
+        }
+    }
+
+
+def install_fake_llm(llm_latency: float = 0.0) -> FakeLLM:
+    """score 노드/배처의 LLM 만 가짜로 교체 (MCP 는 실제 경로 사용 시)"""
+    from app.workflow import llm_batcher, nodes
+
+    llm = FakeLLM(llm_latency)
+    nodes.llm_naver = llm
+    llm_batcher.score_batcher.llm = llm
+    return llm
+
+
+def install_fakes(mcp_latency: float = 0.0, llm_latency: float = 0.0) -> FakeLLM:
+    """노드 모듈의 MCP/LLM 의존성을 가짜로 교체하고 FakeLLM 반환"""
+    from app.workflow import mcp_clients, nodes
+
+    @asynccontextmanager
+    async def _open():
+        yield FakeMCPClient(mcp_latency)
+
+    nodes.open_mcp_client = _open
+    mcp_clients.open_mcp_client = _open  # stale 갱신 경로
+    return install_fake_llm(llm_latency)
@@ -0,0 +1,70 @@
+# bench/soak_checkpointer.py
+"""
+체크포인터 모드별 메모리 soak 테스트 (가짜 MCP/LLM, 오프라인).
+요청마다 새 thread_id 를 쓰는 run_once 를 N회 돌리며 RSS 를 샘플링한다.
+
+실행 (ticker-score-agent/ 에서):
+    python -m bench.soak_checkpointer --mode memory --requests 100000
+    python -m bench.soak_checkpointer --mode unbounded --requests 20000   # 기존 MemorySaver 비교용
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import logging
+import os
+import resource
+import time
+
+from bench.fakes import install_fakes
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:  # /proc 없는 OS: 최대 RSS 로 대체
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mode", choices=["none", "memory", "unbounded"], default="memory")
+    ap.add_argument("--requests", type=int, default=100_000)
+    ap.add_argument("--concurrency", type=int, default=50)
+    ap.add_argument("--sample-every", type=int, default=10_000)
+    args = ap.parse_args()
+
+    logging.getLogger("ticker-graph").setLevel(logging.WARNING)
+
+    from app.settings import settings
+    settings.tool_cache_enabled = False
+    settings.score_cache_enabled = False
+
+    from langgraph.checkpoint.memory import MemorySaver
+    from app.workflow import graph as graph_mod
+    from app.workflow.checkpoint import make_checkpointer
+
+    saver = MemorySaver() if args.mode == "unbounded" else make_checkpointer(args.mode)
+    graph_mod.memory = saver
+    graph_mod.use_checkpointer(saver)
+    install_fakes()
+
+    sem = asyncio.Semaphore(args.concurrency)
+
+    async def one(i: int) -> None:
+        async with sem:
+            await graph_mod.run_once(f"T{i % 500}")
+
+    print(f"mode={args.mode} requests={args.requests}")
+    t0 = time.perf_counter()
+    base = rss_mb()
+    for start in range(0, args.requests, args.sample_every):
+        await asyncio.gather(*(one(i) for i in range(start, min(start + args.sample_every, args.requests))))
+        extra = saver.stats() if hasattr(saver, "stats") else (
+            {"threads": len(saver.storage)} if saver is not None else {})
+        print(f"  {min(start + args.sample_every, args.requests):>7} req  rss={rss_mb():8.1f}MB "
+              f"(+{rss_mb() - base:6.1f})  {time.perf_counter() - t0:7.1f}s  {extra}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())